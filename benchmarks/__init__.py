@@ -0,0 +1,22 @@
+"""Performance benchmarks for FLOWSTATE.
+
+Run with `python -m benchmarks run` from the repository root.
+"""
+
+from .suite import BENCHMARKS, Benchmark, compare, load_results, measure, run_suite, save_results
+from .synthetic import SIZES, generate_corpus, generate_tracks
+
+__all__ = [
+    # Synthetic data
+    "SIZES",
+    "generate_corpus",
+    "generate_tracks",
+    # Suite
+    "BENCHMARKS",
+    "Benchmark",
+    "compare",
+    "load_results",
+    "measure",
+    "run_suite",
+    "save_results",
+]
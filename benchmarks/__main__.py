@@ -0,0 +1,97 @@
+"""Benchmark CLI: `python -m benchmarks run|compare`."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .suite import compare as compare_results
+from .suite import load_results, run_suite, save_results
+from .synthetic import SIZES
+
+console = Console()
+
+
+def _print_comparison(rows: list[dict], threshold: float) -> int:
+    """Print a comparison table and return the number of regressions."""
+    table = Table(title=f"Benchmark comparison (threshold ±{threshold:.0%})")
+    table.add_column("Benchmark")
+    table.add_column("Baseline ms", justify="right")
+    table.add_column("Current ms", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Status")
+
+    styles = {"regression": "red", "improvement": "green", "ok": "dim"}
+    for row in rows:
+        style = styles[row["status"]]
+        table.add_row(
+            row["benchmark"],
+            f"{row['baseline_ms']:.4f}",
+            f"{row['current_ms']:.4f}",
+            f"{row['ratio'] - 1:+.1%}",
+            f"[{style}]{row['status']}[/{style}]",
+        )
+    console.print(table)
+
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    if regressions:
+        console.print(f"[red]{regressions} regression(s) beyond {threshold:.0%}[/red]")
+    return regressions
+
+
+@click.group()
+def main():
+    """FLOWSTATE benchmark suite."""
+    pass
+
+
+@main.command()
+@click.option("-s", "--size", "sizes", multiple=True, type=click.Choice(list(SIZES), case_sensitive=False),
+              help="Corpus size (repeatable; default: 1k and 10k)")
+@click.option("-b", "--benchmark", "only", multiple=True, help="Only benchmarks with this name prefix")
+@click.option("--seed", type=int, default=0, help="Corpus generator seed")
+@click.option("--min-time", type=float, default=0.5, help="Seconds to time each benchmark")
+@click.option("-o", "--output", type=click.Path(), help="Write results JSON (e.g. a new baseline)")
+@click.option("--compare", "baseline_path", type=click.Path(exists=True), help="Baseline JSON to compare against")
+@click.option("--threshold", type=float, default=0.10, help="Regression threshold (0.10 = 10% slower)")
+def run(sizes, only, seed, min_time, output, baseline_path, threshold):
+    """Run benchmarks, optionally saving and comparing results.
+
+    Example:
+        python -m benchmarks run -s 10k -o benchmarks/baselines/main.json
+        python -m benchmarks run -s 10k --compare benchmarks/baselines/main.json
+    """
+    sizes = list(sizes) or ["1k", "10k"]
+
+    def progress(key: str, stats: dict) -> None:
+        console.print(f"  {key:<36} [cyan]{stats['median_ms']:>12.4f} ms[/cyan]  [dim]({stats['calls']} calls)[/dim]")
+
+    console.print(f"Running benchmarks for sizes: {', '.join(sizes)}")
+    results = run_suite(sizes, seed=seed, only=list(only) or None, min_time=min_time, progress=progress)
+
+    if output:
+        save_results(results, output)
+        console.print(f"Saved results to [cyan]{output}[/cyan]")
+
+    if baseline_path:
+        regressions = _print_comparison(compare_results(load_results(baseline_path), results, threshold), threshold)
+        if regressions:
+            raise SystemExit(1)
+
+
+@main.command()
+@click.argument("baseline_path", type=click.Path(exists=True))
+@click.argument("current_path", type=click.Path(exists=True))
+@click.option("--threshold", type=float, default=0.10, help="Regression threshold (0.10 = 10% slower)")
+def compare(baseline_path, current_path, threshold):
+    """Compare two saved result files; exits 1 on regressions.
+
+    Example:
+        python -m benchmarks compare benchmarks/baselines/main.json results.json
+    """
+    rows = compare_results(load_results(baseline_path), load_results(current_path), threshold)
+    if _print_comparison(rows, threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Benchmark definitions, timing harness and baseline comparison."""
+
+import json
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import cycle
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from flowstate.engine import RecommendationEngine, ScoringConfig
+from flowstate.models.camelot import get_compatible_keys, key_compatibility_score, to_camelot
+from flowstate.integrations.rekordbox import RekordboxMonitor
+from flowstate.models import Corpus
+
+from .synthetic import KEYS, SIZES, generate_corpus, generate_tracks
+
+# Benchmarks operate on one op per call; the setup returns that op
+Setup = Callable[[Optional[Corpus], np.random.Generator], Callable[[], object]]
+
+
+@dataclass
+class Benchmark:
+    """A named operation timed per call."""
+
+    name: str
+    setup: Setup
+    per_size: bool = True  # False: independent of corpus size, run once
+    max_size: int = SIZES["1m"]  # Skip larger corpora (e.g. JSON round trips)
+
+
+def _sample(corpus: Corpus, rng: np.random.Generator, n: int = 200) -> list:
+    rows = rng.choice(len(corpus.tracks), size=min(n, len(corpus.tracks)), replace=False)
+    return [corpus.tracks[row] for row in rows]
+
+
+def _recommend_cold(corpus, rng):
+    engine = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    tracks = cycle(_sample(corpus, rng))
+    return lambda: engine.recommend(next(tracks))
+
+
+def _recommend_cached(corpus, rng):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    track = _sample(corpus, rng, 1)[0]
+
+    def run():
+        engine.recently_played = []
+        return engine.recommend(track)
+
+    run()
+    return run
+
+
+def _recommend_many(corpus, rng):
+    engine = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    seeds = _sample(corpus, rng, 100)
+    return lambda: engine.recommend_many(seeds)
+
+
+def _search_text(corpus, rng):
+    queries = cycle(["house", "artist 12", "techno", "synthetic", "zzz-no-match"])
+    return lambda: corpus.search(next(queries))
+
+
+def _search_filtered(corpus, rng):
+    return lambda: corpus.search("", bpm_range=(120, 128), min_energy=6, min_fidelity=6)
+
+
+def _corpus_save(corpus, rng):
+    path = Path(tempfile.mkdtemp()) / "corpus.json"
+    return lambda: corpus.save(path)
+
+
+def _corpus_load(corpus, rng):
+    path = Path(tempfile.mkdtemp()) / "corpus.json"
+    corpus.save(path)
+    return lambda: Corpus.load(path)
+
+
+def _corpus_add(corpus, rng):
+    # Work on a copy so the shared corpus isn't mutated for later benchmarks
+    target = Corpus(tracks=list(corpus.tracks))
+    new_tracks = cycle(generate_tracks(1000, seed=int(rng.integers(1 << 30)) + 1))
+    existing = cycle(_sample(corpus, rng))
+    toggle = cycle([True, False])  # Alternate inserts and updates
+    return lambda: target.add(next(new_tracks) if next(toggle) else next(existing))
+
+
+def _rekordbox_by_id(corpus, rng):
+    monitor = RekordboxMonitor(corpus)
+    ids = cycle([{"rekordbox_id": t.rekordbox_id} for t in _sample(corpus, rng) if t.rekordbox_id])
+    return lambda: monitor._match_to_corpus(next(ids))
+
+
+def _rekordbox_by_title(corpus, rng):
+    monitor = RekordboxMonitor(corpus)
+    queries = cycle([{"title": f"{t.artist} - {t.title}", "artist": ""} for t in _sample(corpus, rng)])
+    return lambda: monitor._match_to_corpus(next(queries))
+
+
+def _camelot_score(corpus, rng):
+    pairs = cycle([(a, b) for a in KEYS for b in KEYS])
+    return lambda: key_compatibility_score(*next(pairs))
+
+
+def _camelot_compatible(corpus, rng):
+    keys = cycle(KEYS + ["", "8a"])
+    return lambda: get_compatible_keys(next(keys))
+
+
+def _camelot_to_camelot(corpus, rng):
+    keys = cycle(["Am", "F#m", "Gb", "8A", "C#", "Dbm", "nope"])
+    return lambda: to_camelot(next(keys))
+
+
+BENCHMARKS = [
+    Benchmark("recommend.cold", _recommend_cold),
+    Benchmark("recommend.cached", _recommend_cached),
+    Benchmark("recommend.many", _recommend_many),
+    Benchmark("search.text", _search_text),
+    Benchmark("search.filtered", _search_filtered),
+    Benchmark("corpus.save", _corpus_save, max_size=SIZES["100k"]),
+    Benchmark("corpus.load", _corpus_load, max_size=SIZES["100k"]),
+    Benchmark("corpus.add", _corpus_add),
+    Benchmark("rekordbox.match_id", _rekordbox_by_id),
+    Benchmark("rekordbox.match_title", _rekordbox_by_title),
+    Benchmark("camelot.score", _camelot_score, per_size=False),
+    Benchmark("camelot.compatible_keys", _camelot_compatible, per_size=False),
+    Benchmark("camelot.to_camelot", _camelot_to_camelot, per_size=False),
+]
+
+
+def measure(op: Callable[[], object], min_time: float = 0.5, max_calls: int = 10_000) -> dict:
+    """
+    Time one op repeatedly (after a warm-up call).
+
+    Runs until `min_time` seconds have elapsed (at least 3 calls) or
+    `max_calls` is reached. Sub-millisecond ops are timed in batches so
+    timer resolution doesn't dominate.
+    """
+    start = time.perf_counter()
+    op()
+    warmup = time.perf_counter() - start
+    batch = max(1, min(1000, int(1e-3 / warmup))) if warmup > 0 else 1000
+
+    samples = []
+    calls = 0
+    deadline = time.perf_counter() + min_time
+    while calls < max_calls and (len(samples) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        for _ in range(batch):
+            op()
+        samples.append((time.perf_counter() - start) / batch * 1000)
+        calls += batch
+
+    return {
+        "calls": calls,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def run_suite(
+    sizes: list[str],
+    seed: int = 0,
+    only: Optional[list[str]] = None,
+    min_time: float = 0.5,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Run benchmarks for each named corpus size.
+
+    Args:
+        sizes: Named sizes ("1k", "10k", "100k", "1m")
+        seed: Corpus and sampling seed
+        only: Benchmark name prefixes to run (default: all)
+        min_time: Seconds to spend timing each benchmark
+        progress: Optional callback(result key, stats) after each benchmark
+
+    Returns:
+        JSON-ready dict with run metadata and results keyed "name[size]"
+    """
+    selected = [b for b in BENCHMARKS if not only or any(b.name.startswith(p) for p in only)]
+    results = {}
+
+    def record(key: str, stats: dict) -> None:
+        results[key] = stats
+        if progress:
+            progress(key, stats)
+
+    for benchmark in selected:
+        if not benchmark.per_size:
+            record(benchmark.name, measure(benchmark.setup(None, np.random.default_rng(seed)), min_time))
+
+    for size in sizes:
+        n = SIZES[size.lower()]
+        size_benchmarks = [b for b in selected if b.per_size and n <= b.max_size]
+        if not size_benchmarks:
+            continue
+        corpus = generate_corpus(n, seed)
+        for benchmark in size_benchmarks:
+            op = benchmark.setup(corpus, np.random.default_rng(seed))
+            record(f"{benchmark.name}[{size.lower()}]", measure(op, min_time))
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "seed": seed,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: str | Path) -> None:
+    """Write results as a JSON baseline."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str | Path) -> dict:
+    """Read a JSON baseline written by `save_results`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    Compare median timings of benchmarks present in both runs.
+
+    Returns:
+        One row per benchmark with the ratio (current / baseline) and a
+        status of "regression", "improvement" or "ok" at the threshold
+    """
+    rows = []
+    for key, stats in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or base["median_ms"] <= 0:
+            continue
+        ratio = stats["median_ms"] / base["median_ms"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "benchmark": key,
+            "baseline_ms": base["median_ms"],
+            "current_ms": stats["median_ms"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return rows
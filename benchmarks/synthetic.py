@@ -0,0 +1,134 @@
+"""Seeded synthetic corpus generator with DJ-library-like distributions."""
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from flowstate.models import Corpus, GrooveStyle, Intensity, Track, Vibe
+
+# Named sizes used by the benchmark suite
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+VIBES = [v.value for v in Vibe]
+GROOVES = [g.value for g in GrooveStyle]
+INTENSITIES = [i.value for i in Intensity]
+
+# 1A..12A, 1B..12B
+KEYS = [f"{n}A" for n in range(1, 13)] + [f"{n}B" for n in range(1, 13)]
+
+# Minor keys are more common in electronic music; a few keys dominate
+KEY_WEIGHTS = np.array([
+    4, 5, 5, 6, 7, 7, 7, 9, 7, 6, 5, 4,   # A (minor)
+    2, 2, 2, 3, 3, 3, 3, 4, 3, 3, 3, 2,   # B (major)
+], dtype=float)
+
+# genre -> (share, bpm mean, bpm sd, mean energy, vibe weights, groove weights, subgenres)
+GENRE_PROFILES = {
+    "House": (0.30, 124.0, 2.5, 6.0, [2, 3, 3, 3, 2, 1], [8, 1, 2, 2, 2], ["deep", "tech", "progressive", None]),
+    "Techno": (0.20, 132.0, 4.0, 7.0, [5, 0.5, 5, 1, 0.5, 3], [8, 2, 0.5, 1, 4], ["minimal", "peak-time", "melodic", None]),
+    "K-Pop": (0.15, 118.0, 12.0, 7.0, [1, 5, 0.5, 4, 2, 1], [3, 1, 1, 4, 1], ["dance-pop", "ballad", None]),
+    "Hip-Hop": (0.12, 92.0, 6.0, 5.5, [3, 2, 1, 1, 2, 3], [0.5, 4, 3, 5, 0.5], ["trap", "boom-bap", None]),
+    "Drum & Bass": (0.08, 174.0, 1.5, 8.0, [3, 2, 2, 3, 1, 3], [0.5, 8, 1, 2, 0.5], ["liquid", "neuro", None]),
+    "Disco": (0.08, 118.0, 4.0, 6.5, [0.5, 5, 1, 5, 1, 0.5], [6, 0.5, 4, 2, 1], ["nu-disco", None]),
+    "Ambient": (0.07, 90.0, 15.0, 2.5, [2, 1, 4, 1, 5, 0.1], [1, 2, 1, 1, 4], [None]),
+}
+
+
+def _choice(rng: np.random.Generator, options: list, weights, size: int) -> np.ndarray:
+    p = np.asarray(weights, dtype=float)
+    return rng.choice(len(options), size=size, p=p / p.sum())
+
+
+def generate_tracks(n: int, seed: int = 0) -> list[Track]:
+    """
+    Generate `n` tracks deterministically from `seed`.
+
+    BPMs cluster per genre, keys follow a skewed Camelot distribution,
+    energy is genre-dependent and intensity/danceability follow energy.
+    """
+    rng = np.random.default_rng(seed)
+    genres = list(GENRE_PROFILES)
+    genre_idx = _choice(rng, genres, [p[0] for p in GENRE_PROFILES.values()], n)
+
+    bpm = np.empty(n)
+    energy = np.empty(n, dtype=np.int64)
+    vibe = np.empty(n, dtype=np.int64)
+    groove = np.empty(n, dtype=np.int64)
+    subgenre = np.empty(n, dtype=object)
+    for g, (_, bpm_mean, bpm_sd, energy_mean, vibe_w, groove_w, subgenres) in enumerate(GENRE_PROFILES.values()):
+        mask = genre_idx == g
+        count = int(mask.sum())
+        bpm[mask] = rng.normal(bpm_mean, bpm_sd, count)
+        energy[mask] = np.rint(rng.normal(energy_mean, 1.6, count))
+        vibe[mask] = _choice(rng, VIBES, vibe_w, count)
+        groove[mask] = _choice(rng, GROOVES, groove_w, count)
+        subgenre[mask] = [subgenres[i] for i in rng.integers(0, len(subgenres), count)]
+
+    # Rekordbox rounds BPM to 0.01; most electronic tracks sit on whole BPMs
+    bpm = np.clip(bpm, 60, 200)
+    bpm = np.where(rng.random(n) < 0.7, np.rint(bpm), np.round(bpm, 2))
+    energy = np.clip(energy, 1, 10)
+
+    key_idx = _choice(rng, KEYS, KEY_WEIGHTS, n)
+    unknown_key = rng.random(n) < 0.01  # Tracks whose key detection failed
+
+    # Intensity follows energy: low = opener (or closer), mid = journey, high = peak
+    intensity = np.clip(np.rint((energy - 1) / 4.5 + rng.normal(0, 0.5, n)), 0, 2).astype(np.int64)
+    intensity = np.where((intensity == 0) & (rng.random(n) < 0.3), 3, intensity)  # Some closers
+
+    danceability = np.clip(np.rint(energy * 0.6 + rng.normal(3, 1.5, n)), 1, 10).astype(np.int64)
+    mix_in = rng.integers(3, 11, n)
+    mix_out = rng.integers(3, 11, n)
+    fidelity = np.clip(np.rint(rng.normal(8, 1.5, n)), 1, 10).astype(np.int64)
+    quality = np.clip(np.rint(rng.normal(7, 1.5, n)), 1, 10).astype(np.int64)
+    duration = rng.normal(240, 60, n).clip(60, 720)
+    artist_idx = rng.zipf(1.4, n) % max(n // 8, 1)
+    has_rekordbox = rng.random(n) < 0.6
+
+    now = datetime(2025, 1, 1)
+    tracks = []
+    for i in range(n):
+        track_id = hashlib.sha256(f"{seed}:{i}".encode()).hexdigest()
+        genre = genres[genre_idx[i]]
+        artist = f"Artist {artist_idx[i]}"
+        title = f"Track {i}"
+        tracks.append(Track.model_construct(
+            track_id=track_id,
+            title=title,
+            artist=artist,
+            file_path=Path(f"/music/{genre}/{artist} - {title}.mp3"),
+            rekordbox_id=str(100_000 + i) if has_rekordbox[i] else None,
+            bpm=float(bpm[i]),
+            key="" if unknown_key[i] else KEYS[key_idx[i]],
+            duration_seconds=float(duration[i]),
+            energy=int(energy[i]),
+            danceability=int(danceability[i]),
+            vibe=VIBES[vibe[i]],
+            intensity=INTENSITIES[intensity[i]],
+            mood_tags=[],
+            groove_style=GROOVES[groove[i]],
+            tempo_feel="straight",
+            mix_in_ease=int(mix_in[i]),
+            mix_out_ease=int(mix_out[i]),
+            vocal_presence="instrumental",
+            vocal_style="none",
+            structure=[],
+            instrumentation=[],
+            production_quality=int(quality[i]),
+            audio_fidelity=int(fidelity[i]),
+            genre=genre,
+            subgenre=subgenre[i],
+            similar_artists=[],
+            description=f"Synthetic {genre.lower()} track",
+            created_at=now,
+            updated_at=now,
+        ))
+    return tracks
+
+
+def generate_corpus(size: int | str, seed: int = 0) -> Corpus:
+    """Generate a corpus by track count or named size ("1k", "10k", "100k", "1m")."""
+    n = SIZES[size.lower()] if isinstance(size, str) else size
+    return Corpus(tracks=generate_tracks(n, seed))
@@ -11,7 +11,7 @@ import google.generativeai as genai
 from pydantic import ValidationError
 
 from ..models import AudioFile, Track
-from ..engine.camelot import compute_compatible_keys, to_camelot
+from ..models.camelot import to_camelot
 
 # Analysis prompt with expanded fields
 ANALYSIS_PROMPT = """Analyze this audio track and return a JSON object with the following fields.
@@ -205,9 +205,6 @@ class GeminiAnalyzer:
                 # Description
                 description=data.get("description", "No description available."),
 
-                # Computed
-                compatible_keys=compute_compatible_keys(key),
-
                 # Timestamps
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
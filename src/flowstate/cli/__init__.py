@@ -3,6 +3,7 @@
 import click
 
 from .analyze import analyze
+from .audit import audit_playlist
 from .corpus import corpus
 from .download_videos import download_videos
 from .run import run
@@ -21,6 +22,7 @@ def main():
 
 
 main.add_command(analyze)
+main.add_command(audit_playlist)
 main.add_command(corpus)
 main.add_command(download_videos)
 main.add_command(run)
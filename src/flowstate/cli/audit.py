@@ -0,0 +1,126 @@
+"""CLI command for auditing the transitions of a prepared playlist."""
+
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from ..engine import RecommendationEngine, ScoringConfig
+from ..models import Corpus, Track
+
+console = Console()
+
+
+def _read_playlist(path: Path) -> list[str]:
+    """Entries of an M3U/M3U8 playlist or a plain list (one path or track ID per line)."""
+    entries = []
+    for line in path.read_text(encoding="utf-8-sig").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            entries.append(line)
+    return entries
+
+
+def _resolve(corpus: Corpus, by_stem: dict[str, Track], entry: str) -> Optional[Track]:
+    """Corpus track for a playlist entry: exact path, track ID, then file name."""
+    track = corpus.get_by_path(entry) or corpus.get_by_id(entry)
+    if track is None:
+        # Exports from Windows use backslashes; compare just the file name like Rekordbox sync
+        track = by_stem.get(Path(entry.replace("\\", "/")).stem.lower())
+    return track
+
+
+@click.command("audit-playlist")
+@click.argument("playlist", type=click.Path(exists=True))
+@click.option("-c", "--corpus", "corpus_path", default="data/corpus.json", help="Corpus file")
+@click.option("-n", "--weakest", type=int, default=3, help="Weakest transitions to suggest alternatives for")
+@click.option("-a", "--alternatives", type=int, default=3, help="Alternatives per weak transition")
+def audit_playlist(playlist: str, corpus_path: str, weakest: int, alternatives: int):
+    """Score every transition of a prepared playlist.
+
+    PLAYLIST is an M3U/M3U8 export (e.g. from Rekordbox) or a text file
+    with one file path or track ID per line. Each consecutive pair is
+    scored in the direction its energy moves, and the weakest links get
+    better-scoring alternatives from the rest of the library.
+
+    Example:
+        flowstate audit-playlist set.m3u8 -c data/corpus.json
+    """
+    corpus_file = Path(corpus_path)
+    if not corpus_file.exists():
+        console.print(f"[red]Corpus not found: {corpus_path}[/red]")
+        console.print("[dim]Run 'flowstate analyze' first to build a corpus[/dim]")
+        raise SystemExit(1)
+
+    corpus = Corpus.load(corpus_file)
+    by_stem = {Path(t.file_path).stem.lower(): t for t in corpus.tracks if t.file_path}
+
+    tracks = []
+    for entry in _read_playlist(Path(playlist)):
+        track = _resolve(corpus, by_stem, entry)
+        if track is None:
+            console.print(f"[yellow]Not in corpus, skipped: {entry}[/yellow]")
+        else:
+            tracks.append(track)
+
+    if len(tracks) < 2:
+        console.print("[red]Need at least 2 corpus tracks in the playlist[/red]")
+        raise SystemExit(1)
+
+    engine = RecommendationEngine(corpus, ScoringConfig(top_n=max(5, alternatives)))
+    try:
+        links = engine.score_pairs([(a, b, None) for a, b in zip(tracks, tracks[1:])])
+        scores = links.totals.tolist()
+        weak = set(sorted(range(len(links)), key=scores.__getitem__)[:weakest])
+
+        table = Table(title=f"{len(links)} transitions", show_header=True)
+        table.add_column("#", justify="right")
+        table.add_column("From", style="white", no_wrap=True)
+        table.add_column("To", style="white", no_wrap=True)
+        table.add_column("Dir")
+        table.add_column("BPM", justify="right")
+        table.add_column("Key")
+        table.add_column("Score", justify="right")
+
+        for i, (current, following, direction, score) in enumerate(zip(tracks, tracks[1:], links.directions, scores)):
+            bpm = f"{current.bpm:.0f}→{following.bpm:.0f}"
+            if links.bpm_windows[i] is None:
+                bpm = f"[yellow]{bpm}[/yellow]"  # Outside the live BPM filter
+            table.add_row(
+                str(i + 1),
+                f"{current.artist[:15]} - {current.title[:25]}",
+                f"{following.artist[:15]} - {following.title[:25]}",
+                direction.value.upper(),
+                bpm,
+                f"{current.key}→{following.key}",
+                f"[red]{score:.2f}[/red]" if i in weak else f"{score:.2f}",
+            )
+        console.print(table)
+
+        average = sum(scores) / len(scores)
+        console.print(f"Average transition score: [cyan]{average:.2f}[/cyan]")
+
+        # Alternatives come from the rest of the library (nothing already in the set)
+        weak = sorted(weak)
+        exclude = [t.track_id for t in tracks]
+        suggestions = engine.recommend_many([tracks[i] for i in weak], exclude=exclude)
+        for i, recs in zip(weak, suggestions):
+            link = links[i]
+            better = [
+                s for s in recs.get_direction(link.direction) if s.total_score > link.total_score
+            ][:alternatives]
+            console.print(
+                f"\n[bold]#{i + 1}[/bold] {tracks[i].title} → {link.track.title} "
+                f"([red]{link.total_score:.2f}[/red], {link.direction.value})"
+            )
+            if not better:
+                console.print("  [dim]No better-scoring alternative in the library[/dim]")
+            for s in better:
+                console.print(
+                    f"  [green]{s.total_score:.2f}[/green]  {s.track.artist} - {s.track.title}  "
+                    f"[dim]{s.track.bpm:.0f} BPM, {s.track.key}, E{s.track.energy}[/dim]"
+                )
+    finally:
+        engine.close()
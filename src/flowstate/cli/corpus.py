@@ -7,6 +7,7 @@ import click
 from rich.console import Console
 from rich.table import Table
 
+from ..engine import ScoringConfig, TransitionGraph, graph_path_for
 from ..models import Corpus
 
 console = Console()
@@ -96,6 +97,33 @@ def export(corpus_path: str, output: str):
     console.print(f"Exported {len(corpus_obj.tracks)} tracks to [cyan]{output_path}[/cyan]")
 
 
+@corpus.command("build-graph")
+@click.argument("corpus_path", type=click.Path(exists=True))
+@click.option("-k", "--top-k", type=int, default=50, help="Successors to keep per track and direction")
+@click.option("-w", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+@click.option("-o", "--output", default=None, help="Graph file (default: next to the corpus)")
+def build_graph(corpus_path: str, top_k: int, workers: int | None, output: str | None):
+    """Precompute the top-K transitions for every track.
+
+    The graph is saved as a sidecar next to the corpus and picked up by
+    'flowstate run', which then serves recommendations without a live
+    full scan. It is ignored automatically once the corpus or scoring
+    config changes.
+
+    Example:
+        flowstate corpus build-graph data/corpus.json -k 50
+    """
+    corpus_obj = Corpus.load(corpus_path)
+    output_path = Path(output) if output else graph_path_for(corpus_path)
+
+    console.print(f"Building transition graph for [cyan]{len(corpus_obj.tracks)}[/cyan] tracks (k={top_k})")
+
+    graph = TransitionGraph.build(corpus_obj, ScoringConfig(), k=top_k, workers=workers)
+    graph.save(output_path)
+
+    console.print(f"Saved graph to [cyan]{output_path}[/cyan]")
+
+
 @corpus.command()
 @click.argument("corpus_path", type=click.Path(exists=True))
 @click.option("-q", "--query", default="", help="Search query")
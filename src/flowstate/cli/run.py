@@ -1,22 +1,51 @@
 """CLI command for running the live recommendation UI."""
 
+import os
 from pathlib import Path
 
 import click
 from rich.console import Console
 
 from ..models import Corpus
-from ..engine import RecommendationEngine, ScoringConfig
+from ..engine import RecommendationEngine, ScoringConfig, graph_path_for
 
 console = Console()
 
 
+def _speculation_workers() -> int:
+    """Speculation threads: one per core beyond the first, at most two (at least one)."""
+    return max(1, min(2, (os.cpu_count() or 1) - 1))
+
+
 @click.command()
 @click.option("-c", "--corpus", "corpus_path", default="data/corpus.json", help="Corpus file")
 @click.option("--ui", type=click.Choice(["terminal", "web"]), default="terminal", help="UI mode")
 @click.option("--port", type=int, default=5000, help="Web UI port")
 @click.option("--rekordbox/--no-rekordbox", default=True, help="Enable Rekordbox sync")
-def run(corpus_path: str, ui: str, port: int, rekordbox: bool):
+@click.option("--speculate/--no-speculate", default=False, help="Precompute candidates' recommendations on spare cores")
+@click.option("-w", "--workers", type=int, default=0, help="Scoring processes for very large libraries (0 = off)")
+@click.option("--instrument", is_flag=True, help="Record per-stage timings (see /api/engine/stats)")
+@click.option("--min-candidates", type=int, default=0, help="Widen the BPM window until each direction has this many (0 = off)")
+@click.option("--half-double/--no-half-double", default=False, help="Also match half/double-time BPMs (e.g. 70 <-> 140)")
+@click.option("--deadline-ms", type=float, default=0.0, help="Return best-so-far recommendations after this long, refining in the background (0 = off)")
+@click.option("--deck", default="terminal", help="Session name for the terminal UI's play history")
+@click.option("--ranking", type=click.Choice(["weighted", "pareto"]), default="weighted", help="Weighted top N, or the Pareto front of the factor scores")
+@click.option("--pareto-factor", "pareto_factors", multiple=True, help="Factor the Pareto front compares (repeatable; default: all weighted)")
+def run(
+    corpus_path: str,
+    ui: str,
+    port: int,
+    rekordbox: bool,
+    speculate: bool,
+    workers: int,
+    instrument: bool,
+    min_candidates: int,
+    half_double: bool,
+    deadline_ms: float,
+    deck: str,
+    ranking: str,
+    pareto_factors: tuple[str, ...],
+):
     """Run the live recommendation UI.
 
     Example:
@@ -35,13 +64,38 @@ def run(corpus_path: str, ui: str, port: int, rekordbox: bool):
         console.print("[red]Need at least 2 tracks in corpus[/red]")
         raise SystemExit(1)
 
-    engine = RecommendationEngine(corpus, ScoringConfig())
+    try:
+        config = ScoringConfig(
+            speculation_workers=_speculation_workers() if speculate else 0,
+            parallel_workers=workers,
+            instrument=instrument,
+            min_candidates=min_candidates,
+            half_double_time=half_double,
+            deadline_ms=deadline_ms,
+            ranking=ranking,
+            pareto_factors=pareto_factors,
+        )
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise SystemExit(1)
+    engine = RecommendationEngine(corpus, config)
+
+    graph_path = graph_path_for(corpus_file)
+    if graph_path.exists():
+        if engine.load_graph(graph_path):
+            console.print(f"Using transition graph [cyan]{graph_path}[/cyan]")
+        else:
+            console.print("[yellow]Transition graph is stale - using live scoring[/yellow]")
+            console.print("[dim]Run 'flowstate corpus build-graph' to rebuild it[/dim]")
 
-    if ui == "terminal":
-        from ..ui.terminal import Dashboard
-        dashboard = Dashboard(corpus, engine, rekordbox_sync=rekordbox)
-        dashboard.run()
-    else:
-        from ..ui.web import WebUI
-        web_ui = WebUI(corpus, engine, rekordbox_sync=rekordbox)
-        web_ui.run(port=port)
+    try:
+        if ui == "terminal":
+            from ..ui.terminal import Dashboard
+            dashboard = Dashboard(corpus, engine, rekordbox_sync=rekordbox, session_id=deck)
+            dashboard.run()
+        else:
+            from ..ui.web import WebUI
+            web_ui = WebUI(corpus, engine, rekordbox_sync=rekordbox)
+            web_ui.run(port=port)
+    finally:
+        engine.close()
@@ -1,13 +1,30 @@
 """Recommendation engine."""
 
-from .camelot import (
+from ..models.camelot import (
     CAMELOT_WHEEL,
+    COMPATIBLE_MASKS,
+    KEY_CODES,
+    KEY_SCORES,
+    UNKNOWN_KEY,
+    compatibility_mask,
+    compatible_codes,
     compute_compatible_keys,
+    encode_key,
     get_compatible_keys,
     key_compatibility_score,
     to_camelot,
 )
+from .anytime import AnytimeScorer
+from .batch import BatchRecommendations, BatchRecommender, ScoredPairs
 from .engine import RecommendationEngine, ScoringConfig
+from .features import CandidateView, FeatureStore, TrackFeatures
+from .graph import TransitionGraph, graph_path_for
+from .instrumentation import PipelineMetrics, RollingHistogram, StageTimer
+from .parallel import ParallelScorer, SharedFeatureStore
+from .planner import LookaheadPlanner
+from .ranking import select_top
+from .session import Session
+from .speculation import Speculator
 from .factors import (
     DEFAULT_FACTORS,
     DanceabilityFactor,
@@ -19,18 +36,48 @@ from .factors import (
     NarrativeFlowFactor,
     ScoringFactor,
     VibeCompatibilityFactor,
+    WEIGHT_PRESETS,
 )
 
 __all__ = [
     # Camelot
     "CAMELOT_WHEEL",
+    "COMPATIBLE_MASKS",
+    "KEY_CODES",
+    "KEY_SCORES",
+    "UNKNOWN_KEY",
+    "compatibility_mask",
+    "compatible_codes",
     "compute_compatible_keys",
+    "encode_key",
     "get_compatible_keys",
     "key_compatibility_score",
     "to_camelot",
     # Engine
     "RecommendationEngine",
     "ScoringConfig",
+    # Batch recommendations
+    "BatchRecommendations",
+    "BatchRecommender",
+    "ScoredPairs",
+    # Anytime scoring
+    "AnytimeScorer",
+    # Sessions
+    "Session",
+    # Features
+    "CandidateView",
+    "FeatureStore",
+    "TrackFeatures",
+    # Transition graph
+    "TransitionGraph",
+    "graph_path_for",
+    # Instrumentation
+    "PipelineMetrics",
+    "RollingHistogram",
+    "StageTimer",
+    # Parallel scoring
+    "ParallelScorer",
+    "SharedFeatureStore",
     # Factors
     "DEFAULT_FACTORS",
     "DanceabilityFactor",
@@ -42,4 +89,10 @@ __all__ = [
     "NarrativeFlowFactor",
     "ScoringFactor",
     "VibeCompatibilityFactor",
+    "WEIGHT_PRESETS",
+    # Planning
+    "LookaheadPlanner",
+    "Speculator",
+    # Ranking
+    "select_top",
 ]
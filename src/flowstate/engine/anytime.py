@@ -0,0 +1,174 @@
+"""Anytime scoring: best-so-far candidate pools under a latency deadline."""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from ..models import Direction, Track
+from ..models.camelot import KEY_SCORES
+from .features import FeatureStore
+from .instrumentation import StageTimer
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine, _ScoredPool
+
+_KEY_PRIORITY = np.pad(KEY_SCORES, (0, 1), constant_values=0.5)
+
+
+class AnytimeScorer:
+    """
+    Scores candidates in priority order until a deadline passes.
+
+    Candidates nearest in BPM with the best key compatibility go first,
+    in chunks taken from each direction in turn. Each direction's
+    highest-priority `min_chunk` rows are always scored, so a result is
+    never empty just because filtering used up the budget. After that,
+    chunks are sized from the measured scoring time per candidate so that
+    each fits in half the remaining time, up to `chunk_size` rows, and
+    scoring stops once the deadline is nearer than a reserve for ranking
+    and returning the result. The reserve tracks how long recent partial
+    calls took from the end of scoring to returning, and never exceeds
+    `max_reserve` of the time left when scoring starts. The pools then
+    hold only the chunks scored so far, so the caller ranks the best so
+    far. If every chunk fits in time, the pools cover every candidate and
+    rank exactly like full scoring.
+    """
+
+    chunk_size = 2048
+    min_chunk = 64
+    max_reserve = 0.5
+
+    def __init__(self, engine: "RecommendationEngine"):
+        self.engine = engine
+        # Scoring time per candidate, smoothed over recent chunks
+        self._row_seconds: Optional[float] = None
+        # The same for whole candidate sets scored (and pruned) at once
+        self._full_row_seconds: Optional[float] = None
+        # Time the caller needs after scoring stops, smoothed over recent partial calls
+        self._reserve = 0.0
+        # When this thread's last scoring loop ended
+        self._local = threading.local()
+
+    def score(
+        self,
+        current: Track,
+        store: FeatureStore,
+        rows: dict[Direction, np.ndarray],
+        deadline: float,
+        timer: Optional[StageTimer] = None,
+    ) -> tuple[dict[Direction, "_ScoredPool"], bool]:
+        """
+        Score chunk by chunk until `deadline` (a time.perf_counter() value).
+
+        Only the first chunk of each direction is scored if the deadline,
+        less the reserve, has already passed.
+
+        Returns:
+            (pools per direction, whether every candidate was scored)
+        """
+        engine = self.engine
+        ordered: dict[Direction, np.ndarray] = {}  # Sorted on a direction's first chunk
+        done = dict.fromkeys(rows, 0)
+        parts: dict[Direction, list["_ScoredPool"]] = {direction: [] for direction in rows}
+
+        stop = deadline - min(self._reserve, max(deadline - time.perf_counter(), 0.0) * self.max_reserve)
+        expired = False
+        while not expired and any(done[d] < len(r) for d, r in rows.items()):
+            for direction, direction_rows in rows.items():
+                start = time.perf_counter()
+                first = done[direction]
+                if first and start >= stop:
+                    expired = True
+                    break
+                if first == len(direction_rows):
+                    continue
+                if direction not in ordered:
+                    ordered[direction] = direction_rows[self._priority(current, store, direction_rows)]
+                direction_rows = ordered[direction]
+                size = self._chunk(stop - start) if first else self.min_chunk
+                # Scoring wants corpus order within a batch
+                batch = np.sort(direction_rows[first:first + size])
+                parts[direction].append(engine._score_rows(current, store, {direction: batch}, timer)[direction])
+                self._measure(len(batch), time.perf_counter() - start)
+                done[direction] += len(batch)
+        self._local.stopped = time.perf_counter()
+
+        complete = all(done[d] == len(r) for d, r in rows.items())
+        if timer:
+            timer.count("anytime", sum(done.values()))
+        return {direction: self._join(direction, parts[direction]) for direction in rows}, complete
+
+    def fits(self, rows: dict[Direction, np.ndarray], deadline: float) -> bool:
+        """Whether scoring every candidate at once should take under half the time left."""
+        if self._full_row_seconds is None:
+            return False
+        remaining = deadline - self._reserve - time.perf_counter()
+        return sum(len(r) for r in rows.values()) * self._full_row_seconds <= remaining / 2
+
+    def measure_full(self, n: int, seconds: float) -> None:
+        """Fold the time of scoring a whole candidate set at once into its per-candidate estimate."""
+        if n:
+            row_seconds = seconds / n
+            previous = self._full_row_seconds
+            self._full_row_seconds = row_seconds if previous is None else (previous + row_seconds) / 2
+
+    def finished(self) -> None:
+        """
+        Note that this thread's partial result has been returned.
+
+        The time since its scoring loop ended (ranking, caching and
+        scheduling) becomes part of the reserve; time spent building the
+        feature store or filtering doesn't.
+        """
+        stopped = getattr(self._local, "stopped", None)
+        if stopped is not None:
+            self._local.stopped = None
+            self._reserve = (self._reserve + (time.perf_counter() - stopped)) / 2
+
+    def _chunk(self, remaining: float) -> int:
+        """Rows to score next so the chunk takes about half the remaining time."""
+        if self._row_seconds is None:
+            return self.min_chunk  # Nothing measured yet
+        fits = int(remaining / 2 / self._row_seconds)
+        return min(max(fits, self.min_chunk), self.chunk_size)
+
+    def _measure(self, n: int, seconds: float) -> None:
+        """Fold a scored chunk's time into the per-candidate estimate."""
+        row_seconds = seconds / max(n, 1)
+        previous = self._row_seconds
+        self._row_seconds = row_seconds if previous is None else (previous + row_seconds) / 2
+
+    def _join(self, direction: Direction, parts: list["_ScoredPool"]) -> "_ScoredPool":
+        """One pool from a direction's scored chunks (empty if none was)."""
+        from .engine import _ScoredPool
+
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            factors = len(self.engine.config.factors)
+            return _ScoredPool(direction, np.empty(0, dtype=np.int64), np.empty((factors, 0)), np.empty(0))
+        return _ScoredPool(
+            direction,
+            np.concatenate([part.rows for part in parts]),
+            np.concatenate([part.raw for part in parts], axis=1),
+            np.concatenate([part.totals for part in parts]),
+        )
+
+    def _priority(self, current: Track, store: FeatureStore, rows: np.ndarray) -> np.ndarray:
+        """Order of `rows` to score in: nearest BPM and most compatible key first."""
+        config = self.engine.config
+        bpm = store.bpm[rows]
+        distance = np.abs(bpm - current.bpm)
+        if config.half_double_time:
+            distance = np.minimum(distance, np.abs(bpm - current.bpm * 2))
+            distance = np.minimum(distance, np.abs(bpm - current.bpm / 2))
+
+        # Unknown keys (code -1) read the neutral last row/column
+        key_score = _KEY_PRIORITY[current.key_code, store.key[rows]]
+
+        # A BPM window's width of distance weighs as much as the full key
+        # range. Quantized to bytes, so the stable sort is a linear radix sort
+        priority = distance * (32 / max(config.bpm_range, 1e-9)) + (1.0 - key_score) * 32
+        return np.argsort(np.minimum(priority, 255).astype(np.uint8), kind="stable")
@@ -0,0 +1,388 @@
+"""Side-effect-free recommendations for many seed tracks at once."""
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from ..models import Direction, Recommendations, ScoredTrack, Track
+from ..models.camelot import COMPATIBLE_MASKS, KEY_CODES
+from .features import FeatureStore
+from .ranking import select_top
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine, ScoringConfig
+
+# Whether a seed key admits a candidate key, indexed by key code + 1. An
+# unknown seed key (row 0) admits every key, a known one no unknown key
+_KEY_ADMITS = np.ones((len(KEY_CODES) + 1, len(KEY_CODES) + 1), dtype=bool)
+_KEY_ADMITS[1:, 0] = False
+_KEY_ADMITS[1:, 1:] = (np.array(COMPATIBLE_MASKS[True])[:, None] >> np.arange(len(KEY_CODES))) & 1
+
+
+class ScoredPairs(Sequence[ScoredTrack]):
+    """
+    Scored (current, candidate, direction) pairs, held as arrays.
+
+    Pair i's total is `totals[i]` and its raw factor scores `raw[:, i]`
+    (one row per factor). Its ScoredTrack is only built when it is
+    indexed, then kept, so callers that only need the scores never pay
+    for the models.
+    """
+
+    def __init__(
+        self,
+        engine: "RecommendationEngine",
+        config: "ScoringConfig",
+        currents: Sequence[Track],
+        candidates: Sequence[Track],
+        directions: Sequence[Direction],
+        raw: np.ndarray,
+        totals: np.ndarray,
+        bpm_windows: Sequence[Optional[float]],
+    ):
+        self.engine = engine
+        self.config = config
+        self.currents = currents
+        self.candidates = candidates
+        self.directions = directions
+        self.raw = raw
+        self.totals = totals
+        self.bpm_windows = bpm_windows
+        self._built: list[Optional[ScoredTrack]] = [None] * len(totals)
+
+    def __len__(self) -> int:
+        return len(self._built)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        scored = self._built[index]
+        if scored is None:
+            # Under the config the scores were computed with, whatever it is now
+            with self.engine._snapshot(self.config):
+                scored = self._built[index] = self.engine._scored_track(
+                    self.currents[index], self.candidates[index], self.directions[index],
+                    self.raw[:, index], self.totals[index], self.bpm_windows[index],
+                )
+        return scored
+
+
+class BatchRecommendations:
+    """
+    One seed's result from recommend_many.
+
+    Reads like Recommendations, but each direction is a ScoredPairs, so
+    ScoredTrack models are only built for the entries looked at.
+    `materialize()` builds the equivalent Recommendations.
+    """
+
+    partial = False
+    timing = None
+
+    def __init__(
+        self,
+        current_track: Track,
+        up: ScoredPairs,
+        hold: ScoredPairs,
+        down: ScoredPairs,
+        candidates_considered: int,
+        filtered_count: int,
+        recently_played: list[str],
+    ):
+        self.current_track = current_track
+        self.up = up
+        self.hold = hold
+        self.down = down
+        self.candidates_considered = candidates_considered
+        self.filtered_count = filtered_count
+        self.recently_played = recently_played
+
+    def get_direction(self, direction: Direction) -> ScoredPairs:
+        """Recommendations for a specific direction."""
+        return {Direction.UP: self.up, Direction.HOLD: self.hold, Direction.DOWN: self.down}[direction]
+
+    def top(self, direction: Direction, n: int = 1) -> list[ScoredTrack]:
+        """Top N recommendations for a direction."""
+        return self.get_direction(direction)[:n]
+
+    def all_recommendations(self) -> list[ScoredTrack]:
+        """All recommendations across all directions."""
+        return [*self.up, *self.hold, *self.down]
+
+    def materialize(self) -> Recommendations:
+        """The full Recommendations model (builds every ScoredTrack)."""
+        return Recommendations(
+            current_track=self.current_track,
+            up=list(self.up),
+            hold=list(self.hold),
+            down=list(self.down),
+            candidates_considered=self.candidates_considered,
+            filtered_count=self.filtered_count,
+            recently_played=self.recently_played,
+        )
+
+
+class BatchRecommender:
+    """
+    Recommendations for whole playlists (set review, playlist export).
+
+    Seeds are processed in BPM order, in blocks whose queries × candidates
+    matrices fit in `config.batch_memory_mb`. A block's candidate columns
+    are the store rows inside its BPM span (read from the store's BPM
+    order) and the hard filters become a boolean mask over the block.
+    Factors then score only the admitted (seed, candidate) pairs with
+    `score_pairs`. Seed-independent filters (excluded tracks, audio
+    fidelity) are evaluated once over the store for the whole call.
+
+    Results match `recommend()` for the same history exactly, but neither
+    the play history nor the result cache is touched. ScoredTrack models
+    are built lazily (see ScoredPairs): building them took most of the
+    time of both paths, while filtering and scoring 200 seeds take about
+    half the time of the per-seed path at 10k tracks and two thirds at
+    40k (where that path prunes by score bounds and this one scores
+    every admitted pair).
+    """
+
+    def __init__(self, engine: "RecommendationEngine"):
+        self.engine = engine
+
+    def recommend_many(
+        self, seeds: list[Track], exclude: Iterable[str] = ()
+    ) -> list[Union[BatchRecommendations, Recommendations]]:
+        """
+        Recommendations for each seed, as if it had just been played.
+
+        Args:
+            seeds: Seed tracks
+            exclude: Track IDs never to recommend (e.g. the rest of the set)
+
+        Returns:
+            One result per seed, in seed order: BatchRecommendations, or
+            Recommendations for seeds that take the per-seed path
+        """
+        engine = self.engine
+        store = engine.features
+        exclude = list(dict.fromkeys(exclude))
+        results: list[Union[BatchRecommendations, Recommendations, None]] = [None] * len(seeds)
+
+        positions, rows = [], []
+        for position, seed in enumerate(seeds):
+            row = store.row_of.get(seed.track_id)
+            if engine.config.adaptive_bpm or engine.config.pareto or row is None or store.tracks[row] is not seed:
+                # Window widening, Pareto fronts and tracks outside the store take the per-seed path
+                results[position] = engine._compute(seed, store, self._history(seed, exclude))
+            else:
+                positions.append(position)
+                rows.append(row)
+
+        if rows:
+            rows = np.asarray(rows, dtype=np.int64)
+            positions = np.asarray(positions)
+            order = np.argsort(store.bpm[rows], kind="stable")
+            rows, positions = rows[order], positions[order]
+            # Seed-independent hard filters, once over the whole store
+            allowed = store.audio_fidelity >= engine.config.min_audio_fidelity
+            allowed[store.rows_for(exclude)] = False
+
+            for start, stop, columns in self._blocks(store, rows):
+                block = self._score_block(store, rows[start:stop], columns, allowed, exclude)
+                for position, recs in zip(positions[start:stop], block):
+                    results[position] = recs
+
+        return results
+
+    def score_pairs(self, pairs: Iterable[tuple[Track, Track, Optional[Direction]]]) -> ScoredPairs:
+        """
+        Score (current, candidate, direction) pairs with one `score_pairs`
+        call per factor and direction.
+
+        Direction-invariant factors are scored once over all pairs. A None
+        direction is read from the pair's energy change. Only pairs inside
+        the BPM filter get a `bpm_window`.
+        """
+        from .engine import _weighted_totals
+
+        engine = self.engine
+        config = engine.config
+        factors = config.factors
+        store = engine.features
+        pairs = list(pairs)
+
+        query_rows = np.empty(len(pairs), dtype=np.int64)
+        candidate_rows = np.empty(len(pairs), dtype=np.int64)
+        for p, (current, candidate, _) in enumerate(pairs):
+            for rows, track in ((query_rows, current), (candidate_rows, candidate)):
+                row = store.row_of.get(track.track_id)
+                if row is None or store.tracks[row] is not track:
+                    raise ValueError(f"Track not in the engine's corpus: {track.track_id}")
+                rows[p] = row
+        queries = store.view(query_rows)
+        candidates = store.view(candidate_rows)
+
+        # Unspecified directions follow the energy change, like the live split
+        directions = [Direction.UP, Direction.HOLD, Direction.DOWN]
+        delta = candidates.energy.astype(np.int64) - queries.energy
+        inferred = np.where(delta >= config.up_min_delta, 0, np.where(delta <= -config.down_min_delta, 2, 1))
+        codes = np.array([
+            inferred[p] if direction is None else directions.index(Direction(direction))
+            for p, (_, _, direction) in enumerate(pairs)
+        ], dtype=np.int64)
+
+        shared = {
+            i: factor.score_pairs(queries, candidates, Direction.HOLD)
+            for i, factor in enumerate(factors) if factor.direction_invariant
+        }
+        raw = np.empty((len(factors), len(pairs)))
+        totals = np.empty(len(pairs))
+        for code, direction in enumerate(directions):
+            at = np.flatnonzero(codes == code)
+            if not len(at):
+                continue
+            direction_queries = store.view(query_rows[at])
+            direction_candidates = store.view(candidate_rows[at])
+            for i, factor in enumerate(factors):
+                if i in shared:
+                    raw[i, at] = shared[i][at]
+                else:
+                    raw[i, at] = factor.score_pairs(direction_queries, direction_candidates, direction)
+            totals[at] = _weighted_totals(raw[:, at], factors)
+
+        within = (np.abs(candidates.bpm - queries.bpm) <= config.bpm_range).tolist()
+        return ScoredPairs(
+            engine,
+            config,
+            [current for current, _, _ in pairs],
+            [candidate for _, candidate, _ in pairs],
+            [directions[code] for code in codes.tolist()],
+            raw,
+            totals,
+            [config.bpm_range if admitted else None for admitted in within],
+        )
+
+    @staticmethod
+    def _history(seed: Track, exclude: list[str]) -> list[str]:
+        return [seed.track_id, *(track_id for track_id in exclude if track_id != seed.track_id)]
+
+    def _cell_bytes(self) -> int:
+        """Approximate peak bytes per seed × candidate cell (if every pair is admitted)."""
+        # BPM distance temporaries and masks, then per pair: indexes, factor scores and totals
+        return 20 + 8 * (len(self.engine.config.factors) + 6)
+
+    def _blocks(self, store: FeatureStore, rows: np.ndarray) -> Iterator[tuple[int, int, np.ndarray]]:
+        """
+        Split BPM-sorted seed rows into blocks under the memory cap.
+
+        Yields:
+            (start, stop, candidate columns) per block
+        """
+        config = self.engine.config
+        seed_bpm = store.bpm[rows]
+        # Same small margin as the BPM index query; the exact comparison happens in the mask
+        los = np.searchsorted(store.sorted_bpm, seed_bpm - config.bpm_range - 1e-9, "left")
+        his = np.searchsorted(store.sorted_bpm, seed_bpm + config.bpm_range + 1e-9, "right")
+        max_cells = max(1, int(config.batch_memory_mb * 2**20 / self._cell_bytes()))
+
+        start = 0
+        while start < len(rows):
+            stop = start + 1
+            useful = his[start] - los[start]
+            # Seeds are BPM-sorted, so the block's span is [first lo, last hi).
+            # Grow while it fits the cap and at least half the cells are in
+            # some seed's own window, so blocks stay BPM-local
+            while stop < len(rows):
+                cells = (stop + 1 - start) * (his[stop] - los[start])
+                if cells > max_cells or cells > 2 * (useful + his[stop] - los[stop]):
+                    break
+                useful += his[stop] - los[stop]
+                stop += 1
+            yield start, stop, store.bpm_order[los[start]:his[stop - 1]]
+            start = stop
+
+    def _score_block(
+        self,
+        store: FeatureStore,
+        seed_rows: np.ndarray,
+        columns: np.ndarray,
+        allowed: np.ndarray,
+        exclude: list[str],
+    ) -> list[BatchRecommendations]:
+        """Stages 1-4 for one block of seeds, over its admitted (seed, candidate) pairs."""
+        from .engine import _weighted_totals
+
+        engine = self.engine
+        config = engine.config
+        factors = config.factors
+        queries = store.view(seed_rows)
+        candidates = store.view(columns)
+
+        # Stage 1: Hard filters as a mask (same comparisons as the live filter)
+        admitted = np.abs(candidates.bpm[None, :] - queries.bpm[:, None]) <= config.bpm_range
+        admitted &= allowed[columns][None, :]
+        admitted &= columns[None, :] != seed_rows[:, None]
+        if not config.allow_key_clash:
+            admitted &= _KEY_ADMITS[queries.key[:, None] + 1, candidates.key[None, :] + 1]
+
+        # Admitted (seed, candidate) pairs, grouped by seed
+        pair_seed, pair_column = np.nonzero(admitted)
+        pair_queries = store.view(seed_rows[pair_seed])
+        pair_candidates = store.view(columns[pair_column])
+
+        # Stage 2: Direction of each pair from its energy delta
+        delta = pair_candidates.energy - pair_queries.energy
+        in_direction = {
+            Direction.UP: delta >= config.up_min_delta,
+            Direction.HOLD: np.abs(delta) <= config.hold_max_delta,
+            Direction.DOWN: delta <= -config.down_min_delta,
+        }
+
+        # Stage 3: Score pairs (direction-invariant factors once for all pairs)
+        shared = {
+            i: factor.score_pairs(pair_queries, pair_candidates, Direction.HOLD)
+            for i, factor in enumerate(factors) if factor.direction_invariant
+        }
+        seeds = queries.tracks
+        ranked: list[dict[Direction, ScoredPairs]] = [{} for _ in seeds]
+
+        for direction in Direction:
+            at = np.flatnonzero(in_direction[direction])
+            rows = columns[pair_column[at]]
+            direction_queries = store.view(seed_rows[pair_seed[at]])
+            direction_candidates = store.view(rows)
+
+            raw = np.empty((len(factors), len(at)))
+            for i, factor in enumerate(factors):
+                if i in shared:
+                    raw[i] = shared[i][at]
+                else:
+                    raw[i] = factor.score_pairs(direction_queries, direction_candidates, direction)
+            totals = _weighted_totals(raw, factors)
+
+            # Stage 4: Rank each seed's pairs
+            bounds = np.searchsorted(pair_seed[at], np.arange(len(seeds) + 1))
+            for q, seed in enumerate(seeds):
+                lo, hi = bounds[q], bounds[q + 1]
+                top = lo + select_top(totals[lo:hi], store.id_rank[rows[lo:hi]], config.top_n)
+                ranked[q][direction] = ScoredPairs(
+                    engine,
+                    config,
+                    [seed] * len(top),
+                    [store.tracks[row] for row in rows[top].tolist()],
+                    [direction] * len(top),
+                    raw[:, top],
+                    totals[top],
+                    [config.bpm_range] * len(top),
+                )
+
+        filtered_counts = admitted.sum(axis=1)
+        return [
+            BatchRecommendations(
+                current_track=seed,
+                up=ranked[q][Direction.UP],
+                hold=ranked[q][Direction.HOLD],
+                down=ranked[q][Direction.DOWN],
+                candidates_considered=len(store),
+                filtered_count=int(filtered_counts[q]),
+                recently_played=self._history(seed, exclude),
+            )
+            for q, seed in enumerate(seeds)
+        ]
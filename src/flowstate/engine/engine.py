@@ -1,11 +1,151 @@
 """Recommendation engine - 4-stage scoring pipeline."""
 
-from dataclasses import dataclass, field
-from typing import Optional
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Literal, Optional, Union
 
-from ..models import Corpus, Direction, Recommendations, ScoredTrack, Track
-from .camelot import get_compatible_keys
-from .factors import DEFAULT_FACTORS, ScoringFactor
+import numpy as np
+
+from ..models import Corpus, Direction, FactorScore, Plan, Recommendations, ScoredTrack, TempoMatch, Track
+from ..models.camelot import compatibility_mask, compatible_codes
+from .anytime import AnytimeScorer
+from .batch import BatchRecommendations, BatchRecommender, ScoredPairs
+from .factors import DEFAULT_FACTORS, WEIGHT_PRESETS, ScoringFactor
+from .features import CandidateView, FeatureStore
+from .graph import TransitionGraph
+from .instrumentation import PipelineMetrics, StageTimer
+from .parallel import ParallelScorer, supports_parallel
+from .planner import LookaheadPlanner
+from .ranking import select_top, skyline
+from .session import Session
+from .speculation import Speculator
+
+# Session used when callers don't name one (single-user API, recently_played)
+DEFAULT_SESSION = "default"
+
+# Categorical columns that group candidates into buckets for pruning
+BUCKET_COLUMNS = ("key", "vibe", "intensity", "groove", "energy")
+
+
+def _factor_reasons(
+    factors: list[ScoringFactor],
+    current: Track,
+    candidate: Track,
+    direction: Direction,
+) -> list[Optional[str]]:
+    """Per-factor reason strings for one candidate (the slow, per-pair path)."""
+    return [factor.score(current, candidate, direction).reason for factor in factors]
+
+
+def _weighted_totals(raw: np.ndarray, factors: list[ScoringFactor]) -> np.ndarray:
+    """Normalized (0-1) weighted totals of a factors × candidates raw score matrix."""
+    # Accumulated factor by factor, so every path produces bit-identical totals
+    total_weighted = np.zeros(raw.shape[1])
+    total_weight = 0.0
+    for i, factor in enumerate(factors):
+        total_weighted += raw[i] * factor.weight
+        total_weight += factor.weight
+    return total_weighted / total_weight if total_weight > 0 else total_weighted * 0
+
+
+class _ScoredPool:
+    """Scores for one direction's candidates, kept as plain arrays."""
+
+    __slots__ = ("direction", "rows", "raw", "totals", "pruned", "pruned_rows", "pruned_buckets")
+
+    def __init__(
+        self,
+        direction: Direction,
+        rows: np.ndarray,
+        raw: np.ndarray,
+        totals: np.ndarray,
+        pruned: Optional[np.ndarray] = None,
+        pruned_rows: Optional[np.ndarray] = None,
+        pruned_buckets: Optional[np.ndarray] = None,
+    ):
+        self.direction = direction
+        self.rows = rows  # feature store rows
+        self.raw = raw  # factors × candidates raw scores
+        self.totals = totals  # normalized weighted totals
+        # Skipped buckets: factors × buckets raw score bounds, their rows and each row's bucket
+        self.pruned = pruned
+        self.pruned_rows = pruned_rows
+        self.pruned_buckets = pruned_buckets
+
+
+class _ScoredSet:
+    """
+    Every scored candidate of one live recommendation, kept for re-ranking.
+
+    Raw factor scores don't depend on weights, so a weight change only
+    needs new totals from the kept matrices.
+    """
+
+    __slots__ = ("key", "pools", "filtered_count", "admitted")
+
+    def __init__(
+        self,
+        key: tuple,
+        pools: dict[Direction, _ScoredPool],
+        filtered_count: int,
+        admitted: dict[int, tuple[float, TempoMatch]],
+    ):
+        self.key = key
+        self.pools = pools
+        self.filtered_count = filtered_count
+        self.admitted = admitted
+
+
+class _Refinement:
+    """A background refinement and the (session, generation) selections waiting for it."""
+
+    __slots__ = ("job", "waiters")
+
+    def __init__(self):
+        self.job: Optional[Future] = None
+        self.waiters: list[tuple[Session, int]] = []
+
+    def wanted(self) -> bool:
+        """Whether any waiting session is still on the selection it waited from."""
+        return any(session.generation == generation for session, generation in self.waiters)
+
+
+class _RankedSet:
+    """
+    The best `pool_depth` candidates per direction of one recommendation.
+
+    Pools are in rank order. A history change only removes or restores
+    a few candidates, so the next entries can be promoted without
+    recomputing; a direction is `exhaustive` if its pool holds every
+    candidate.
+    """
+
+    __slots__ = ("key", "history", "pools", "exhaustive", "filtered_count", "admitted")
+
+    def __init__(
+        self,
+        key: tuple,
+        history: frozenset[str],
+        pools: dict[Direction, _ScoredPool],
+        exhaustive: dict[Direction, bool],
+        filtered_count: int,
+        admitted: dict[int, tuple[float, TempoMatch]],
+    ):
+        self.key = key
+        self.history = history
+        self.pools = pools
+        self.exhaustive = exhaustive
+        self.filtered_count = filtered_count
+        self.admitted = admitted
 
 
 @dataclass
@@ -16,6 +156,15 @@ class ScoringConfig:
     bpm_range: float = 6.0
     allow_key_clash: bool = False
 
+    # Adaptive BPM window: widen by bpm_step (up to max_bpm_range) until every
+    # direction has at least min_candidates (0 disables widening)
+    min_candidates: int = 0
+    bpm_step: float = 2.0
+    max_bpm_range: float = 16.0
+
+    # Also admit half/double-time matches (e.g. 70 <-> 140 BPM)
+    half_double_time: bool = False
+
     # Direction settings
     up_min_delta: int = 1
     up_max_delta: int = 3
@@ -32,6 +181,84 @@ class ScoringConfig:
     # Quality filters
     min_audio_fidelity: int = 0  # Set to 6 to filter out bad rips
 
+    # Result cache (number of recommendation sets kept; 0 disables)
+    cache_size: int = 128
+
+    # Lookahead planning latency budget (milliseconds)
+    plan_budget_ms: float = 50.0
+
+    # Background threads precomputing the shown candidates' recommendations
+    # (0 disables speculation; needs the result cache)
+    speculation_workers: int = 0
+
+    # Parallel scoring for very large libraries: candidate sets bigger than
+    # the threshold are split across worker processes (0 workers disables)
+    parallel_workers: int = 0
+    parallel_threshold: int = 20000
+
+    # Per-stage/per-factor timing on Recommendations.timing and engine.metrics
+    instrument: bool = False
+
+    # Memory cap for recommend_many's queries × candidates score blocks
+    batch_memory_mb: float = 256.0
+
+    # Anytime mode: return the best-so-far result once this many
+    # milliseconds have passed, refining it in the background (0 disables)
+    deadline_ms: float = 0.0
+
+    # Branch-and-bound: direction pools larger than this skip candidate
+    # buckets whose score bound can't reach the top N (0 disables)
+    prune_threshold: int = 2000
+
+    # Ranked candidates kept per direction for history patches and paging
+    pool_depth: int = 50
+
+    # Ranking: "weighted" (top N by weighted total) or "pareto" (every candidate
+    # no other one beats on all of pareto_factors, best weighted total first)
+    ranking: Literal["weighted", "pareto"] = "weighted"
+    pareto_factors: tuple[str, ...] = ()  # Factor names (default: every weighted factor)
+
+    # Settings that change how results are computed, not what they are
+    RUNTIME_SETTINGS = (
+        "cache_size", "plan_budget_ms", "speculation_workers", "parallel_workers", "parallel_threshold",
+        "instrument", "batch_memory_mb", "prune_threshold", "deadline_ms", "pool_depth",
+    )
+
+    def __post_init__(self):
+        if self.ranking not in ("weighted", "pareto"):
+            raise ValueError(f"Unknown ranking: {self.ranking!r} (expected 'weighted' or 'pareto')")
+        self.pareto_factors = tuple(self.pareto_factors)
+        names = {factor.name for factor in self.factors}
+        for name in self.pareto_factors:
+            if name not in names:
+                raise ValueError(f"Unknown factor: {name}")
+
+    @property
+    def pareto(self) -> bool:
+        """Whether results are Pareto fronts rather than the weighted top N."""
+        return self.ranking == "pareto"
+
+    @property
+    def adaptive_bpm(self) -> bool:
+        """Whether the BPM filter can admit candidates outside bpm_range."""
+        return self.min_candidates > 0 or self.half_double_time
+
+    def fingerprint(self, weights: bool = True) -> tuple:
+        """
+        Hashable snapshot of every result-affecting setting.
+
+        Args:
+            weights: Include factor weights (False identifies the raw scores only)
+        """
+        settings = tuple(
+            getattr(self, f.name) for f in fields(self)
+            if f.name != "factors" and f.name not in self.RUNTIME_SETTINGS
+        )
+        factors = tuple(
+            (type(f).__qualname__, f.name, f.weight if weights else None) for f in self.factors
+        )
+        return settings + (factors,)
+
 
 class RecommendationEngine:
     """
@@ -40,137 +267,1412 @@ class RecommendationEngine:
     2. Direction split (UP/HOLD/DOWN based on energy)
     3. Soft scoring (weighted factors)
     4. Rank and return top N
+
+    Play history lives in sessions keyed by client or deck. Everything
+    they share (feature store, indexes, graph) is immutable and swapped
+    atomically on corpus changes, so concurrent recommend() calls for
+    different sessions don't lock each other out. Weight changes swap in
+    a new config the same way, and each call computes (and caches) under
+    the config it started with.
     """
 
     def __init__(self, corpus: Corpus, config: Optional[ScoringConfig] = None):
         self.corpus = corpus
-        self.config = config or ScoringConfig()
-        self.recently_played: list[str] = []
+        self._config = config or ScoringConfig()
+        self._config_lock = threading.Lock()
+        self._pinned = threading.local()
         self.max_history = 20
+        self.max_sessions = 256
+        self._sessions: dict[str, Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._store: Optional[FeatureStore] = None
+        self._store_lock = threading.Lock()
+        self.graph: Optional[TransitionGraph] = None
+        self._planner = LookaheadPlanner(self)
+        self._batch = BatchRecommender(self)
+        self._anytime = AnytimeScorer(self)
+
+        # Background completion of partial (deadline-bound) results
+        self._refiner: Optional[ThreadPoolExecutor] = None
+        self._refining: dict[tuple, Future] = {}
+        self._refining_lock = threading.Lock()
+
+        # LRU cache of results keyed on (track, history, config, corpus version)
+        self._cache: OrderedDict[tuple, Recommendations] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._speculator = Speculator(self)
+        self._parallel: Optional[ParallelScorer] = None
+
+        # Rolling timing histograms (filled only when config.instrument is on)
+        self.metrics = PipelineMetrics()
+
+    @property
+    def config(self) -> ScoringConfig:
+        """Scoring configuration (inside a call: the one that call started with)."""
+        pinned = getattr(self._pinned, "config", None)
+        return pinned if pinned is not None else self._config
+
+    @config.setter
+    def config(self, config: ScoringConfig) -> None:
+        self._config = config
+
+    @contextmanager
+    def _snapshot(self, config: Optional[ScoringConfig] = None) -> Iterator[ScoringConfig]:
+        """
+        Pin this thread's config for one computation (nested calls keep the outer one).
+
+        Weight changes replace the config rather than mutate its factors,
+        so a pinned config never changes under a running computation.
+        """
+        outer = getattr(self._pinned, "config", None)
+        if outer is None:
+            self._pinned.config = config or self._config
+        try:
+            yield self._pinned.config
+        finally:
+            self._pinned.config = outer
+
+    @property
+    def features(self) -> FeatureStore:
+        """Columnar feature store, updated (or rebuilt) once per corpus version."""
+        store = self._store
+        if store is None or store.version != self.corpus.version:
+            with self._store_lock:
+                store = self._store
+                if store is None or store.version != self.corpus.version:
+                    # Built off to the side, then published with one assignment
+                    store = FeatureStore.from_corpus(self.corpus, base=store)
+                    self._store = store
+                    self.clear_cache()
+        return store
+
+    def session(self, session_id: Optional[str] = None) -> Session:
+        """Get (or create) the play history of a client or deck."""
+        session_id = session_id or DEFAULT_SESSION
+        session = self._sessions.get(session_id)
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    self._evict_sessions(self.max_sessions - 1)
+                    session = self._sessions[session_id] = Session(session_id, self.max_history)
+        return session
+
+    def end_session(self, session_id: str) -> None:
+        """Forget a session's history and cancel its speculation."""
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+        self._speculator.forget(session_id)
+
+    def _evict_sessions(self, keep: int) -> None:
+        """Drop the least recently used sessions beyond `keep` (caller holds the lock)."""
+        idle = sorted(
+            (s for s in self._sessions.values() if s.session_id != DEFAULT_SESSION),
+            key=lambda s: s.last_used,
+        )
+        for session in idle[:max(0, len(self._sessions) - keep)]:
+            del self._sessions[session.session_id]
+            self._speculator.forget(session.session_id)
+
+    def session_info(self) -> list[dict]:
+        """History size and idle time of every session."""
+        return [session.info() for session in list(self._sessions.values())]
+
+    @property
+    def recently_played(self) -> list[str]:
+        """The default session's history, most recent first."""
+        return self.session().history
+
+    @recently_played.setter
+    def recently_played(self, track_ids: list[str]) -> None:
+        self.session().history = list(track_ids)
+
+    def clear_cache(self) -> None:
+        """Drop all cached recommendation sets (and cancel speculation for them)."""
+        self._speculator.cancel()
+        with self._cache_lock:
+            self._cache.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        """Cache hit/miss counters and current size."""
+        with self._cache_lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "size": len(self._cache),
+                "max_size": self.config.cache_size,
+            }
+
+    def timing_summary(self, buckets: bool = False) -> dict:
+        """Rolling per-stage/per-factor timings (needs config.instrument)."""
+        return self.metrics.summary(buckets)
+
+    def speculation_info(self) -> dict[str, float]:
+        """Speculative precomputation hit rate and wasted-work counters."""
+        return self._speculator.info()
+
+    def close(self) -> None:
+        """Stop background speculation, refinement and parallel scoring workers."""
+        self._speculator.shutdown()
+        if self._refiner is not None:
+            self._refiner.shutdown(wait=False, cancel_futures=True)
+            self._refiner = None
+        if self._parallel is not None:
+            self._parallel.shutdown()
+            self._parallel = None
+
+    def load_graph(self, path: str | Path) -> bool:
+        """
+        Attach a transition graph sidecar built by `flowstate corpus build-graph`.
+
+        Returns:
+            True if the graph matches the current corpus and config
+        """
+        self.graph = TransitionGraph.load(path)
+        self.clear_cache()
+        return self.graph.matches(self.features, self.config)
+
+    def add_to_history(self, track_id: str, session: Optional[str] = None) -> list[str]:
+        """Add track to a session's recently played history (returns the new history)."""
+        return self.session(session).add(track_id)
+
+    def recommend(
+        self,
+        current: Track,
+        session: Optional[str] = None,
+        deadline_ms: Optional[float] = None,
+        on_complete: Optional[Callable[[Recommendations], None]] = None,
+    ) -> Recommendations:
+        """
+        Generate recommendations for all directions.
+
+        With a deadline, candidates are scored nearest-BPM/best-key first
+        and the best so far is returned when time runs out, flagged
+        `partial`. Filtering isn't interrupted, and each direction's best
+        few candidates are scored even past the deadline, so a deadline
+        shorter than that overruns rather than returning nothing. The full
+        result is then computed in the background, cached, and passed to
+        `on_complete`.
+
+        Args:
+            current: Track playing now
+            session: Client or deck whose history to use and extend
+                (default: the engine's default session)
+            deadline_ms: Latency budget (default: config.deadline_ms; 0 disables)
+            on_complete: Called with the refined result if this call
+                returned a partial one (from a background thread, unless
+                the refinement has already finished)
+        """
+        with self._snapshot():
+            return self._recommend(current, session, deadline_ms, on_complete)
+
+    def _recommend(
+        self,
+        current: Track,
+        session: Optional[str],
+        deadline_ms: Optional[float],
+        on_complete: Optional[Callable[[Recommendations], None]],
+    ) -> Recommendations:
+        if deadline_ms is None:
+            deadline_ms = self.config.deadline_ms
+        deadline = time.perf_counter() + deadline_ms / 1000 if deadline_ms > 0 else None
+        timer = StageTimer() if self.config.instrument else None
+        session = self.session(session)
+
+        # Add current to history (this call works on its own snapshot)
+        history, generation = session.select(current.track_id)
+        if self._refining:
+            self._supersede_refinements()
+        store = self.features
+
+        key = (
+            current.track_id,
+            frozenset(history),
+            self.config.fingerprint(),
+            store.version,
+        )
+        # The track changed: stop speculating about the previous candidates
+        in_flight = self._speculator.observe(key, session.session_id)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            recs = cached.model_copy(update={
+                "recently_played": history.copy(),
+                "timing": timer.finish("cache") if timer else None,
+            })
+        else:
+            recs = self._await(in_flight, deadline) if in_flight is not None else None
+            if recs is not None:
+                if timer:
+                    recs.timing = timer.finish("speculation")
+            else:
+                recs = self._patch(current, store, history, session, timer)
+                if recs is None:
+                    recs = self._rerank(current, store, history, session, timer)
+                if recs is None:
+                    recs = self._compute(current, store, history.copy(), timer, session, deadline)
+            if recs.partial:
+                self._refine(key, current, store, history, session, generation, on_complete)
+            else:
+                self._cache_put(key, recs)
+
+        if timer:
+            self.metrics.record(recs.timing)
+
+        self._speculator.speculate(recs, store, history, session.session_id)
+        if recs.partial:
+            # Partial results stop short of the deadline by the anytime scorer's reserve
+            self._anytime.finished()
+        return recs
+
+    @staticmethod
+    def _await(job: Future, deadline: Optional[float]) -> Optional[Recommendations]:
+        """A speculative job's result, or None if the deadline passes first."""
+        timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+        try:
+            return job.result(timeout=timeout)
+        except FutureTimeout:
+            return None
+
+    def _refine(
+        self,
+        key: tuple,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        session: Session,
+        generation: int,
+        on_complete: Optional[Callable[[Recommendations], None]],
+    ) -> None:
+        """
+        Compute the full result for a partial one in the background.
+
+        Callers of the same key share one refinement. It is cancelled (or
+        skipped) once every caller's session has selected another track,
+        and only sessions still on their selection get its result.
+        """
+        with self._refining_lock:
+            refinement = self._refining.get(key)
+            if refinement is None:
+                if self._refiner is None:
+                    self._refiner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="refine")
+                refinement = self._refining[key] = _Refinement()
+                refinement.waiters.append((session, generation))
+                refinement.job = self._refiner.submit(
+                    self._run_refinement, key, self.config, current, store, history
+                )
+            else:
+                refinement.waiters.append((session, generation))
+
+        if on_complete is not None:
+            # Also when another caller started the refinement
+            def complete(done: Future) -> None:
+                if done.cancelled() or done.exception() is not None or done.result() is None:
+                    return
+                if session.generation == generation:
+                    on_complete(done.result())
+
+            refinement.job.add_done_callback(complete)
+
+    def _supersede_refinements(self) -> None:
+        """Cancel queued refinements that no session is waiting for any more."""
+        with self._refining_lock:
+            for key, refinement in list(self._refining.items()):
+                if not refinement.wanted() and refinement.job.cancel():
+                    del self._refining[key]
+
+    def _run_refinement(
+        self,
+        key: tuple,
+        config: ScoringConfig,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+    ) -> Optional[Recommendations]:
+        """A refinement job: the full result, or None if it was superseded before starting."""
+        try:
+            with self._refining_lock:
+                if not self._refining[key].wanted():
+                    return None
+
+            # Under the config the key was made from, whatever the weights are now.
+            # Kept sets go to a scratch session, then to the callers still on this track
+            scratch = Session("refinement")
+            with self._snapshot(config):
+                recs = self._compute(current, store, history.copy(), session=scratch)
+            self._cache_put(key, recs)
+        finally:
+            with self._refining_lock:
+                waiters = self._refining.pop(key).waiters
+        for session, generation in waiters:
+            session.adopt(generation, scratch.scored, scratch.ranked)
+        return recs
+
+    def recommend_many(
+        self, seeds: list[Track], exclude: Iterable[str] = ()
+    ) -> list[Union[BatchRecommendations, Recommendations]]:
+        """
+        Recommendations for many seed tracks, scored in vectorized blocks.
+
+        Side-effect free: the play history, result cache and speculation
+        are untouched. Each seed is treated as just played, with `exclude`
+        as its history.
+
+        Args:
+            seeds: Seed tracks (e.g. a whole playlist)
+            exclude: Track IDs never to recommend
+
+        Returns:
+            One result per seed, in seed order. Batch-scored seeds return
+            BatchRecommendations, which build ScoredTrack models only for
+            the entries read (`materialize()` gives a Recommendations)
+        """
+        with self._snapshot():
+            return self._batch.recommend_many(seeds, exclude)
+
+    def score_pairs(self, pairs: Iterable[tuple[Track, Track, Optional[Direction]]]) -> ScoredPairs:
+        """
+        Score arbitrary (current, candidate, direction) transitions at once.
+
+        Every pair is scored as given, hard filters aside (e.g. each
+        transition of a prepared playlist). Side-effect free, like
+        recommend_many.
+
+        Args:
+            pairs: (current, candidate, direction) tuples; a None direction
+                follows the energy change (UP, DOWN, or HOLD within the
+                configured deltas)
+
+        Returns:
+            One entry per pair, in pair order: scores as arrays, with each
+            pair's ScoredTrack built when it is indexed. Only pairs inside
+            the BPM filter get a `bpm_window`
+
+        Raises:
+            ValueError: A track isn't in the engine's corpus
+        """
+        with self._snapshot():
+            return self._batch.score_pairs(pairs)
+
+    def _cache_get(self, key: tuple) -> Optional[Recommendations]:
+        """Look up a result, counting the hit or miss."""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            return cached
+
+    def _cache_contains(self, key: tuple) -> bool:
+        with self._cache_lock:
+            return key in self._cache
+
+    def _cache_put(self, key: tuple, recs: Recommendations) -> None:
+        if self.config.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = recs
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
+
+    def plan(
+        self,
+        current: Track,
+        depth: int = 3,
+        beam: int = 20,
+        budget_ms: Optional[float] = None,
+        session: Optional[str] = None,
+    ) -> Plan:
+        """
+        Look several transitions ahead with beam search.
+
+        Does not touch the play history. Paths avoid the session's recently
+        played tracks and never repeat a track.
+
+        Args:
+            current: Track playing now
+            depth: Number of upcoming tracks to plan (3-5 is practical)
+            beam: Partial sequences kept at each step
+            budget_ms: Latency budget (default: config.plan_budget_ms; 0 disables)
+            session: Client or deck whose history to avoid
+        """
+        with self._snapshot() as config:
+            if budget_ms is None:
+                budget_ms = config.plan_budget_ms
+            return self._planner.plan(current, self.session(session).history, depth, beam, budget_ms)
+
+    def _compute(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        timer: Optional[StageTimer] = None,
+        session: Optional[Session] = None,
+        deadline: Optional[float] = None,
+    ) -> Recommendations:
+        """
+        Run the full pipeline for a track against a given play history.
+
+        If a session is given, the live path's scored pools are kept on it
+        for re-ranking after weight changes, and its deeper ranked pools
+        for history patches and paging. With a deadline (a
+        time.perf_counter() value) scoring stops when it passes and the
+        result is flagged partial.
+        """
+        if self.graph is not None and not self.config.pareto:
+            recs = self._from_graph(current, store, history)
+            if recs is not None:
+                if timer:
+                    timer.lap("graph")
+                    timer.count("filter", recs.filtered_count)
+                    recs.timing = timer.finish("graph")
+                return recs
+
+        # Stages 1-2: Filter and split
+        rows, filtered_count, admitted = self._filter_and_split(current, store, history, timer)
+
+        # Stage 3: Score (large candidate sets in parallel, pre-trimmed to top N;
+        # under a deadline in priority order, possibly not all of them).
+        # A Pareto front can hold any candidate, so nothing is trimmed or pruned
+        complete = True
+        keeping = None
+        pareto = self.config.pareto
+        if deadline is not None and self._anytime.fits(rows, deadline):
+            deadline = None  # Scoring (and pruning) everything at once should make it
+        parallel = self._parallel_scorer(filtered_count) if deadline is None and not pareto else None
+        if parallel is not None:
+            pools = parallel.score(current, store, self.config, rows)
+        else:
+            if deadline is not None:
+                pools, complete = self._anytime.score(current, store, rows, deadline, timer)
+            else:
+                keep = None if pareto else self._pool_depth() if session is not None else self.config.top_n
+                start = time.perf_counter()
+                pools = self._score_directions(current, store, rows, timer, keep=keep)
+                # Tells later deadline-bound calls whether they can score everything at once
+                self._anytime.measure_full(sum(len(r) for r in rows.values()), time.perf_counter() - start)
+            if session is not None and complete:
+                key = self._scored_key(current, store, history)
+                session.scored = _ScoredSet(key, pools, filtered_count, admitted)
+                keeping = session
+        if timer:
+            timer.lap("score")
+
+        # Stage 4: Rank and keep top N
+        recs = self._assemble(current, store, history, pools, filtered_count, admitted, keeping)
+        recs.partial = not complete
+        if timer:
+            timer.lap("rank")
+            timer.count("ranked", len(recs.all_recommendations()))
+            source = "parallel" if parallel is not None else "live" if complete else "anytime"
+            recs.timing = timer.finish(source)
+        return recs
+
+    def _assemble(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        pools: dict[Direction, _ScoredPool],
+        filtered_count: int,
+        admitted: dict[int, tuple[float, TempoMatch]],
+        session: Optional[Session] = None,
+        exhaustive: Optional[dict[Direction, bool]] = None,
+    ) -> Recommendations:
+        """
+        Stage 4: Rank every direction's pool into a Recommendations.
+
+        With a session, each direction's top `pool_depth` is kept on it as
+        well (see _patch and more). `exhaustive` overrides which pools
+        are known to hold every candidate. In Pareto mode each direction
+        lists its whole front instead.
+        """
+        pareto = self.config.pareto
+        if pareto:
+            session = None  # Dropping a front member can promote anything it dominated
+        top_n = self.config.top_n
+        depth = self._pool_depth() if session is not None else top_n
+        ranked = {}
+        kept = {}
+        for direction, pool in pools.items():
+            if pareto:
+                ranked[direction] = self._build_results(current, store, pool, self._skyline(store, pool), admitted)
+                continue
+            # Partial selection; equal scores are ordered by track ID
+            order = select_top(pool.totals, store.id_rank[pool.rows], depth)
+            ranked[direction] = self._build_results(current, store, pool, order[:top_n], admitted)
+            if session is not None:
+                kept[direction] = _ScoredPool(direction, pool.rows[order], pool.raw[:, order], pool.totals[order])
+
+        if session is not None:
+            if exhaustive is None:
+                exhaustive = {
+                    direction: len(kept[direction].rows) == len(pool.rows)
+                    and (pool.pruned_rows is None or not len(pool.pruned_rows))
+                    for direction, pool in pools.items()
+                }
+            session.ranked = _RankedSet(
+                self._ranked_key(current, store), frozenset(history), kept, exhaustive, filtered_count, admitted,
+            )
 
-    def add_to_history(self, track_id: str) -> None:
-        """Add track to recently played history."""
-        if track_id in self.recently_played:
-            self.recently_played.remove(track_id)
-        self.recently_played.insert(0, track_id)
-        self.recently_played = self.recently_played[:self.max_history]
+        return Recommendations(
+            current_track=current,
+            up=ranked[Direction.UP],
+            hold=ranked[Direction.HOLD],
+            down=ranked[Direction.DOWN],
+            candidates_considered=len(store),
+            filtered_count=filtered_count,
+            recently_played=history,
+        )
+
+    def _skyline(self, store: FeatureStore, pool: _ScoredPool) -> np.ndarray:
+        """Pool entries on the Pareto front of the pareto factors, best weighted total first."""
+        front = skyline(pool.raw[self._pareto_factors()].T)
+        return front[np.lexsort((store.id_rank[pool.rows[front]], -pool.totals[front]))]
+
+    def _pareto_factors(self) -> list[int]:
+        """Indexes of the factors a Pareto front is taken over."""
+        factors = self.config.factors
+        if not self.config.pareto_factors:
+            return [i for i, f in enumerate(factors) if f.weight > 0] or list(range(len(factors)))
+
+        index = {factor.name: i for i, factor in enumerate(factors)}
+        return [index[name] for name in self.config.pareto_factors]
+
+    def _pool_depth(self) -> int:
+        """Ranked candidates kept per direction (never fewer than shown)."""
+        return max(self.config.top_n, self.config.pool_depth)
+
+    def _scored_key(self, current: Track, store: FeatureStore, history: list[str]) -> tuple:
+        """What a kept scored set depends on: everything but the factor weights."""
+        return (current.track_id, frozenset(history), self.config.fingerprint(weights=False), store.version)
+
+    def _ranked_key(self, current: Track, store: FeatureStore) -> tuple:
+        """What a kept ranked set depends on, history aside."""
+        return (current.track_id, self.config.fingerprint(), store.version)
+
+    def _patch(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        session: Session,
+        timer: Optional[StageTimer] = None,
+    ) -> Optional[Recommendations]:
+        """
+        Patch a session's kept ranked set after a history-only change.
+
+        Newly played tracks are dropped from each direction's pool and the
+        next entries move up; tracks that fell out of the history are
+        scored and merged back in. Entries ranked below the pool's old
+        last one may be missing candidates that were never kept, so they
+        are cut off. Returns None if the set was ranked for another track,
+        corpus or setting, or no longer covers the top N.
+        """
+        ranked = session.ranked
+        if ranked is None or ranked.key != self._ranked_key(current, store):
+            return None
+        if self.config.adaptive_bpm:
+            return None  # Removing a candidate can widen the BPM window
+
+        now = frozenset(history)
+        played = store.rows_for(now - ranked.history)
+        returned = store.rows_for(ranked.history - now)
+        filtered_count = ranked.filtered_count - int(self._admits(current, store, played).sum())
+
+        # Restored candidates rejoin their energy's directions
+        returned = returned[self._admits(current, store, returned)]
+        filtered_count += len(returned)
+        by_energy: dict[int, list[int]] = {}
+        for row in returned.tolist():
+            by_energy.setdefault(int(store.energy[row]), []).append(row)
+        up, hold, down = self._split_directions(
+            current, {energy: np.sort(rows) for energy, rows in by_energy.items()}
+        )
+        restored = {
+            direction: rows
+            for direction, rows in ((Direction.UP, up), (Direction.HOLD, hold), (Direction.DOWN, down))
+            if len(rows)
+        }
+        extra = self._score_rows(current, store, restored) if restored else {}
+
+        top_n = self.config.top_n
+        depth = self._pool_depth()
+        pools = {}
+        exhaustive = {}
+        for direction, pool in ranked.pools.items():
+            keep = ~np.isin(pool.rows, played)
+            rows, raw, totals = pool.rows[keep], pool.raw[:, keep], pool.totals[keep]
+            if direction in extra:
+                rows = np.concatenate([rows, extra[direction].rows])
+                raw = np.concatenate([raw, extra[direction].raw], axis=1)
+                totals = np.concatenate([totals, extra[direction].totals])
+            id_rank = store.id_rank[rows]
+            order = select_top(totals, id_rank, len(totals))
 
-    def recommend(self, current: Track) -> Recommendations:
-        """Generate recommendations for all directions."""
+            if not ranked.exhaustive[direction]:
+                # Only entries ranked at or above the old last one are certain
+                last_total, last_rank = pool.totals[-1], store.id_rank[pool.rows[-1]]
+                certain = int(((totals > last_total) | ((totals == last_total) & (id_rank <= last_rank))).sum())
+                if certain < top_n:
+                    return None
+                order = order[:certain]
+            exhaustive[direction] = ranked.exhaustive[direction] and len(order) <= depth
+            order = order[:depth]
+            pools[direction] = _ScoredPool(direction, rows[order], raw[:, order], totals[order])
+        if timer:
+            timer.lap("patch")
+            timer.count("patch", len(played) + len(returned))
 
-        # Add current to history
-        self.add_to_history(current.track_id)
+        recs = self._assemble(
+            current, store, history.copy(), pools, filtered_count, ranked.admitted, session, exhaustive,
+        )
+        if timer:
+            timer.lap("rank")
+            timer.count("ranked", len(recs.all_recommendations()))
+            recs.timing = timer.finish("patch")
+        return recs
+
+    def more(
+        self,
+        current: Track,
+        direction: Direction,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        session: Optional[str] = None,
+    ) -> list[ScoredTrack]:
+        """
+        Page further down one direction's ranking ("show more").
+
+        Reads the session's kept ranked set from its last recommendation
+        for `current`, recomputing it if it's missing or stale. Only the
+        top `pool_depth` are kept, so pages past it come back short.
+
+        Args:
+            current: Track the recommendations are for
+            direction: Which direction to page through
+            offset: Rank to start at (0 is the best)
+            limit: Number of tracks (default: config.top_n)
+            session: Client or deck whose history to use
+        """
+        with self._snapshot():
+            return self._more(current, direction, offset, limit, self.session(session))
+
+    def _more(
+        self,
+        current: Track,
+        direction: Direction,
+        offset: int,
+        limit: Optional[int],
+        session: Session,
+    ) -> list[ScoredTrack]:
+        if limit is None:
+            limit = self.config.top_n
+        store = self.features
+        history = session.history
+
+        ranked = session.ranked
+        if ranked is None or ranked.key != self._ranked_key(current, store) or ranked.history != frozenset(history):
+            recs = self._compute(current, store, history, session=session)
+            ranked = session.ranked
+            if ranked is None or ranked.key != self._ranked_key(current, store):
+                # Not kept (graph, parallel scorer or Pareto front): page the shown results
+                return recs.get_direction(direction)[offset:offset + limit]
+
+        pool = ranked.pools[direction]
+        order = np.arange(min(offset, len(pool.rows)), min(offset + limit, len(pool.rows)))
+        return self._build_results(current, store, pool, order, ranked.admitted)
+
+    def _rerank(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        session: Session,
+        timer: Optional[StageTimer] = None,
+    ) -> Optional[Recommendations]:
+        """
+        Re-rank a session's kept scored set under the current weights.
+
+        One weighted sum over each direction's raw score matrix replaces
+        stages 1-3 (plus scoring any pruned buckets the new weights bring
+        within reach). Returns None if the set was scored for another
+        track, history, corpus or setting.
+        """
+        scored = session.scored
+        if scored is None or scored.key != self._scored_key(current, store, history):
+            return None
+
+        factors = self.config.factors
+        pools = {}
+        for direction, pool in scored.pools.items():
+            pool = _ScoredPool(
+                direction, pool.rows, pool.raw, _weighted_totals(pool.raw, factors),
+                pool.pruned, pool.pruned_rows, pool.pruned_buckets,
+            )
+            if pool.pruned is not None:
+                pool = self._unprune(current, store, pool)
+                scored.pools[direction] = pool  # Later re-ranks start from the wider pool
+            pools[direction] = pool
+        if timer:
+            timer.lap("score")
+
+        recs = self._assemble(current, store, history.copy(), pools, scored.filtered_count, scored.admitted, session)
+        if timer:
+            timer.lap("rank")
+            timer.count("ranked", len(recs.all_recommendations()))
+            recs.timing = timer.finish("rerank")
+        return recs
+
+    def _score_candidates(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+    ) -> tuple[dict[Direction, "_ScoredPool"], int]:
+        """Stages 1-3: Scored candidate pools per direction, plus the filtered count."""
+        rows, filtered_count, _ = self._filter_and_split(current, store, history)
+        return self._score_directions(current, store, rows), filtered_count
+
+    def _filter_and_split(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        timer: Optional[StageTimer] = None,
+    ) -> tuple[dict[Direction, np.ndarray], int, dict[int, tuple[float, TempoMatch]]]:
+        """
+        Stages 1-2: Candidate rows per direction, plus the filtered count.
+
+        The third value maps rows admitted outside the plain BPM window to
+        the window and tempo match that admitted them.
+        """
 
         # Stage 1: Hard filters
-        candidates = self._hard_filter(current)
+        by_energy = self._hard_filter(current, store, history)
+        filtered_count = sum(len(rows) for rows in by_energy.values())
+        if timer:
+            timer.lap("filter")
+            timer.count("filter", filtered_count)
 
         # Stage 2: Split by direction
-        up_candidates = []
-        hold_candidates = []
-        down_candidates = []
+        up_rows, hold_rows, down_rows = self._split_directions(current, by_energy)
 
-        for candidate in candidates:
-            delta = candidate.energy - current.energy
+        rows = {Direction.UP: up_rows, Direction.HOLD: hold_rows, Direction.DOWN: down_rows}
+        if timer:
+            timer.lap("split")
 
-            if delta >= self.config.up_min_delta:
-                up_candidates.append(candidate)
-            if abs(delta) <= self.config.hold_max_delta:
-                hold_candidates.append(candidate)
-            if delta <= -self.config.down_min_delta:
-                down_candidates.append(candidate)
+        admitted: dict[int, tuple[float, TempoMatch]] = {}
+        if self.config.adaptive_bpm:
+            filtered_count += self._widen_bpm_window(current, store, history, rows, admitted)
+            if timer:
+                timer.lap("widen")
+                timer.count("widen", len(admitted))
+
+        if timer:
+            for direction, direction_rows in rows.items():
+                timer.count(direction.value, len(direction_rows))
+        return rows, filtered_count, admitted
 
-        # Stage 3 & 4: Score and rank each direction
-        up_scored = self._score_and_rank(current, up_candidates, Direction.UP)
-        hold_scored = self._score_and_rank(current, hold_candidates, Direction.HOLD)
-        down_scored = self._score_and_rank(current, down_candidates, Direction.DOWN)
+    def _parallel_scorer(self, candidate_count: int) -> Optional[ParallelScorer]:
+        """The process pool to use for this many candidates, or None to score serially."""
+        workers = self.config.parallel_workers
+        if workers <= 1 or candidate_count <= self.config.parallel_threshold:
+            return None
+        if not supports_parallel(self.config.factors):
+            return None  # Per-pair factors need Track objects
+
+        if self._parallel is None or self._parallel.workers != workers:
+            if self._parallel is not None:
+                self._parallel.shutdown()
+            self._parallel = ParallelScorer(workers)
+        return self._parallel
+
+    def _from_graph(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+    ) -> Optional[Recommendations]:
+        """
+        Serve recommendations from the precomputed transition graph.
+
+        Returns None (live scoring) if the graph is stale, doesn't know the
+        track, or has too few successors left once history is removed.
+        """
+        if self.config.adaptive_bpm:
+            return None  # Window widening depends on the play history
+
+        graph = self.graph
+        row = store.row_of.get(current.track_id)
+        if row is None or graph.k < self.config.top_n or not graph.matches(store, self.config):
+            return None
+
+        excluded = np.unique(store.rows_for(history))
+        excluded = excluded[excluded != row]
+        ranked = {}
+        for direction in Direction:
+            successors = graph.successors(row, direction)
+            rows = successors[~np.isin(successors, excluded)][:self.config.top_n]
+            if len(rows) < self.config.top_n and len(successors) == graph.k:
+                return None  # Truncated list ran out; live scoring may find more
+
+            # Rescoring K rows is cheap and yields the same totals as the build
+            pool = self._score(current, store.view(rows), direction)
+            ranked[direction] = self._build_results(current, store, pool, np.arange(len(rows)))
 
         return Recommendations(
             current_track=current,
-            up=up_scored[:self.config.top_n],
-            hold=hold_scored[:self.config.top_n],
-            down=down_scored[:self.config.top_n],
-            candidates_considered=len(self.corpus.tracks),
-            filtered_count=len(candidates),
-            recently_played=self.recently_played.copy(),
+            up=ranked[Direction.UP],
+            hold=ranked[Direction.HOLD],
+            down=ranked[Direction.DOWN],
+            candidates_considered=len(store),
+            filtered_count=int(graph.candidate_counts[row] - self._admits(current, store, excluded).sum()),
+            recently_played=history,
         )
 
-    def _hard_filter(self, current: Track) -> list[Track]:
-        """Stage 1: Apply hard filters."""
-        candidates = []
+    def _hard_filter(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+    ) -> dict[int, np.ndarray]:
+        """Stage 1: Apply hard filters, returning surviving rows grouped by energy."""
+        # Skip same track and recently played
+        excluded = store.rows_for([current.track_id, *history])
+
+        return self._bpm_band(store, self._filter_keys(current), excluded, current.bpm, -1.0, self.config.bpm_range)
 
-        # Get compatible keys
-        compatible_keys = get_compatible_keys(current.key, extended=True)
-        if self.config.allow_key_clash:
-            compatible_keys = None  # Allow all keys
+    def _filter_keys(self, current: Track) -> Optional[list[int]]:
+        """Key codes a candidate may have, or None to allow all keys."""
+        # Key filter (must be compatible) - only compatible key buckets are read
+        keys = compatible_codes(current.key_code, extended=True)
+        if not keys or self.config.allow_key_clash:
+            return None
+        return keys
 
-        for track in self.corpus.tracks:
-            # Skip same track
-            if track.track_id == current.track_id:
-                continue
+    def _bpm_band(
+        self,
+        store: FeatureStore,
+        keys: Optional[list[int]],
+        excluded: np.ndarray,
+        center: float,
+        inner: float,
+        outer: float,
+    ) -> dict[int, np.ndarray]:
+        """
+        Rows with inner < |bpm - center| <= outer that pass the other hard
+        filters, grouped by energy (inner < 0 reads the whole window).
 
-            # Skip recently played
-            if track.track_id in self.recently_played:
-                continue
+        Only the band itself is read from the store's (key, BPM) index, with
+        a small margin so the exact comparison below decides boundary cases.
+        """
+        if inner < 0:
+            segments = [(center - outer, center + outer)]
+        else:
+            segments = [(center - outer, center - inner), (center + inner, center + outer)]
+        rows = np.concatenate([store.bpm_range_rows(lo - 1e-9, hi + 1e-9, keys) for lo, hi in segments])
 
-            # BPM filter (within range)
-            bpm_diff = abs(track.bpm - current.bpm)
-            if bpm_diff > self.config.bpm_range:
-                continue
+        distance = np.abs(store.bpm[rows] - center)
+        keep = distance <= outer
+        if inner >= 0:
+            keep &= distance > inner
+        keep &= store.audio_fidelity[rows] >= self.config.min_audio_fidelity
+        keep &= ~np.isin(rows, excluded)
+        rows = rows[keep]
 
-            # Key filter (must be compatible)
-            if compatible_keys and track.key not in compatible_keys:
-                continue
+        if not len(rows):
+            return {}
+        # Energy is 1-10: a byte-sized stable sort (radix) groups it in one pass
+        rows = rows[np.argsort(store.energy[rows].astype(np.uint8), kind="stable")]
+        energies = store.energy[rows]
+        starts = np.flatnonzero(np.r_[True, energies[1:] != energies[:-1]])
+        stops = np.r_[starts[1:], len(rows)]
+        return {int(energies[start]): rows[start:stop] for start, stop in zip(starts, stops)}
+
+    def _widen_bpm_window(
+        self,
+        current: Track,
+        store: FeatureStore,
+        history: list[str],
+        rows: dict[Direction, np.ndarray],
+        admitted: dict[int, tuple[float, TempoMatch]],
+    ) -> int:
+        """
+        Stage 1b: Adaptive BPM window.
+
+        Adds half/double-time matches at the configured window (if enabled),
+        then widens the window by bpm_step until every direction has
+        min_candidates or max_bpm_range is reached. Each step reads only the
+        newly uncovered BPM bands, and widened matches only go to directions
+        that are still short. Updates `rows` and `admitted` in place.
+
+        Returns:
+            Number of rows added
+        """
+        config = self.config
+        keys = self._filter_keys(current)
+        excluded = store.rows_for([current.track_id, *history])
+
+        tempos = [(TempoMatch.SAME, 1.0)]
+        if config.half_double_time:
+            tempos += [(TempoMatch.DOUBLE, 2.0), (TempoMatch.HALF, 0.5)]
+        covered = {TempoMatch.SAME: config.bpm_range}  # Window already read per tempo
+        added: list[np.ndarray] = []
+
+        def admit(match: TempoMatch, factor: float, window: float, directions: set[Direction]) -> None:
+            inner = covered.get(match, -1.0)
+            band = self._bpm_band(store, keys, excluded, current.bpm * factor, inner * factor, window * factor)
+            covered[match] = window
+            for direction, new_rows in zip(Direction, self._split_directions(current, band)):
+                if direction not in directions or not len(new_rows):
+                    continue
+                new_rows = new_rows[~np.isin(new_rows, rows[direction])]
+                rows[direction] = np.sort(np.concatenate([rows[direction], new_rows]))
+                added.append(new_rows)
+                for row in new_rows.tolist():
+                    admitted.setdefault(row, (window, match))
+
+        window = config.bpm_range
+        for match, factor in tempos[1:]:
+            admit(match, factor, window, set(Direction))
+
+        max_window = max(config.max_bpm_range, config.bpm_range)
+        while window < max_window:
+            short = {d for d, direction_rows in rows.items() if len(direction_rows) < config.min_candidates}
+            if not short:
+                break
+            window = min(window + config.bpm_step, max_window) if config.bpm_step > 0 else max_window
+            for match, factor in tempos:
+                admit(match, factor, window, short)
+
+        return len(np.unique(np.concatenate(added))) if added else 0
+
+    def _admits(self, current: Track, store: FeatureStore, rows: np.ndarray) -> np.ndarray:
+        """Which rows pass the BPM, key and quality filters (history aside)."""
+        keep = np.abs(store.bpm[rows] - current.bpm) <= self.config.bpm_range
+        keep &= store.audio_fidelity[rows] >= self.config.min_audio_fidelity
+
+        # Key filter as a bitmask test (unknown candidate keys never match)
+        mask = compatibility_mask(current.key_code, extended=True)
+        if mask and not self.config.allow_key_clash:
+            codes = store.key[rows]
+            keep &= (codes >= 0) & ((mask >> np.maximum(codes, 0)) & 1).astype(bool)
+
+        return keep
+
+    def _split_directions(
+        self,
+        current: Track,
+        by_energy: dict[int, np.ndarray],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stage 2: Assign whole energy buckets to UP/HOLD/DOWN."""
+        up, hold, down = [], [], []
+
+        for energy, rows in by_energy.items():
+            delta = energy - current.energy
+
+            if delta >= self.config.up_min_delta:
+                up.append(rows)
+            if abs(delta) <= self.config.hold_max_delta:
+                hold.append(rows)
+            if delta <= -self.config.down_min_delta:
+                down.append(rows)
+
+        # Keep corpus order within each direction
+        return tuple(
+            np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            for parts in (up, hold, down)
+        )
+
+    def _score_directions(
+        self,
+        current: Track,
+        store: FeatureStore,
+        rows: dict[Direction, np.ndarray],
+        timer: Optional[StageTimer] = None,
+        keep: Optional[int] = None,
+    ) -> dict[Direction, "_ScoredPool"]:
+        """
+        Stage 3: Score candidates for every direction.
+
+        Direction-invariant factors are scored once over the union of all
+        direction candidates and gathered per direction; only
+        direction-dependent factors are evaluated per direction.
+
+        If only the top `keep` per direction matter, large pools are pruned
+        by bucket bounds first (see _score_pruned).
+        """
+        threshold = self.config.prune_threshold
+        if keep and threshold > 0 and any(len(r) > max(threshold, keep) for r in rows.values()):
+            return self._score_pruned(current, store, rows, keep, timer)
+        return self._score_rows(current, store, rows, timer)
 
-            # Quality filter
-            if track.audio_fidelity < self.config.min_audio_fidelity:
+    def _score_pruned(
+        self,
+        current: Track,
+        store: FeatureStore,
+        rows: dict[Direction, np.ndarray],
+        keep: int,
+        timer: Optional[StageTimer] = None,
+    ) -> dict[Direction, "_ScoredPool"]:
+        """
+        Branch-and-bound scoring of large pools.
+
+        Candidates are grouped into buckets of equal BUCKET_COLUMNS values.
+        Factors that depend only on those columns score a bucket exactly
+        from one representative row; any other factor is bounded by its
+        best score over the pool. The buckets with the highest bounds are
+        scored first until they hold a few times `keep` candidates, which
+        sets the N-th best total. Remaining buckets whose bound is below it
+        are skipped, the rest scored factor by factor, each candidate
+        dropped once its own bound falls below it (see _score_bounded).
+        Bounds go through the same weighted sum as real totals, so they
+        can't round below them and the top `keep` is exactly that of full
+        scoring.
+        """
+        buckets = {
+            direction: self._bucket_bounds(current, store, direction_rows, direction)
+            for direction, direction_rows in rows.items()
+            if len(direction_rows) > max(self.config.prune_threshold, keep)
+        }
+
+        # Pass 1: The most promising buckets
+        first = {}
+        for direction, direction_rows in rows.items():
+            if direction not in buckets:
+                first[direction] = direction_rows
                 continue
+            inverse, bounds, bound_totals = buckets[direction]
+            order = np.argsort(-bound_totals, kind="stable")
+            counts = np.cumsum(np.bincount(inverse, minlength=len(bound_totals))[order])
+            taken = np.zeros(len(bound_totals), dtype=bool)
+            taken[order[:np.searchsorted(counts, 4 * keep) + 1]] = True
+            first[direction] = direction_rows[taken[inverse]]
+            buckets[direction] = (inverse, bounds, bound_totals, taken)
+        pools = self._score_rows(current, store, first, timer)
 
-            candidates.append(track)
+        # Pass 2: Buckets that can still reach the N-th best total
+        second = {}
+        cutoffs = {}
+        row_bounds = {}
+        for direction, (inverse, bounds, bound_totals, taken) in buckets.items():
+            totals = pools[direction].totals
+            cutoff = np.partition(totals, len(totals) - keep)[len(totals) - keep] if len(totals) >= keep else -np.inf
+            survive = ~taken & (bound_totals >= cutoff)
+            pruned = ~taken & ~survive
+            scored = survive[inverse]
+            second[direction] = rows[direction][scored]
+            cutoffs[direction] = cutoff
+            row_bounds[direction] = bounds[:, inverse[scored]]
+            skipped = pruned[inverse]
+            pool = pools[direction]
+            pool.pruned = bounds[:, pruned]
+            pool.pruned_rows = rows[direction][skipped]
+            pool.pruned_buckets = (np.cumsum(pruned) - 1)[inverse[skipped]]
+            if timer:
+                timer.count("pruned", len(pool.pruned_rows))
+        if not second:
+            return pools
 
-        return candidates
+        rest = self._score_bounded(current, store, second, cutoffs, row_bounds, timer)
+        for direction, pool in rest.items():
+            merged = pools[direction]
+            pools[direction] = _ScoredPool(
+                direction,
+                np.concatenate([merged.rows, pool.rows]),
+                np.concatenate([merged.raw, pool.raw], axis=1),
+                np.concatenate([merged.totals, pool.totals]),
+                # Dropped candidates follow the skipped buckets, one bucket each
+                np.concatenate([merged.pruned, pool.pruned], axis=1),
+                np.concatenate([merged.pruned_rows, pool.pruned_rows]),
+                np.concatenate([merged.pruned_buckets, pool.pruned_buckets + merged.pruned.shape[1]]),
+            )
+        return pools
 
-    def _score_and_rank(
+    def _score_bounded(
         self,
         current: Track,
-        candidates: list[Track],
+        store: FeatureStore,
+        rows: dict[Direction, np.ndarray],
+        cutoffs: dict[Direction, float],
+        bounds: dict[Direction, np.ndarray],
+        timer: Optional[StageTimer] = None,
+    ) -> dict[Direction, "_ScoredPool"]:
+        """
+        Score candidates factor by factor, dropping each one as soon as
+        it provably can't reach its direction's cutoff total.
+
+        Factors the bucket bounds already give exactly can't tighten a
+        bound, so they go last and only score the survivors. The rest run
+        in descending weight per unit of cost, so the ones that move totals
+        the most for the least work go first. A candidate's bound is its
+        weighted sum with every factor not yet scored at its bound
+        (`bounds`: factors × rows per direction). The running sum is only
+        used to drop candidates, with a margin far above its rounding
+        error. Dropped candidates come back as pruned entries of their own,
+        whose bounds are the scores so far and the bounds of the rest.
+        """
+        factors = self.config.factors
+        weights = np.array([factor.weight for factor in factors])
+        total_weight = weights.sum()
+        exact = [f.columns is not None and set(f.columns) <= set(BUCKET_COLUMNS) for f in factors]
+        order = sorted(range(len(factors)), key=lambda i: (exact[i], -factors[i].weight / max(factors[i].cost, 1e-9)))
+
+        raw = {direction: bounds[direction].copy() for direction in rows}
+        running = {direction: weights @ raw[direction] for direction in rows}
+        alive = {direction: np.arange(len(direction_rows)) for direction, direction_rows in rows.items()}
+
+        for i in order:
+            factor = factors[i]
+            start = time.perf_counter() if timer else 0.0
+            # Survivors are few after the first factors, so even direction-invariant
+            # factors score each direction on its own rather than deduplicating
+            scores = {d: factor.score_batch(current, store.view(rows[d][alive[d]]), d) for d in rows}
+            if timer:
+                timer.add_factor(factor.name, time.perf_counter() - start)
+
+            for direction, values in scores.items():
+                at = alive[direction]
+                raw[direction][i, at] = values
+                if not exact[i] and total_weight > 0:
+                    running[direction][at] += factor.weight * (values - bounds[direction][i, at])
+                    reach = running[direction][at] >= (cutoffs[direction] - 1e-9) * total_weight
+                    alive[direction] = at[reach]
+
+        pools = {}
+        for direction, direction_rows in rows.items():
+            at = alive[direction]
+            dropped = np.ones(len(direction_rows), dtype=bool)
+            dropped[at] = False
+            direction_raw = raw[direction][:, at]
+            pools[direction] = _ScoredPool(
+                direction,
+                direction_rows[at],
+                direction_raw,
+                _weighted_totals(direction_raw, factors),
+                raw[direction][:, dropped],
+                direction_rows[dropped],
+                np.arange(int(dropped.sum())),
+            )
+        if timer:
+            timer.count("aborted", sum(len(pool.pruned_rows) for pool in pools.values()))
+        return pools
+
+    def _bucket_bounds(
+        self,
+        current: Track,
+        store: FeatureStore,
+        rows: np.ndarray,
         direction: Direction,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bucket the pool's rows and bound every factor per bucket.
+
+        Returns:
+            (bucket of each row, factors × buckets raw bounds, bound totals)
+        """
+        factors = self.config.factors
+        bucket_of, representative = store.buckets(BUCKET_COLUMNS)
+        ids = bucket_of[rows]
+        present = np.flatnonzero(np.bincount(ids, minlength=len(representative)))
+        remap = np.empty(len(representative), dtype=np.int64)
+        remap[present] = np.arange(len(present))
+        representatives = store.view(representative[present])
+
+        bounds = np.empty((len(factors), len(present)))
+        for i, factor in enumerate(factors):
+            if factor.columns is None:
+                bounds[i] = 1.0
+            elif set(factor.columns) <= set(BUCKET_COLUMNS):
+                bounds[i] = factor.score_batch(current, representatives, direction)
+            else:
+                # Best score over the corpus' distinct values of the factor's columns
+                distinct = store.buckets(factor.columns)[1]
+                bounds[i] = factor.score_batch(current, store.view(distinct), direction).max(initial=0.0)
+        return remap[ids], bounds, _weighted_totals(bounds, factors)
+
+    def _unprune(self, current: Track, store: FeatureStore, pool: "_ScoredPool") -> "_ScoredPool":
+        """Score the skipped buckets whose bound reaches the pool's kept depth."""
+        keep = self._pool_depth()
+        totals = pool.totals
+        cutoff = np.partition(totals, len(totals) - keep)[len(totals) - keep] if len(totals) >= keep else -np.inf
+        reach = _weighted_totals(pool.pruned, self.config.factors) >= cutoff
+        if not reach.any():
+            return pool
+
+        # Adding rows only raises the N-th best, so one round is enough
+        rows = pool.pruned_rows[reach[pool.pruned_buckets]]
+        extra = self._score_rows(current, store, {pool.direction: rows})[pool.direction]
+        left = ~reach[pool.pruned_buckets]
+        remap = np.cumsum(~reach) - 1
+        return _ScoredPool(
+            pool.direction,
+            np.concatenate([pool.rows, extra.rows]),
+            np.concatenate([pool.raw, extra.raw], axis=1),
+            np.concatenate([pool.totals, extra.totals]),
+            pool.pruned[:, ~reach],
+            pool.pruned_rows[left],
+            remap[pool.pruned_buckets[left]],
+        )
+
+    def _score_rows(
+        self,
+        current: Track,
+        store: FeatureStore,
+        rows: dict[Direction, np.ndarray],
+        timer: Optional[StageTimer] = None,
+    ) -> dict[Direction, "_ScoredPool"]:
+        """Score every given row, sharing direction-invariant factors across directions."""
+        factors = self.config.factors
+        shared: dict[int, np.ndarray] = {}
+        shared_rows = np.unique(np.concatenate(list(rows.values())))
+
+        if any(f.direction_invariant for f in factors):
+            shared_view = store.view(shared_rows)
+            for i, factor in enumerate(factors):
+                if factor.direction_invariant:
+                    start = time.perf_counter() if timer else 0.0
+                    shared[i] = factor.score_batch(current, shared_view, Direction.HOLD)
+                    if timer:
+                        timer.add_factor(factor.name, time.perf_counter() - start)
+
+        pools = {}
+        for direction, direction_rows in rows.items():
+            positions = np.searchsorted(shared_rows, direction_rows)
+            pools[direction] = self._score(
+                current,
+                store.view(direction_rows),
+                direction,
+                {i: scores[positions] for i, scores in shared.items()},
+                timer,
+            )
+        return pools
+
+    def _score(
+        self,
+        current: Track,
+        candidates: CandidateView,
+        direction: Direction,
+        precomputed: Optional[dict[int, np.ndarray]] = None,
+        timer: Optional[StageTimer] = None,
+    ) -> "_ScoredPool":
+        """Raw factor scores and normalized totals as plain arrays."""
+        factors = self.config.factors
+        precomputed = precomputed or {}
+        raw = np.empty((len(factors), len(candidates)))
+
+        for i, factor in enumerate(factors):
+            if i in precomputed:
+                raw[i] = precomputed[i]
+            elif timer:
+                start = time.perf_counter()
+                raw[i] = factor.score_batch(current, candidates, direction)
+                timer.add_factor(factor.name, time.perf_counter() - start)
+            else:
+                raw[i] = factor.score_batch(current, candidates, direction)
+
+        return _ScoredPool(direction, candidates.rows, raw, _weighted_totals(raw, factors))
+
+    def _build_results(
+        self,
+        current: Track,
+        store: FeatureStore,
+        pool: "_ScoredPool",
+        order: np.ndarray,
+        admitted: Optional[dict[int, tuple[float, TempoMatch]]] = None,
     ) -> list[ScoredTrack]:
-        """Stage 3 & 4: Score candidates and rank by total score."""
-        scored = []
-
-        for candidate in candidates:
-            factor_scores = []
-            total_weighted = 0.0
-            total_weight = 0.0
-
-            for factor in self.config.factors:
-                fs = factor.score(current, candidate, direction)
-                factor_scores.append(fs)
-                total_weighted += fs.weighted_score
-                total_weight += fs.weight
-
-            # Normalize to 0-1
-            total_score = total_weighted / total_weight if total_weight > 0 else 0
-
-            scored.append(ScoredTrack(
-                track=candidate,
-                direction=direction,
-                total_score=total_score,
-                factor_scores=factor_scores,
+        """Materialize ScoredTrack models for the selected entries only."""
+        plain = (self.config.bpm_range, TempoMatch.SAME)
+        results = []
+
+        for i in order:
+            row = int(pool.rows[i])
+            bpm_window, tempo_match = admitted.get(row, plain) if admitted else plain
+            results.append(self._scored_track(
+                current, store.tracks[row], pool.direction, pool.raw[:, i], pool.totals[i], bpm_window, tempo_match,
             ))
 
-        # Sort by score descending
-        scored.sort(key=lambda x: x.total_score, reverse=True)
+        return results
 
+    def _scored_track(
+        self,
+        current: Track,
+        candidate: Track,
+        direction: Direction,
+        raw: np.ndarray,
+        total: float,
+        bpm_window: Optional[float],
+        tempo_match: TempoMatch = TempoMatch.SAME,
+    ) -> ScoredTrack:
+        """One ScoredTrack from a candidate's raw factor scores and total."""
+        factors = self.config.factors
+        scored = ScoredTrack(
+            track=candidate,
+            direction=direction,
+            total_score=float(total),
+            bpm_window=bpm_window,
+            tempo_match=tempo_match,
+            stretched=bpm_window is not None and bpm_window > self.config.bpm_range,
+            factor_scores=[
+                FactorScore(name=factor.name, score=score, weight=factor.weight, weighted_score=score * factor.weight)
+                for factor, score in zip(factors, raw.tolist())
+            ],
+        )
+        # Reason strings are only formatted if someone asks for them
+        scored.set_reason_source(partial(_factor_reasons, factors, current, candidate, direction))
         return scored
 
     def set_factor_weight(self, factor_name: str, weight: float) -> None:
-        """Adjust a factor's weight at runtime."""
-        for factor in self.config.factors:
-            if factor.name == factor_name:
-                factor.weight = weight
-                return
-        raise ValueError(f"Unknown factor: {factor_name}")
+        """
+        Adjust a factor's weight at runtime.
+
+        The next recommend() for a session's current track re-ranks its
+        kept raw scores instead of rescoring.
+        """
+        self.set_factor_weights({factor_name: weight})
+
+    def set_factor_weights(self, weights: dict[str, float]) -> None:
+        """
+        Adjust several factor weights at once (unlisted factors keep theirs).
+
+        Raises:
+            ValueError: On an unknown factor or a negative or non-finite
+                weight (nothing is changed)
+        """
+        with self._config_lock:
+            config = self._config
+            names = {factor.name for factor in config.factors}
+            for factor_name, weight in weights.items():
+                if factor_name not in names:
+                    raise ValueError(f"Unknown factor: {factor_name}")
+                # Totals are only in 0-1 (and results valid) for finite, non-negative weights
+                if not math.isfinite(weight) or weight < 0:
+                    raise ValueError(f"Invalid weight for {factor_name}: {weight}")
+
+            # Running calls keep the factors they started with: copy, don't mutate
+            factors = []
+            for factor in config.factors:
+                if factor.name in weights:
+                    factor = copy.copy(factor)
+                    factor.weight = weights[factor.name]
+                factors.append(factor)
+            self._config = replace(config, factors=factors)
+        self.clear_cache()
+
+    def apply_preset(self, preset: str) -> None:
+        """Switch to a named weight preset (see WEIGHT_PRESETS)."""
+        if preset not in WEIGHT_PRESETS:
+            raise ValueError(f"Unknown preset: {preset}")
+        present = {factor.name for factor in self.config.factors}
+        self.set_factor_weights({
+            name: weight for name, weight in WEIGHT_PRESETS[preset].items() if name in present
+        })
 
     def get_factor_weights(self) -> dict[str, float]:
         """Get current factor weights."""
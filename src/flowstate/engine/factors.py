@@ -3,8 +3,38 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import numpy as np
+
 from ..models import Direction, FactorScore, Track
-from .camelot import key_compatibility_score
+from ..models.camelot import KEY_SCORES
+from ..models.track import GROOVE_CODES, INTENSITY_CODES, UNKNOWN_CODE, VIBE_CODES, _value
+from .features import CandidateView
+
+
+def _dense_matrix(
+    matrix: dict[str, dict[str, float]],
+    codes: dict[str, int],
+    default: float = 0.5,
+) -> np.ndarray:
+    """
+    Dense copy of a transition matrix indexed by category codes.
+
+    The extra last row/column holds the default score, so UNKNOWN_CODE (-1)
+    indexes it directly.
+    """
+    dense = np.full((len(codes) + 1, len(codes) + 1), default)
+    for from_value, row in matrix.items():
+        for to_value, score in row.items():
+            dense[codes[from_value], codes[to_value]] = score
+    return dense
+
+
+def _dense_lookup(values: dict[str, float], codes: dict[str, int], default: float) -> np.ndarray:
+    """Dense per-code lookup table, with the default in the last (unknown) slot."""
+    dense = np.full(len(codes) + 1, default)
+    for value, code in codes.items():
+        dense[code] = values.get(value, default)
+    return dense
 
 
 class ScoringFactor(ABC):
@@ -13,6 +43,19 @@ class ScoringFactor(ABC):
     name: str
     weight: float
 
+    # True if score() ignores `direction`; the engine then scores the
+    # factor once per candidate and shares it across UP/HOLD/DOWN
+    direction_invariant: bool = False
+
+    # Candidate feature columns the score depends on (besides the current
+    # track). Lets the engine bound the factor over candidate buckets
+    # without scoring them; None means unknown (bounded by 1.0)
+    columns: Optional[tuple[str, ...]] = None
+
+    # Relative cost of score_batch per candidate. Early-abort scoring runs
+    # the factors with the most weight per unit of cost first
+    cost: float = 1.0
+
     def __init__(self, weight: Optional[float] = None):
         if weight is not None:
             self.weight = weight
@@ -32,12 +75,60 @@ class ScoringFactor(ABC):
         """
         pass
 
+    def score_batch(
+        self,
+        current: Track,
+        candidates: CandidateView,
+        direction: Direction,
+    ) -> np.ndarray:
+        """
+        Score many candidates at once.
+
+        Override with array operations over the candidate columns. The
+        default falls back to calling `score` once per candidate.
+
+        Returns:
+            Array of raw scores between 0 and 1, one per candidate
+        """
+        return np.fromiter(
+            (self.score(current, c, direction).score for c in candidates.tracks),
+            dtype=np.float64,
+            count=len(candidates),
+        )
+
+    def score_pairs(
+        self,
+        queries: CandidateView,
+        candidates: CandidateView,
+        direction: Direction,
+    ) -> np.ndarray:
+        """
+        Score aligned pairs: candidate row i against query row i.
+
+        Override with element-wise array operations over both views; the
+        results must match `score_batch` exactly. The default groups pairs
+        by query track and calls `score_batch` once per group.
+
+        Returns:
+            Array of raw scores between 0 and 1, one per pair
+        """
+        result = np.empty(len(candidates))
+        order = np.argsort(queries.rows, kind="stable")
+        query_rows = queries.rows[order]
+        bounds = np.flatnonzero(np.diff(query_rows)) + 1
+        for group in np.split(order, bounds):
+            if len(group):
+                current = queries.store.tracks[queries.rows[group[0]]]
+                result[group] = self.score_batch(current, candidates.store.view(candidates.rows[group]), direction)
+        return result
+
 
 class EnergyTrajectoryFactor(ScoringFactor):
     """Does energy delta match the requested direction?"""
 
     name = "Energy Trajectory"
     weight = 1.0
+    columns = ("energy",)
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
         delta = candidate.energy - current.energy
@@ -74,12 +165,29 @@ class EnergyTrajectoryFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._from_delta((candidates.energy - current.energy).astype(np.float64), direction)
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._from_delta((candidates.energy - queries.energy).astype(np.float64), direction)
+
+    @staticmethod
+    def _from_delta(delta: np.ndarray, direction: Direction) -> np.ndarray:
+        if direction == Direction.UP:
+            return np.where(delta >= 1, np.minimum(delta / 3, 1.0), 0.0)
+        if direction == Direction.DOWN:
+            return np.where(delta <= -1, np.minimum(np.abs(delta) / 3, 1.0), 0.0)
+        return np.maximum(0, 1.0 - (np.abs(delta) * 0.3))
+
 
 class DanceabilityFactor(ScoringFactor):
     """Keep the dancefloor moving."""
 
     name = "Danceability"
     weight = 0.8
+    direction_invariant = True
+    columns = ("danceability",)
+    cost = 2.0
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
         # High danceability is always good, but big drops are bad
@@ -105,12 +213,26 @@ class DanceabilityFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        delta = candidates.danceability - current.danceability
+        base_score = candidates.danceability / 10
+        penalty = np.abs(delta + 2) * 0.15
+        return np.where(delta < -2, np.maximum(0, base_score - penalty), base_score)
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        delta = candidates.danceability - queries.danceability
+        base_score = candidates.danceability / 10
+        penalty = np.abs(delta + 2) * 0.15
+        return np.where(delta < -2, np.maximum(0, base_score - penalty), base_score)
+
 
 class VibeCompatibilityFactor(ScoringFactor):
     """Score vibe/mood transitions."""
 
     name = "Vibe Compatibility"
     weight = 0.7
+    direction_invariant = True
+    columns = ("vibe",)
 
     # Vibe compatibility matrix (row = from, col = to)
     # 1.0 = great transition, 0.5 = neutral, 0.0 = jarring
@@ -122,12 +244,12 @@ class VibeCompatibilityFactor(ScoringFactor):
         "chill": {"chill": 1.0, "hypnotic": 0.7, "bright": 0.6, "dark": 0.4, "euphoric": 0.3, "aggressive": 0.1},
         "aggressive": {"aggressive": 1.0, "dark": 0.8, "euphoric": 0.6, "hypnotic": 0.5, "bright": 0.3, "chill": 0.1},
     }
+    _DENSE = _dense_matrix(VIBE_MATRIX, VIBE_CODES)
+    _TABLE = _DENSE.tolist()  # Per-pair lookups: nested lists beat numpy scalar indexing
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
-        from_vibe = current.vibe if isinstance(current.vibe, str) else current.vibe.value
-        to_vibe = candidate.vibe if isinstance(candidate.vibe, str) else candidate.vibe.value
-
-        raw = self.VIBE_MATRIX.get(from_vibe, {}).get(to_vibe, 0.5)
+        raw = self._TABLE[current.vibe_code][candidate.vibe_code]
+        from_vibe, to_vibe = _value(current.vibe), _value(candidate.vibe)
 
         if from_vibe == to_vibe:
             reason = f"Same vibe: {to_vibe}"
@@ -142,12 +264,20 @@ class VibeCompatibilityFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[current.vibe_code, candidates.vibe]
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[queries.vibe, candidates.vibe]
+
 
 class NarrativeFlowFactor(ScoringFactor):
     """Score set position progression (opener → journey → peak → closer)."""
 
     name = "Narrative Flow"
     weight = 0.6
+    columns = ("intensity",)
+    cost = 2.0
 
     # Natural progression order
     INTENSITY_ORDER = {"opener": 0, "journey": 1, "peak": 2, "closer": 3}
@@ -159,23 +289,25 @@ class NarrativeFlowFactor(ScoringFactor):
         "peak": {"opener": 0.1, "journey": 0.6, "peak": 0.8, "closer": 1.0},
         "closer": {"opener": 0.5, "journey": 0.4, "peak": 0.3, "closer": 0.8},
     }
+    _DENSE = _dense_matrix(FLOW_MATRIX, INTENSITY_CODES)
+    _TABLE = _DENSE.tolist()
+    _ORDER = _dense_lookup(INTENSITY_ORDER, INTENSITY_CODES, default=1)
+    _ORDER_TABLE = _ORDER.tolist()
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
-        from_int = current.intensity if isinstance(current.intensity, str) else current.intensity.value
-        to_int = candidate.intensity if isinstance(candidate.intensity, str) else candidate.intensity.value
-
-        raw = self.FLOW_MATRIX.get(from_int, {}).get(to_int, 0.5)
+        from_code, to_code = current.intensity_code, candidate.intensity_code
+        raw = self._TABLE[from_code][to_code]
 
         # Adjust based on direction
-        from_order = self.INTENSITY_ORDER.get(from_int, 1)
-        to_order = self.INTENSITY_ORDER.get(to_int, 1)
+        from_order = self._ORDER_TABLE[from_code]
+        to_order = self._ORDER_TABLE[to_code]
 
         if direction == Direction.UP and to_order > from_order:
             raw = min(1.0, raw + 0.2)
         elif direction == Direction.DOWN and to_order < from_order:
             raw = min(1.0, raw + 0.2)
 
-        reason = f"Flow: {from_int} → {to_int}"
+        reason = f"Flow: {_value(current.intensity)} → {_value(candidate.intensity)}"
 
         return FactorScore(
             name=self.name,
@@ -185,15 +317,38 @@ class NarrativeFlowFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        from_code = current.intensity_code
+        raw = self._DENSE[from_code, candidates.intensity]
+        return self._adjust(raw, self._ORDER[from_code], self._ORDER[candidates.intensity], direction)
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        raw = self._DENSE[queries.intensity, candidates.intensity]
+        return self._adjust(raw, self._ORDER[queries.intensity], self._ORDER[candidates.intensity], direction)
+
+    @staticmethod
+    def _adjust(raw: np.ndarray, from_order, to_order, direction: Direction) -> np.ndarray:
+        """Adjust based on direction."""
+        if direction == Direction.UP:
+            return np.where(to_order > from_order, np.minimum(1.0, raw + 0.2), raw)
+        if direction == Direction.DOWN:
+            return np.where(to_order < from_order, np.minimum(1.0, raw + 0.2), raw)
+        return raw
+
 
 class KeyQualityFactor(ScoringFactor):
     """Score harmonic compatibility using Camelot wheel."""
 
     name = "Key Quality"
     weight = 0.5
+    direction_invariant = True
+    columns = ("key",)
+    # KEY_SCORES plus a neutral 0.5 row/column for unknown keys (code -1)
+    _DENSE = np.pad(KEY_SCORES, (0, 1), constant_values=0.5)
+    _TABLE = _DENSE.tolist()
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
-        raw = key_compatibility_score(current.key, candidate.key)
+        raw = self._TABLE[current.key_code][candidate.key_code]
 
         if raw >= 0.9:
             reason = f"Key: {current.key} → {candidate.key} (harmonic)"
@@ -212,12 +367,20 @@ class KeyQualityFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[current.key_code, candidates.key]
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[queries.key, candidates.key]
+
 
 class GrooveCompatibilityFactor(ScoringFactor):
     """Score rhythm style transitions."""
 
     name = "Groove Compatibility"
     weight = 0.4
+    direction_invariant = True
+    columns = ("groove",)
 
     # Groove transition scores
     GROOVE_MATRIX = {
@@ -227,12 +390,12 @@ class GrooveCompatibilityFactor(ScoringFactor):
         "syncopated": {"syncopated": 1.0, "broken": 0.8, "swung": 0.7, "linear": 0.5, "four-on-floor": 0.5},
         "linear": {"linear": 1.0, "four-on-floor": 0.8, "syncopated": 0.5, "swung": 0.4, "broken": 0.4},
     }
+    _DENSE = _dense_matrix(GROOVE_MATRIX, GROOVE_CODES)
+    _TABLE = _DENSE.tolist()
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
-        from_groove = current.groove_style if isinstance(current.groove_style, str) else current.groove_style.value
-        to_groove = candidate.groove_style if isinstance(candidate.groove_style, str) else candidate.groove_style.value
-
-        raw = self.GROOVE_MATRIX.get(from_groove, {}).get(to_groove, 0.5)
+        raw = self._TABLE[current.groove_code][candidate.groove_code]
+        from_groove, to_groove = _value(current.groove_style), _value(candidate.groove_style)
 
         if from_groove == to_groove:
             reason = f"Same groove: {to_groove}"
@@ -247,12 +410,20 @@ class GrooveCompatibilityFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[current.groove_code, candidates.groove]
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return self._DENSE[queries.groove, candidates.groove]
+
 
 class MixEaseFactor(ScoringFactor):
     """Score technical mixability."""
 
     name = "Mix Ease"
     weight = 0.4
+    direction_invariant = True
+    columns = ("mix_in_ease",)
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
         # Combine mix_out of current with mix_in of candidate
@@ -272,20 +443,29 @@ class MixEaseFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return (current.mix_out_ease * 0.4 + candidates.mix_in_ease * 0.6) / 10
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        return (queries.mix_out_ease * 0.4 + candidates.mix_in_ease * 0.6) / 10
+
 
 class GenreAffinityFactor(ScoringFactor):
     """Score genre match."""
 
     name = "Genre Affinity"
     weight = 0.3
+    direction_invariant = True
+    columns = ("genre", "subgenre")
+    cost = 2.0
 
     def score(self, current: Track, candidate: Track, direction: Direction) -> FactorScore:
         # Same genre = high score
         # Same subgenre = bonus
-        if current.genre.lower() == candidate.genre.lower():
+        if current.genre_lower == candidate.genre_lower:
             raw = 0.8
             if current.subgenre and candidate.subgenre:
-                if current.subgenre.lower() == candidate.subgenre.lower():
+                if current.subgenre_lower == candidate.subgenre_lower:
                     raw = 1.0
                     reason = f"Same subgenre: {candidate.subgenre}"
                 else:
@@ -304,6 +484,18 @@ class GenreAffinityFactor(ScoringFactor):
             reason=reason,
         )
 
+    def score_batch(self, current: Track, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        codes = candidates.encode(current)
+        same_genre = candidates.genre == codes.genre
+        same_subgenre = same_genre & (codes.subgenre != UNKNOWN_CODE) & (candidates.subgenre == codes.subgenre)
+        return np.where(same_subgenre, 1.0, np.where(same_genre, 0.8, 0.3))
+
+    def score_pairs(self, queries: CandidateView, candidates: CandidateView, direction: Direction) -> np.ndarray:
+        # Queries are store rows, so their codes share the candidates' vocabularies
+        same_genre = candidates.genre == queries.genre
+        same_subgenre = same_genre & (queries.subgenre != UNKNOWN_CODE) & (candidates.subgenre == queries.subgenre)
+        return np.where(same_subgenre, 1.0, np.where(same_genre, 0.8, 0.3))
+
 
 # Default factor set
 DEFAULT_FACTORS = [
@@ -316,3 +508,38 @@ DEFAULT_FACTORS = [
     MixEaseFactor(),
     GenreAffinityFactor(),
 ]
+
+
+# Weight presets from the design doc (appendix B), keyed by factor name
+WEIGHT_PRESETS: dict[str, dict[str, float]] = {
+    "Conservative": {
+        "Energy Trajectory": 1.0,
+        "Danceability": 0.9,
+        "Key Quality": 0.7,
+        "Vibe Compatibility": 0.5,
+        "Narrative Flow": 0.4,
+        "Groove Compatibility": 0.5,
+        "Mix Ease": 0.5,
+        "Genre Affinity": 0.3,
+    },
+    "Adventurous": {
+        "Energy Trajectory": 1.0,
+        "Danceability": 0.7,
+        "Key Quality": 0.4,
+        "Vibe Compatibility": 0.8,
+        "Narrative Flow": 0.7,
+        "Groove Compatibility": 0.3,
+        "Mix Ease": 0.3,
+        "Genre Affinity": 0.2,
+    },
+    "Peak Hour": {
+        "Energy Trajectory": 1.0,
+        "Danceability": 1.0,
+        "Key Quality": 0.5,
+        "Vibe Compatibility": 0.6,
+        "Narrative Flow": 0.3,
+        "Groove Compatibility": 0.6,
+        "Mix Ease": 0.4,
+        "Genre Affinity": 0.2,
+    },
+}
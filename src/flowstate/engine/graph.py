@@ -0,0 +1,186 @@
+"""Offline transition graph: precomputed top-K successors per track."""
+
+import dataclasses
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+
+from ..models import Corpus, Direction
+from .features import FeatureStore
+from .ranking import select_top
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine, ScoringConfig
+
+DIRECTIONS = list(Direction)
+
+# Engine used by build workers (one per process)
+_worker_engine: Optional["RecommendationEngine"] = None
+
+
+def graph_path_for(corpus_path: str | Path) -> Path:
+    """Sidecar location for a corpus file (corpus.json -> corpus.graph.npz)."""
+    return Path(corpus_path).with_suffix(".graph.npz")
+
+
+def config_hash(config: "ScoringConfig") -> str:
+    """Stable hash of every result-affecting scoring setting."""
+    return hashlib.sha256(repr(config.fingerprint()).encode()).hexdigest()
+
+
+def _init_worker(corpus: Corpus, config: "ScoringConfig") -> None:
+    """Create this process' engine for graph building."""
+    from .engine import RecommendationEngine
+
+    global _worker_engine
+    _worker_engine = RecommendationEngine(corpus, dataclasses.replace(config, cache_size=0))
+
+
+def _build_block(rows: range, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Top-k successors for a block of source rows."""
+    engine = _worker_engine
+    store = engine.features
+
+    successors = np.full((len(rows), len(DIRECTIONS), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), len(DIRECTIONS), k), dtype=np.float32)
+    counts = np.zeros(len(rows), dtype=np.int32)
+
+    for i, row in enumerate(rows):
+        pools, counts[i] = engine._score_candidates(store.tracks[row], store, [])
+        for d, direction in enumerate(DIRECTIONS):
+            pool = pools[direction]
+            order = select_top(pool.totals, store.id_rank[pool.rows], k)
+            successors[i, d, :len(order)] = pool.rows[order]
+            scores[i, d, :len(order)] = pool.totals[order]
+
+    return successors, scores, counts
+
+
+class TransitionGraph:
+    """
+    Top-K successors of every corpus track in each direction.
+
+    Rows refer to positions in the corpus (and feature store). Each
+    successor list is best-first and padded with -1. The graph records the
+    corpus and config hashes it was built for, so stale graphs can be
+    detected and ignored.
+    """
+
+    def __init__(
+        self,
+        successors: np.ndarray,
+        scores: np.ndarray,
+        candidate_counts: np.ndarray,
+        corpus_hash: str,
+        config_hash: str,
+    ):
+        self._successors = successors
+        self.scores = scores
+        self.candidate_counts = candidate_counts
+        self.corpus_hash = corpus_hash
+        self.config_hash = config_hash
+
+    @property
+    def k(self) -> int:
+        """Successors kept per track and direction."""
+        return self._successors.shape[2]
+
+    def __len__(self) -> int:
+        return self._successors.shape[0]
+
+    def matches(self, store: FeatureStore, config: "ScoringConfig") -> bool:
+        """True if the graph was built from this corpus content and config."""
+        return self.corpus_hash == store.fingerprint() and self.config_hash == config_hash(config)
+
+    def successors(self, row: int, direction: Direction) -> np.ndarray:
+        """Successor rows of a track, best first."""
+        rows = self._successors[row, DIRECTIONS.index(direction)]
+        return rows[rows >= 0]
+
+    @classmethod
+    def build(
+        cls,
+        corpus: Corpus,
+        config: "ScoringConfig",
+        k: int = 50,
+        workers: Optional[int] = None,
+        block_size: int = 256,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> "TransitionGraph":
+        """
+        Score every track against the corpus and keep the top-k per direction.
+
+        Args:
+            corpus: Corpus to build the graph for
+            config: Scoring configuration (its hash is stored in the graph)
+            k: Successors to keep per track and direction
+            workers: Worker processes (default: all cores; 1 runs in-process)
+            block_size: Source tracks per work unit
+            progress: Optional callback(done, total) after each block
+        """
+        n = len(corpus.tracks)
+        blocks = [range(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+        workers = workers or os.cpu_count() or 1
+
+        successors = np.full((n, len(DIRECTIONS), k), -1, dtype=np.int32)
+        scores = np.zeros((n, len(DIRECTIONS), k), dtype=np.float32)
+        counts = np.zeros(n, dtype=np.int32)
+
+        def collect(block: range, result: tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+            block_successors, block_scores, block_counts = result
+            successors[block.start:block.stop] = block_successors
+            scores[block.start:block.stop] = block_scores
+            counts[block.start:block.stop] = block_counts
+            if progress:
+                progress(block.stop, n)
+
+        if workers == 1 or len(blocks) <= 1:
+            _init_worker(corpus, config)
+            for block in blocks:
+                collect(block, _build_block(block, k))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(corpus, config),
+            ) as pool:
+                for block, result in zip(blocks, pool.map(_build_block, blocks, [k] * len(blocks))):
+                    collect(block, result)
+
+        return cls(
+            successors,
+            scores,
+            counts,
+            corpus_hash=FeatureStore.from_corpus(corpus).fingerprint(),
+            config_hash=config_hash(config),
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the graph as a compact .npz sidecar."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                successors=self._successors,
+                scores=self.scores,
+                candidate_counts=self.candidate_counts,
+                corpus_hash=np.array(self.corpus_hash),
+                config_hash=np.array(self.config_hash),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TransitionGraph":
+        """Read a graph sidecar written by `save`."""
+        with np.load(Path(path)) as data:
+            return cls(
+                data["successors"],
+                data["scores"],
+                data["candidate_counts"],
+                corpus_hash=str(data["corpus_hash"]),
+                config_hash=str(data["config_hash"]),
+            )
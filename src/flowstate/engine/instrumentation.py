@@ -0,0 +1,137 @@
+"""Low-overhead timing of the recommendation pipeline."""
+
+import threading
+import time
+
+import numpy as np
+
+from ..models import PipelineTiming
+
+# Histogram bucket edges in milliseconds (log-spaced, 10 µs to 10 s)
+BUCKET_EDGES_MS = np.logspace(-2, 4, 25)
+
+
+class StageTimer:
+    """
+    Collects stage and factor timings for a single recommend() call.
+
+    Stages are timed as laps: `lap("filter")` charges the time since the
+    previous lap (or the start) to "filter".
+    """
+
+    __slots__ = ("stages", "factors", "counts", "_start", "_last")
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.factors: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Charge the time since the last lap to a stage."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def add_factor(self, name: str, seconds: float) -> None:
+        """Add scoring time for one factor (accumulates across directions)."""
+        self.factors[name] = self.factors.get(name, 0.0) + seconds * 1000
+
+    def count(self, stage: str, n: int) -> None:
+        """Record how many candidates a stage produced."""
+        self.counts[stage] = int(n)
+
+    def finish(self, source: str) -> PipelineTiming:
+        """Timing block for the finished call."""
+        return PipelineTiming(
+            source=source,
+            total_ms=(time.perf_counter() - self._start) * 1000,
+            stages=self.stages,
+            factors=self.factors,
+            counts=self.counts,
+        )
+
+
+class RollingHistogram:
+    """The last `window` samples of one measurement, with percentile summaries."""
+
+    def __init__(self, window: int = 1024):
+        self._samples = np.zeros(window)
+        self._next = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Samples currently in the window (oldest order not preserved)."""
+        return self._samples[:min(self.count, len(self._samples))]
+
+    def summary(self) -> dict[str, float]:
+        """Count plus mean/percentiles/max over the window."""
+        samples = self.samples
+        if not len(samples):
+            return {"count": 0}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {
+            "count": self.count,
+            "mean": round(float(samples.mean()), 4),
+            "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(samples.max()), 4),
+        }
+
+    def buckets(self) -> list[int]:
+        """Sample counts per BUCKET_EDGES_MS interval (values outside are clipped in)."""
+        clipped = np.clip(self.samples, BUCKET_EDGES_MS[0], BUCKET_EDGES_MS[-1])
+        return np.histogram(clipped, bins=BUCKET_EDGES_MS)[0].tolist()
+
+
+class PipelineMetrics:
+    """Rolling histograms of recent recommend() timings and candidate counts."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: dict[str, RollingHistogram] = {}
+        self.sources: dict[str, int] = {}
+
+    def _add(self, name: str, value: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = RollingHistogram(self.window)
+        histogram.add(value)
+
+    def record(self, timing: PipelineTiming) -> None:
+        """Fold one call's timing block into the histograms."""
+        with self._lock:
+            self.sources[timing.source] = self.sources.get(timing.source, 0) + 1
+            self._add("total", timing.total_ms)
+            for stage, ms in timing.stages.items():
+                self._add(f"stage.{stage}", ms)
+            for factor, ms in timing.factors.items():
+                self._add(f"factor.{factor}", ms)
+            for stage, n in timing.counts.items():
+                self._add(f"count.{stage}", n)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.sources.clear()
+
+    def summary(self, buckets: bool = False) -> dict:
+        """Per-measurement summaries (timings in ms), optionally with histogram buckets."""
+        with self._lock:
+            result = {"sources": dict(self.sources), "metrics": {}}
+            for name, histogram in sorted(self._histograms.items()):
+                entry = histogram.summary()
+                if buckets and not name.startswith("count."):
+                    entry["buckets"] = histogram.buckets()
+                result["metrics"][name] = entry
+            if buckets:
+                result["bucket_edges_ms"] = [round(float(e), 4) for e in BUCKET_EDGES_MS]
+            return result
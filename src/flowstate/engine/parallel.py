@@ -0,0 +1,216 @@
+"""Process-pool scoring over feature columns held in shared memory."""
+
+import dataclasses
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from ..models import Corpus, Direction, Track
+from .factors import ScoringFactor
+from .features import CandidateView, FeatureStore, TrackFeatures
+from .ranking import select_top
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine, ScoringConfig, _ScoredPool
+
+# Columns shared with workers: every scored feature plus the tie-break rank
+SHARED_COLUMNS = FeatureStore.COLUMNS + ("id_rank",)
+
+# Worker-side state (one per process)
+_worker_store: Optional["SharedFeatureStore"] = None
+_worker_engine: Optional["RecommendationEngine"] = None
+
+
+class SharedFeatureStore:
+    """
+    Feature columns backed by a shared memory block.
+
+    Exposes the same column attributes as FeatureStore (plus `view` and
+    `encode`), so factors' `score_batch` works on it unchanged. There are
+    no Track objects: only rows and their numeric features.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        layout: list[tuple[str, str, int, int]],
+        genre_codes: dict[str, int],
+        subgenre_codes: dict[str, int],
+    ):
+        self._shm = shm
+        self.genre_codes = genre_codes
+        self.subgenre_codes = subgenre_codes
+        for name, dtype, offset, length in layout:
+            setattr(self, name, np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=offset))
+
+    def view(self, rows: np.ndarray) -> CandidateView:
+        return CandidateView(self, rows)
+
+    def encode(self, track: Track) -> TrackFeatures:
+        return TrackFeatures(track, self.genre_codes, self.subgenre_codes)
+
+
+def _share(store: FeatureStore) -> tuple[shared_memory.SharedMemory, list[tuple[str, str, int, int]]]:
+    """Copy a store's columns into a new shared memory block."""
+    columns = [getattr(store, name) for name in SHARED_COLUMNS]
+    size = sum(column.nbytes for column in columns)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    layout, offset = [], 0
+    for name, column in zip(SHARED_COLUMNS, columns):
+        np.ndarray(column.shape, dtype=column.dtype, buffer=shm.buf, offset=offset)[:] = column
+        layout.append((name, column.dtype.str, offset, len(column)))
+        offset += column.nbytes
+    return shm, layout
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _attach(
+    name: str,
+    layout: list[tuple[str, str, int, int]],
+    genre_codes: dict[str, int],
+    subgenre_codes: dict[str, int],
+) -> None:
+    """Worker initializer: map the shared columns and create a scoring engine."""
+    from .engine import RecommendationEngine, ScoringConfig
+
+    global _worker_store, _worker_engine
+    _worker_store = SharedFeatureStore(
+        shared_memory.SharedMemory(name=name), layout, genre_codes, subgenre_codes
+    )
+    _worker_engine = RecommendationEngine(Corpus(tracks=[]), ScoringConfig(cache_size=0))
+
+
+def _score_shard(
+    current: Track,
+    config: "ScoringConfig",
+    rows: dict[Direction, np.ndarray],
+    keep: int,
+) -> dict[Direction, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Score one shard of candidates and return its top `keep` per direction."""
+    engine, store = _worker_engine, _worker_store
+    engine.config = config
+
+    results = {}
+    for direction, pool in engine._score_directions(current, store, rows).items():
+        order = select_top(pool.totals, store.id_rank[pool.rows], keep)
+        results[direction] = (pool.rows[order], pool.raw[:, order], pool.totals[order])
+    return results
+
+
+def supports_parallel(factors: list[ScoringFactor]) -> bool:
+    """True if every factor scores from feature columns alone (no Track objects)."""
+    return all(type(f).score_batch is not ScoringFactor.score_batch for f in factors)
+
+
+class ParallelScorer:
+    """
+    Splits candidate scoring across a process pool.
+
+    The feature store's columns are copied once per corpus version into a
+    shared memory block that workers map directly, so each task only
+    pickles the current track, the config and candidate row numbers.
+    Workers return their shard's top N per direction; merging those gives
+    exactly the serial top N.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._version: Optional[int] = None
+        self._finalizer: Optional[weakref.finalize] = None
+        self._lock = threading.Lock()
+
+    def _ensure(self, store: FeatureStore) -> ProcessPoolExecutor:
+        """Start (or restart) the pool for this store's version."""
+        with self._lock:
+            if self._executor is not None and self._version == store.version:
+                return self._executor
+
+            self._stop()
+            shm, layout = _share(store)
+            self._finalizer = weakref.finalize(self, _release, shm)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_attach,
+                initargs=(shm.name, layout, store.genre_codes, store.subgenre_codes),
+            )
+            self._version = store.version
+            return self._executor
+
+    def score(
+        self,
+        current: Track,
+        store: FeatureStore,
+        config: "ScoringConfig",
+        rows: dict[Direction, np.ndarray],
+    ) -> dict[Direction, "_ScoredPool"]:
+        """
+        Score candidates in parallel, keeping only each direction's top N.
+
+        Rows are sharded by contiguous ranges of the candidate union, so
+        direction-invariant factors are still shared within each shard.
+        """
+        from .engine import _ScoredPool
+
+        executor = self._ensure(store)
+        union = np.unique(np.concatenate(list(rows.values())))
+        bounds = [chunk[0] for chunk in np.array_split(union, self.workers) if len(chunk)]
+        bounds.append(union[-1] + 1 if len(union) else 0)
+
+        config = dataclasses.replace(config, cache_size=0, speculation_workers=0, parallel_workers=0)
+        futures = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            shard = {
+                direction: direction_rows[
+                    np.searchsorted(direction_rows, lo):np.searchsorted(direction_rows, hi)
+                ]
+                for direction, direction_rows in rows.items()
+            }
+            futures.append(executor.submit(_score_shard, current, config, shard, config.top_n))
+
+        parts: dict[Direction, list] = {direction: [] for direction in rows}
+        for future in futures:
+            for direction, part in future.result().items():
+                parts[direction].append(part)
+
+        pools = {}
+        for direction, direction_parts in parts.items():
+            if direction_parts:
+                shard_rows, raw, totals = zip(*direction_parts)
+                pools[direction] = _ScoredPool(
+                    direction,
+                    np.concatenate(shard_rows),
+                    np.concatenate(raw, axis=1),
+                    np.concatenate(totals),
+                )
+            else:
+                pools[direction] = _ScoredPool(
+                    direction,
+                    np.empty(0, dtype=np.int64),
+                    np.empty((len(config.factors), 0)),
+                    np.empty(0),
+                )
+        return pools
+
+    def shutdown(self) -> None:
+        """Stop the workers and free the shared memory block."""
+        with self._lock:
+            self._stop()
+
+    def _stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._version = None
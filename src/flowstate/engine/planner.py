@@ -0,0 +1,186 @@
+"""Multi-step lookahead planning (beam search over the next few tracks)."""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from ..models import Direction, Plan, PlannedPath, Track
+from .features import FeatureStore
+from .ranking import select_top
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine
+
+DIRECTIONS = list(Direction)
+
+
+class LookaheadPlanner:
+    """
+    Beam search over sequences of upcoming tracks.
+
+    Each track's best successors (across UP/HOLD/DOWN) are computed once
+    and memoized, so re-planning after a track change mostly reuses
+    earlier work. A memoized list is reused whenever it is long enough,
+    or holds every valid successor (as in sparse parts of the corpus).
+    Successor lists are sorted best-first, which gives a cheap upper
+    bound: once `path score + successor score` can't enter the beam, no
+    later successor can either.
+    """
+
+    def __init__(self, engine: "RecommendationEngine", memo_size: int = 4096):
+        self.engine = engine
+        self.memo_size = memo_size
+        # track ID -> (rows, scores, direction indexes, whether every valid successor is listed)
+        self._memo: OrderedDict[str, tuple[np.ndarray, np.ndarray, np.ndarray, bool]] = OrderedDict()
+        self._memo_key: Optional[tuple] = None
+        self._memo_lock = threading.Lock()  # Plans for several sessions share the memo
+
+    def plan(
+        self,
+        current: Track,
+        history: list[str],
+        depth: int = 3,
+        beam: int = 20,
+        budget_ms: Optional[float] = 50.0,
+    ) -> Plan:
+        """
+        Find the best sequences of the next `depth` tracks.
+
+        Args:
+            current: Track playing now
+            history: Recently played track IDs to avoid
+            depth: Number of upcoming tracks to plan
+            beam: Partial sequences kept at each step
+            budget_ms: Latency budget; the best sequences found so far are
+                returned (marked incomplete) when it runs out. None or 0
+                disables the budget
+
+        Returns:
+            Plan with paths best-first
+        """
+        engine = self.engine
+        store = engine.features
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms else None
+
+        memo_key = (store.version, engine.config.fingerprint(), id(engine.graph))
+        with self._memo_lock:
+            if memo_key != self._memo_key:
+                self._memo.clear()
+                self._memo_key = memo_key
+
+        avoid = set(store.rows_for([current.track_id, *history]).tolist())
+        width = beam + depth + len(avoid)
+
+        # Each state: (sum of transition scores, rows, direction indexes, scores)
+        level: list[tuple[float, tuple, tuple, tuple]] = [(0.0, (), (), ())]
+        complete = True
+
+        for _ in range(depth):
+            heap: list[tuple[float, tuple, tuple, tuple]] = []
+
+            for total, rows, dirs, scores in level:
+                last = store.tracks[rows[-1]] if rows else current
+                succ_rows, succ_scores, succ_dirs = self._successors(last, store, width)
+
+                for row, score, d in zip(succ_rows.tolist(), succ_scores.tolist(), succ_dirs.tolist()):
+                    path_total = total + score
+                    if len(heap) == beam and path_total <= heap[0][0]:
+                        break  # Sorted successors: nothing further can enter the beam
+                    if row in avoid or row in rows:
+                        continue
+
+                    state = (path_total, rows + (row,), dirs + (d,), scores + (score,))
+                    if len(heap) < beam:
+                        heapq.heappush(heap, state)
+                    else:
+                        heapq.heappushpop(heap, state)
+
+                if deadline is not None and time.perf_counter() > deadline:
+                    complete = False
+                    break
+
+            if heap:
+                level = sorted(heap, key=lambda state: -state[0])
+            if not complete or not heap:
+                break
+
+        paths = [
+            PlannedPath(
+                tracks=[store.tracks[row] for row in rows],
+                directions=[DIRECTIONS[d] for d in dirs],
+                transition_scores=list(scores),
+                total_score=total / len(rows),
+            )
+            for total, rows, dirs, scores in level
+            if rows
+        ]
+
+        lookahead: dict[str, float] = {}
+        for path in paths:
+            first = path.tracks[0].track_id
+            lookahead[first] = max(lookahead.get(first, 0.0), path.total_score)
+
+        return Plan(
+            current_track=current,
+            paths=paths,
+            depth=len(paths[0].tracks) if paths else 0,
+            complete=complete,
+            lookahead=lookahead,
+        )
+
+    def _successors(
+        self,
+        track: Track,
+        store: FeatureStore,
+        width: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Memoized best successors of a track: rows, scores and direction indexes."""
+        with self._memo_lock:
+            cached = self._memo.get(track.track_id)
+            if cached is not None and (cached[3] or len(cached[0]) >= width):
+                self._memo.move_to_end(track.track_id)
+                return cached[:3]
+
+        rows, scores, dirs = [], [], []
+        exhaustive = True
+        graph = self.engine.graph
+        row = store.row_of.get(track.track_id)
+
+        if graph is not None and row is not None and graph.matches(store, self.engine.config):
+            # Precomputed successors: O(K) per track
+            for d, direction in enumerate(DIRECTIONS):
+                successors = graph.successors(row, direction)
+                # A full list may have been cut at K
+                exhaustive &= len(successors) < graph.k
+                rows.append(successors)
+                scores.append(graph.scores[row, d, :len(successors)].astype(np.float64))
+                dirs.append(np.full(len(successors), d))
+        else:
+            pools, _ = self.engine._score_candidates(track, store, [])
+            for d, direction in enumerate(DIRECTIONS):
+                pool = pools[direction]
+                order = select_top(pool.totals, store.id_rank[pool.rows], width)
+                exhaustive &= len(order) == len(pool.rows)
+                rows.append(pool.rows[order])
+                scores.append(pool.totals[order])
+                dirs.append(np.full(len(order), d))
+        rows, scores, dirs = np.concatenate(rows), np.concatenate(scores), np.concatenate(dirs)
+
+        # A track can qualify for two directions; keep its best-scoring one
+        order = np.lexsort((store.id_rank[rows], -scores))
+        rows, scores, dirs = rows[order], scores[order], dirs[order]
+        _, first = np.unique(rows, return_index=True)
+        keep = np.sort(first)[:width]
+        exhaustive &= len(first) <= width
+
+        result = (rows[keep], scores[keep], dirs[keep])
+        with self._memo_lock:
+            self._memo[track.track_id] = (*result, exhaustive)
+            self._memo.move_to_end(track.track_id)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
@@ -0,0 +1,77 @@
+"""Candidate selection for the ranking stage."""
+
+import numpy as np
+
+
+def select_top(scores: np.ndarray, tiebreak: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first.
+
+    Uses a linear-time partition to find the k-th best score and only
+    sorts the entries at or above it, so no full sorted list is built.
+    Ties are broken by ascending `tiebreak` (e.g. track ID rank), which
+    keeps results stable between calls.
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        # Everything tied with the k-th best stays in play for the tie-break
+        kth_best = np.partition(scores, n - k)[n - k]
+        selected = np.flatnonzero(scores >= kth_best)
+    else:
+        selected = np.arange(n)
+
+    order = np.lexsort((tiebreak[selected], -scores[selected]))
+    return selected[order[:k]]
+
+
+def _dominated(front: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Which points (columns of a d × m matrix) some front column beats."""
+    # front × points matrices, one coordinate at a time (d is small, the matrices aren't)
+    ge = front[0, :, None] >= points[0, None, :]
+    gt = front[0, :, None] > points[0, None, :]
+    for j in range(1, len(points)):
+        ge &= front[j, :, None] >= points[j, None, :]
+        gt |= front[j, :, None] > points[j, None, :]
+    return (ge & gt).any(axis=0)
+
+
+def skyline(points: np.ndarray, block: int = 64) -> np.ndarray:
+    """
+    Positions of the Pareto-optimal rows of an n × d matrix (higher is better).
+
+    A row is dominated if another is at least as good in every column and
+    better in one. Sort-filter-skyline: rows are visited in descending
+    coordinate sum, so a row's dominators come before it. Each block is
+    checked against the skyline so far in one vectorized comparison, and
+    only its survivors against each other, so all n × n pairs are never
+    compared. Blocks double in size as the skyline filters more of them.
+
+    Returns:
+        Skyline positions in visiting order
+    """
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    if points.shape[1] == 0:
+        return np.arange(n)
+
+    order = np.argsort(-points.sum(axis=1), kind="stable")
+    columns = np.ascontiguousarray(points[order].T)
+    kept = np.empty(0, dtype=np.int64)
+
+    start = 0
+    while start < n:
+        stop = min(start + block, n)
+        survivors = start + np.flatnonzero(~_dominated(columns[:, kept], columns[:, start:stop]))
+        # A survivor's dominators in the block survived too (else the skyline beats it)
+        rest = columns[:, survivors]
+        kept = np.concatenate([kept, survivors[~_dominated(rest, rest)]])
+        start, block = stop, min(block * 2, 4096)
+
+    # Rounded sums can tie a row with its dominator in a later block: drop such rows
+    front = columns[:, kept]
+    return order[kept[~_dominated(front, front)]]
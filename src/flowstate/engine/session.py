@@ -0,0 +1,80 @@
+"""Per-client play history on top of a shared engine."""
+
+import threading
+import time
+
+
+class Session:
+    """
+    Play history of one client: a browser tab, a deck or a B2B partner.
+
+    The history is an immutable tuple that is replaced, never mutated, so
+    readers always see a consistent snapshot without locking. Only
+    writers of the same session serialize on its lock. Every selection
+    (recommend() for a track) starts a new `generation`, so work started
+    for an earlier selection can tell it has been superseded.
+    """
+
+    def __init__(self, session_id: str, max_history: int = 20):
+        self.session_id = session_id
+        self.max_history = max_history
+        self.last_used = time.monotonic()
+        self._history: tuple[str, ...] = ()
+        self._lock = threading.Lock()
+        self.generation = 0
+        # Raw scores of the last live recommendation, re-ranked on weight changes
+        self.scored = None
+        # Deeper ranked pools of the last recommendation, patched on history changes
+        self.ranked = None
+
+    @property
+    def history(self) -> list[str]:
+        """Recently played track IDs, most recent first."""
+        return list(self._history)
+
+    @history.setter
+    def history(self, track_ids: list[str]) -> None:
+        with self._lock:
+            self._history = tuple(track_ids[:self.max_history])
+
+    def add(self, track_id: str) -> list[str]:
+        """Move a track to the front of the history and return the new snapshot."""
+        return self.select(track_id, advance=False)[0]
+
+    def select(self, track_id: str, advance: bool = True) -> tuple[list[str], int]:
+        """
+        Play a track: add it to the history and start a new generation.
+
+        Returns:
+            (the new history snapshot, this selection's generation)
+        """
+        with self._lock:
+            history = (track_id, *(t for t in self._history if t != track_id))[:self.max_history]
+            self._history = history
+            self.last_used = time.monotonic()
+            if advance:
+                self.generation += 1
+            generation = self.generation
+        return list(history), generation
+
+    def adopt(self, generation: int, scored, ranked) -> bool:
+        """Keep another computation's scored and ranked sets if `generation` is still current."""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self.scored = scored
+            self.ranked = ranked
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history = ()
+            self.scored = None
+            self.ranked = None
+
+    def info(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "history": len(self._history),
+            "idle_s": round(time.monotonic() - self.last_used, 1),
+        }
@@ -0,0 +1,207 @@
+"""Speculative precomputation of the next selection's recommendations."""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from ..models import Recommendations, Track
+from .features import FeatureStore
+
+if TYPE_CHECKING:
+    from .engine import RecommendationEngine, ScoringConfig
+
+
+class _Scope:
+    """Speculation state of one session."""
+
+    __slots__ = ("generation", "pending", "adopted", "unused")
+
+    def __init__(self):
+        self.generation = 0
+        self.pending: dict[tuple, Future] = {}
+        self.adopted: set[tuple] = set()
+        # Finished speculative results not yet requested, with their cost (ms)
+        self.unused: dict[tuple, float] = {}
+
+
+class Speculator:
+    """
+    Warms the result cache for the tracks currently being recommended.
+
+    The next selection is almost always one of the shown candidates, so
+    after each recommendation their own recommendation sets are computed
+    in a background thread pool, against the play history they would see
+    once selected. A new selection cancels queued work; results that
+    finish after the track changed are discarded.
+
+    Each session (scope) speculates independently: one client's selection
+    only cancels its own queued work.
+    """
+
+    def __init__(self, engine: "RecommendationEngine"):
+        self.engine = engine
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._scopes: dict[str, _Scope] = {}
+
+        self.scheduled = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.wasted_ms = 0.0
+
+    def _scope(self, scope: str) -> _Scope:
+        state = self._scopes.get(scope)
+        if state is None:
+            state = self._scopes[scope] = _Scope()
+        return state
+
+    def observe(self, key: tuple, scope: str = "default") -> Optional[Future]:
+        """
+        Note that a session requested a recommendation set, cancelling its other speculation.
+
+        Returns:
+            The in-flight speculative job for this key, if there is one
+        """
+        with self._lock:
+            state = self._scope(scope)
+            speculating = bool(state.pending or state.unused)
+            state.generation += 1
+
+            adopted = state.pending.pop(key, None)
+            if adopted is not None and adopted.cancelled():
+                adopted = None
+            if adopted is not None:
+                state.adopted.add(key)
+
+            self._cancel_pending(state)
+
+            if key in state.unused or adopted is not None:
+                self.hits += 1
+                state.unused.pop(key, None)
+            elif speculating:
+                self.misses += 1
+
+            # Whatever the selection didn't use is wasted work
+            self.wasted += len(state.unused)
+            self.wasted_ms += sum(state.unused.values())
+            state.unused.clear()
+
+        return adopted
+
+    def _cancel_pending(self, state: _Scope) -> None:
+        for future in state.pending.values():
+            if future.cancel():
+                self.cancelled += 1
+        state.pending.clear()
+
+    def speculate(
+        self,
+        recs: Recommendations,
+        store: FeatureStore,
+        history: list[str],
+        scope: str = "default",
+    ) -> None:
+        """Schedule background computation for every shown candidate."""
+        engine = self.engine
+        config = engine.config
+        workers = config.speculation_workers
+        if workers <= 0 or config.cache_size <= 0:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+
+        fingerprint = config.fingerprint()
+        seen: set[str] = set()
+        with self._lock:
+            state = self._scope(scope)
+            generation = state.generation
+            for scored in recs.up + recs.hold + recs.down:
+                track = scored.track
+                if track.track_id in seen:
+                    continue
+                seen.add(track.track_id)
+
+                # The history this track will see once it is selected
+                next_history = [track.track_id] + [h for h in history if h != track.track_id]
+                next_history = next_history[:engine.max_history]
+                key = (track.track_id, frozenset(next_history), fingerprint, store.version)
+                if engine._cache_contains(key):
+                    continue
+
+                state.pending[key] = self._executor.submit(
+                    self._run, state, generation, key, config, track, store, next_history
+                )
+                self.scheduled += 1
+
+    def _run(
+        self,
+        state: _Scope,
+        generation: int,
+        key: tuple,
+        config: "ScoringConfig",
+        track: Track,
+        store: FeatureStore,
+        history: list[str],
+    ) -> Recommendations:
+        start = time.perf_counter()
+        # Under the config the key was made from, even if the weights changed since
+        with self.engine._snapshot(config):
+            recs = self.engine._compute(track, store, history)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.completed += 1
+            if key in state.adopted:
+                # The selection is waiting on this result and caches it itself
+                state.adopted.discard(key)
+            elif generation != state.generation:
+                self.wasted += 1
+                self.wasted_ms += elapsed_ms
+            else:
+                state.pending.pop(key, None)
+                state.unused[key] = elapsed_ms
+                self.engine._cache_put(key, recs)
+        return recs
+
+    def cancel(self) -> None:
+        """Cancel queued speculation (running jobs finish and are discarded)."""
+        with self._lock:
+            for state in self._scopes.values():
+                state.generation += 1
+                self._cancel_pending(state)
+
+    def forget(self, scope: str) -> None:
+        """Cancel a session's queued speculation and drop its state."""
+        with self._lock:
+            state = self._scopes.pop(scope, None)
+            if state is not None:
+                state.generation += 1
+                self._cancel_pending(state)
+
+    def shutdown(self) -> None:
+        """Cancel queued work and stop the worker threads."""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def info(self) -> dict[str, float]:
+        """Hit rate and wasted-work counters."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "scheduled": self.scheduled,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "pending": sum(len(state.pending) for state in self._scopes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "wasted": self.wasted,
+                "wasted_ms": round(self.wasted_ms, 3),
+            }
@@ -11,7 +11,16 @@ from .track import (
     VocalStyle,
 )
 from .corpus import Corpus, CorpusStats
-from .recommendations import Direction, FactorScore, Recommendations, ScoredTrack
+from .recommendations import (
+    Direction,
+    FactorScore,
+    PipelineTiming,
+    Plan,
+    PlannedPath,
+    Recommendations,
+    ScoredTrack,
+    TempoMatch,
+)
 
 __all__ = [
     # Track
@@ -29,6 +38,10 @@ __all__ = [
     # Recommendations
     "Direction",
     "FactorScore",
+    "PipelineTiming",
+    "Plan",
+    "PlannedPath",
     "Recommendations",
     "ScoredTrack",
+    "TempoMatch",
 ]
@@ -1,5 +1,7 @@
 """Camelot wheel key compatibility."""
 
+import numpy as np
+
 # Camelot wheel: Inner ring (minor) = A, Outer ring (major) = B
 # Moving clockwise adds 1, counterclockwise subtracts 1
 # Same number different letter = relative major/minor
@@ -18,6 +20,13 @@ CAMELOT_WHEEL = {
 # Reverse lookup: musical key to Camelot
 KEY_TO_CAMELOT = {v: k for k, v in CAMELOT_WHEEL.items()}
 
+# Integer key codes: 1A-12A = 0-11, 1B-12B = 12-23
+KEY_CODES = {key: code for code, key in enumerate(CAMELOT_WHEEL)}
+CODE_KEYS = list(CAMELOT_WHEEL)
+
+# Code for missing or unrecognised keys
+UNKNOWN_KEY = -1
+
 # Alternative key notations
 KEY_ALIASES = {
     # Enharmonic equivalents
@@ -56,9 +65,14 @@ def to_camelot(key: str) -> str | None:
     return KEY_TO_CAMELOT.get(key)
 
 
-def get_compatible_keys(key: str, extended: bool = True) -> list[str]:
+def encode_key(key: str) -> int:
+    """Encode a Camelot key string as an integer code (UNKNOWN_KEY if invalid)."""
+    return KEY_CODES.get(key.strip().upper(), UNKNOWN_KEY)
+
+
+def _wheel_neighbours(key: str, extended: bool) -> list[str]:
     """
-    Get harmonically compatible keys.
+    Harmonically compatible keys of a valid Camelot key.
 
     Args:
         key: Camelot key (e.g., "8A", "5B")
@@ -77,10 +91,6 @@ def get_compatible_keys(key: str, extended: bool = True) -> list[str]:
     - +2 on wheel
     - -2 on wheel
     """
-    key = key.upper()
-    if key not in CAMELOT_WHEEL:
-        return []
-
     num = int(key[:-1])
     letter = key[-1]
 
@@ -104,9 +114,9 @@ def get_compatible_keys(key: str, extended: bool = True) -> list[str]:
     return compatible
 
 
-def key_compatibility_score(key1: str, key2: str) -> float:
+def _wheel_score(key1: str, key2: str) -> float:
     """
-    Score key compatibility between 0 and 1.
+    Score compatibility of two valid Camelot keys between 0 and 1.
 
     Returns:
         1.0 = same key
@@ -115,12 +125,6 @@ def key_compatibility_score(key1: str, key2: str) -> float:
         0.3 = energy boost/drop (+7 semitones)
         0.0 = clash
     """
-    key1 = key1.upper()
-    key2 = key2.upper()
-
-    if key1 not in CAMELOT_WHEEL or key2 not in CAMELOT_WHEEL:
-        return 0.5  # Unknown, neutral score
-
     if key1 == key2:
         return 1.0
 
@@ -154,6 +158,55 @@ def key_compatibility_score(key1: str, key2: str) -> float:
     return 0.0  # Clash
 
 
+# Precomputed tables, indexed by key code
+KEY_SCORES = np.array([[_wheel_score(k1, k2) for k2 in CODE_KEYS] for k1 in CODE_KEYS])
+_COMPATIBLE = {
+    extended: [tuple(KEY_CODES[k] for k in _wheel_neighbours(key, extended)) for key in CODE_KEYS]
+    for extended in (True, False)
+}
+# 24-bit masks: bit j is set if key code j is compatible
+COMPATIBLE_MASKS = {
+    extended: [sum(1 << code for code in codes) for codes in compatible]
+    for extended, compatible in _COMPATIBLE.items()
+}
+
+
+def compatible_codes(key_code: int, extended: bool = True) -> tuple[int, ...]:
+    """Codes of keys compatible with a key code (empty if unknown)."""
+    return _COMPATIBLE[extended][key_code] if key_code >= 0 else ()
+
+
+def compatibility_mask(key_code: int, extended: bool = True) -> int:
+    """Compatibility bitmask of a key code (0 if unknown)."""
+    return COMPATIBLE_MASKS[extended][key_code] if key_code >= 0 else 0
+
+
+def get_compatible_keys(key: str, extended: bool = True) -> list[str]:
+    """
+    Get harmonically compatible keys.
+
+    Args:
+        key: Camelot key (e.g., "8A", "5B")
+        extended: If True, include 2-step compatible keys
+
+    Returns:
+        List of compatible Camelot keys (empty if the key is unknown)
+    """
+    return [CODE_KEYS[code] for code in compatible_codes(encode_key(key), extended)]
+
+
+def key_compatibility_score(key1: str, key2: str) -> float:
+    """
+    Score key compatibility between 0 and 1 (see KEY_SCORES).
+
+    Unknown keys score a neutral 0.5.
+    """
+    code1, code2 = encode_key(key1), encode_key(key2)
+    if code1 < 0 or code2 < 0:
+        return 0.5  # Unknown, neutral score
+    return float(KEY_SCORES[code1, code2])
+
+
 def compute_compatible_keys(track_key: str) -> list[str]:
     """Compute and return compatible keys for a track."""
     return get_compatible_keys(track_key, extended=True)
@@ -55,6 +55,13 @@ class Corpus(BaseModel):
     # Indexes (built on load) - private attributes
     _by_id: dict[str, Track] = PrivateAttr(default_factory=dict)
     _by_path: dict[str, Track] = PrivateAttr(default_factory=dict)
+    _row_of: dict[str, int] = PrivateAttr(default_factory=dict)
+
+    # Bumped on every mutation so derived structures know when to rebuild
+    _version: int = PrivateAttr(default=0)
+    # Row changed by each add() since the last full rebuild (at _changes_since)
+    _changes: list[int] = PrivateAttr(default_factory=list)
+    _changes_since: int = PrivateAttr(default=0)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -66,15 +73,44 @@ class Corpus(BaseModel):
         """Rebuild lookup indexes."""
         self._by_id = {t.track_id: t for t in self.tracks}
         self._by_path = {str(t.file_path): t for t in self.tracks}
+        self._row_of = {t.track_id: row for row, t in enumerate(self.tracks)}
+        self._version += 1
+        self._changes = []
+        self._changes_since = self._version
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter that changes whenever the track set changes."""
+        return self._version
+
+    def changed_rows(self, since: int) -> Optional[list[int]]:
+        """
+        Rows added or replaced by add() after version `since`.
+
+        Returns None when that is unknown (the indexes were rebuilt since),
+        so callers have to rebuild whatever they derived from the tracks.
+        """
+        if not self._changes_since <= since <= self._version:
+            return None
+        return self._changes[since - self._changes_since:]
 
     def add(self, track: Track) -> None:
         """Add a track to the corpus."""
         # Update if exists, otherwise add
-        if track.track_id in self._by_id:
-            self.tracks = [t if t.track_id != track.track_id else track for t in self.tracks]
+        row = self._row_of.get(track.track_id)
+        if row is not None:
+            self._by_path.pop(str(self.tracks[row].file_path), None)
+            self.tracks[row] = track
         else:
+            row = len(self.tracks)
             self.tracks.append(track)
-        self._rebuild_indexes()
+
+        # Update indexes in place rather than rebuilding them
+        self._by_id[track.track_id] = track
+        self._by_path[str(track.file_path)] = track
+        self._row_of[track.track_id] = row
+        self._changes.append(row)
+        self._version += 1
         self.updated_at = datetime.now()
 
     def get_by_id(self, track_id: str) -> Optional[Track]:
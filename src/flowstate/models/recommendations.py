@@ -1,9 +1,9 @@
 """Recommendation data models."""
 
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from .track import Track
 
@@ -15,6 +15,13 @@ class Direction(str, Enum):
     DOWN = "down"
 
 
+class TempoMatch(str, Enum):
+    """How a candidate's BPM relates to the current track's."""
+    SAME = "same"
+    DOUBLE = "double"  # Candidate at ~2x the current BPM
+    HALF = "half"  # Candidate at ~1/2 the current BPM
+
+
 class FactorScore(BaseModel):
     """Individual scoring factor result."""
 
@@ -33,8 +40,29 @@ class ScoredTrack(BaseModel):
     total_score: float = Field(ge=0, le=1)
     factor_scores: list[FactorScore] = Field(default_factory=list)
 
+    # BPM window (± BPM, at the matched tempo) that admitted the candidate
+    bpm_window: Optional[float] = None
+    tempo_match: TempoMatch = TempoMatch.SAME
+    stretched: bool = False  # Admitted only after widening beyond bpm_range
+
+    # Deferred reason strings, one per factor score (filled in on demand)
+    _reason_source: Optional[Callable[[], list[Optional[str]]]] = PrivateAttr(default=None)
+
+    def set_reason_source(self, source: Callable[[], list[Optional[str]]]) -> None:
+        """Provide factor reasons lazily instead of formatting them up front."""
+        self._reason_source = source
+
+    def resolve_reasons(self) -> None:
+        """Fill in any deferred factor reason strings."""
+        if self._reason_source is None:
+            return
+        for fs, reason in zip(self.factor_scores, self._reason_source()):
+            fs.reason = reason
+        self._reason_source = None
+
     def explain(self) -> str:
         """Return human-readable explanation of the score."""
+        self.resolve_reasons()
         lines = [
             f"{self.track.title} - {self.track.artist}",
             f"Direction: {self.direction.value.upper()} | Score: {self.total_score:.2f}",
@@ -52,6 +80,16 @@ class ScoredTrack(BaseModel):
         return "\n".join(lines)
 
 
+class PipelineTiming(BaseModel):
+    """Where one recommend() call spent its time (milliseconds)."""
+
+    source: str = Field(default="live", description="live, parallel, graph, rerank, patch, anytime, speculation or cache")
+    total_ms: float = 0.0
+    stages: dict[str, float] = Field(default_factory=dict, description="filter, split, score, rank, ...")
+    factors: dict[str, float] = Field(default_factory=dict, description="Scoring time per factor")
+    counts: dict[str, int] = Field(default_factory=dict, description="Candidates left after each stage")
+
+
 class Recommendations(BaseModel):
     """Complete recommendation set for all directions."""
 
@@ -64,6 +102,9 @@ class Recommendations(BaseModel):
     candidates_considered: int = 0
     filtered_count: int = 0
     recently_played: list[str] = Field(default_factory=list)
+    # Best so far: the latency deadline passed before every candidate was scored
+    partial: bool = False
+    timing: Optional[PipelineTiming] = None  # Set when the engine is instrumented
 
     def get_direction(self, direction: Direction) -> list[ScoredTrack]:
         """Get recommendations for a specific direction."""
@@ -80,3 +121,28 @@ class Recommendations(BaseModel):
     def all_recommendations(self) -> list[ScoredTrack]:
         """Get all recommendations across all directions."""
         return self.up + self.hold + self.down
+
+
+class PlannedPath(BaseModel):
+    """A possible sequence of upcoming tracks."""
+
+    tracks: list[Track] = Field(default_factory=list)
+    directions: list[Direction] = Field(default_factory=list)
+    transition_scores: list[float] = Field(default_factory=list)
+    total_score: float = Field(default=0, ge=0, le=1, description="Mean transition score")
+
+
+class Plan(BaseModel):
+    """Lookahead plan: best sequences of the next few tracks."""
+
+    current_track: Track
+    paths: list[PlannedPath] = Field(default_factory=list)
+    depth: int = 0
+    complete: bool = Field(default=True, description="False if the latency budget cut the search short")
+
+    # Best path score reachable through each first pick (track_id -> score)
+    lookahead: dict[str, float] = Field(default_factory=dict)
+
+    def best(self) -> Optional[PlannedPath]:
+        """Highest scoring path, if any."""
+        return self.paths[0] if self.paths else None
@@ -7,6 +7,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from .camelot import encode_key, get_compatible_keys
+
 
 class Vibe(str, Enum):
     """Track vibe/mood classification."""
@@ -35,6 +37,18 @@ class GrooveStyle(str, Enum):
     LINEAR = "linear"
 
 
+# Small integer codes for categorical fields (enum order); -1 = unknown
+UNKNOWN_CODE = -1
+VIBE_CODES = {v.value: code for code, v in enumerate(Vibe)}
+INTENSITY_CODES = {i.value: code for code, i in enumerate(Intensity)}
+GROOVE_CODES = {g.value: code for code, g in enumerate(GrooveStyle)}
+
+
+def _value(field) -> str:
+    """Plain string value of a field that may still be an Enum."""
+    return field if isinstance(field, str) else field.value
+
+
 class VocalPresence(str, Enum):
     """Type of vocals in the track."""
     INSTRUMENTAL = "instrumental"
@@ -143,9 +157,6 @@ class Track(BaseModel):
     )
     notes: Optional[str] = Field(default=None, description="Personal notes")
 
-    # === Computed (set after load) ===
-    compatible_keys: list[str] = Field(default_factory=list)
-
     # === Timestamps ===
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -153,6 +164,43 @@ class Track(BaseModel):
     class Config:
         use_enum_values = True
 
+    # Derived on every access, so copies and edits never go stale, and
+    # never serialized
+
+    @property
+    def key_code(self) -> int:
+        """Camelot code of the key (0-23), or -1 if it is unknown."""
+        return encode_key(self.key)
+
+    @property
+    def compatible_keys(self) -> list[str]:
+        """Camelot keys that mix harmonically with this track's key."""
+        return get_compatible_keys(self.key)
+
+    @property
+    def vibe_code(self) -> int:
+        """Small integer code of the vibe (see VIBE_CODES)."""
+        return VIBE_CODES.get(_value(self.vibe), UNKNOWN_CODE)
+
+    @property
+    def intensity_code(self) -> int:
+        """Small integer code of the intensity (see INTENSITY_CODES)."""
+        return INTENSITY_CODES.get(_value(self.intensity), UNKNOWN_CODE)
+
+    @property
+    def groove_code(self) -> int:
+        """Small integer code of the groove style (see GROOVE_CODES)."""
+        return GROOVE_CODES.get(_value(self.groove_style), UNKNOWN_CODE)
+
+    @property
+    def genre_lower(self) -> str:
+        """Genre for case-insensitive matching."""
+        return self.genre.lower()
+
+    @property
+    def subgenre_lower(self) -> Optional[str]:
+        """Subgenre for case-insensitive matching (None if there is none)."""
+        return self.subgenre.lower() if self.subgenre else None
 
 class AudioFile(BaseModel):
     """Scanned audio file before AI analysis."""
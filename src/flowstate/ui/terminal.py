@@ -16,19 +16,29 @@ from rich.text import Text
 from rich import box
 from rich.columns import Columns
 
-from ..models import Corpus, Direction, Recommendations, ScoredTrack, Track
+from ..models import Corpus, Direction, Recommendations, ScoredTrack, TempoMatch, Track
 from ..engine import RecommendationEngine
 
 
 class Dashboard:
     """Live-updating DJ dashboard centered on the current track."""
 
-    def __init__(self, corpus: Corpus, engine: RecommendationEngine, rekordbox_sync: bool = True):
+    def __init__(
+        self,
+        corpus: Corpus,
+        engine: RecommendationEngine,
+        rekordbox_sync: bool = True,
+        session_id: str = "terminal",
+    ):
         self.corpus = corpus
         self.engine = engine
+        self.session_id = session_id  # Play history used by this deck
         self.console = Console()
         self.current_track: Optional[Track] = None
         self.recommendations: Optional[Recommendations] = None
+        # "Show more": the page shown from the engine's deeper ranked pool (None: the top N)
+        self.page_offset = 0
+        self.pages: Optional[dict[Direction, list[ScoredTrack]]] = None
         self.set_history: list[Track] = []
         self.set_start_time: Optional[datetime] = None
         self.rekordbox_sync = rekordbox_sync
@@ -131,12 +141,12 @@ class Dashboard:
         table.add_column("#", style="bold", width=2)
         table.add_column("Title", style="white", no_wrap=True)
         table.add_column("Artist", style="cyan", no_wrap=True)
-        table.add_column("BPM", justify="right", width=4)
+        table.add_column("BPM", justify="right", width=5)
         table.add_column("Key", width=3)
         table.add_column("E", justify="center", width=2)
         table.add_column("Score", justify="right", width=5)
 
-        for i, scored in enumerate(tracks[:5], 1):
+        for i, scored in enumerate(tracks[:5], self.page_offset + 1):
             t = scored.track
             energy_delta = t.energy - (self.current_track.energy if self.current_track else 0)
             energy_style = "green" if energy_delta > 0 else "red" if energy_delta < 0 else "yellow"
@@ -145,7 +155,7 @@ class Dashboard:
                 str(i),
                 t.title[:20],
                 t.artist[:12],
-                f"{t.bpm:.0f}",
+                self._bpm_cell(scored),
                 t.key,
                 Text(str(t.energy), style=energy_style),
                 f"{scored.total_score:.2f}",
@@ -157,9 +167,17 @@ class Dashboard:
             border_style=color,
         )
 
+    def _bpm_cell(self, scored: ScoredTrack) -> Text:
+        """BPM, marked when it only matched via a widened or half/double-time window."""
+        mark = {TempoMatch.DOUBLE: "×2", TempoMatch.HALF: "½"}.get(scored.tempo_match, "")
+        if scored.stretched and not mark:
+            mark = "~"
+        style = "yellow" if mark else ""
+        return Text(f"{scored.track.bpm:.0f}{mark}", style=style)
+
     def _render_footer(self) -> Panel:
         """Render the footer with controls."""
-        controls = "[bold]s[/bold] search  │  [bold]1-5[/bold] UP  │  [bold]u/h/d[/bold]+# direction  │  [bold]r[/bold] refresh  │  [bold]q[/bold] quit"
+        controls = "[bold]s[/bold] search  │  [bold]1-5[/bold] UP  │  [bold]u/h/d[/bold]+# direction  │  [bold]m[/bold] more  │  [bold]r[/bold] refresh  │  [bold]q[/bold] quit"
         return Panel(controls, box=box.SIMPLE, style="dim")
 
     def _render_dashboard(self) -> Group:
@@ -175,9 +193,9 @@ class Dashboard:
         elements.append(Columns([now_playing, track_info], equal=True, expand=True))
 
         # Recommendations in a row
-        up_panel = self._render_recommendations("UP", self.recommendations.up if self.recommendations else [], "green", "↑")
-        hold_panel = self._render_recommendations("HOLD", self.recommendations.hold if self.recommendations else [], "yellow", "→")
-        down_panel = self._render_recommendations("DOWN", self.recommendations.down if self.recommendations else [], "red", "↓")
+        up_panel = self._render_recommendations("UP", self._shown(Direction.UP), "green", "↑")
+        hold_panel = self._render_recommendations("HOLD", self._shown(Direction.HOLD), "yellow", "→")
+        down_panel = self._render_recommendations("DOWN", self._shown(Direction.DOWN), "red", "↓")
         elements.append(Columns([up_panel, hold_panel, down_panel], equal=True, expand=True))
 
         # Footer
@@ -185,10 +203,43 @@ class Dashboard:
 
         return Group(*elements)
 
+    def _recommend(self, track: Track) -> None:
+        """Recommend for a track; partial (deadline) results are replaced once refined."""
+        self.recommendations = self.engine.recommend(
+            track, session=self.session_id, on_complete=self._on_refined
+        )
+        self.page_offset, self.pages = 0, None
+
+    def _on_refined(self, recs: Recommendations) -> None:
+        """Swap in a background-refined result if its track is still current."""
+        if self.current_track is not None and recs.current_track.track_id == self.current_track.track_id:
+            self.recommendations = recs
+            self.page_offset, self.pages = 0, None
+
+    def _shown(self, direction: Direction) -> list[ScoredTrack]:
+        """Tracks on screen for a direction: the current page, or the top N."""
+        if self.pages is not None:
+            return self.pages[direction]
+        return self.recommendations.get_direction(direction) if self.recommendations else []
+
+    def _show_more(self) -> None:
+        """Page every direction further down its ranking, wrapping to the top."""
+        if not self.current_track or not self.recommendations:
+            return
+        offset = self.page_offset + 5
+        pages = {
+            direction: self.engine.more(self.current_track, direction, offset, 5, session=self.session_id)
+            for direction in Direction
+        }
+        if any(pages.values()):
+            self.page_offset, self.pages = offset, pages
+        else:
+            self.page_offset, self.pages = 0, None
+
     def _select_track(self, track: Track):
         """Select a track and update recommendations."""
         self.current_track = track
-        self.recommendations = self.engine.recommend(track)
+        self._recommend(track)
 
         # Add to history
         if not self.set_start_time:
@@ -331,33 +382,36 @@ class Dashboard:
 
                     elif key == "r":
                         if self.current_track:
-                            self.recommendations = self.engine.recommend(self.current_track)
+                            self._recommend(self.current_track)
+
+                    elif key == "m":
+                        self._show_more()
 
-                    elif key in "12345" and self.recommendations and self.recommendations.up:
+                    elif key in "12345" and self._shown(Direction.UP):
                         idx = int(key) - 1
-                        if idx < len(self.recommendations.up):
-                            self._select_track(self.recommendations.up[idx].track)
+                        if idx < len(self._shown(Direction.UP)):
+                            self._select_track(self._shown(Direction.UP)[idx].track)
 
                     elif key == "u":
                         num = self._getch()
-                        if num in "12345" and self.recommendations and self.recommendations.up:
+                        if num in "12345" and self._shown(Direction.UP):
                             idx = int(num) - 1
-                            if idx < len(self.recommendations.up):
-                                self._select_track(self.recommendations.up[idx].track)
+                            if idx < len(self._shown(Direction.UP)):
+                                self._select_track(self._shown(Direction.UP)[idx].track)
 
                     elif key == "h":
                         num = self._getch()
-                        if num in "12345" and self.recommendations and self.recommendations.hold:
+                        if num in "12345" and self._shown(Direction.HOLD):
                             idx = int(num) - 1
-                            if idx < len(self.recommendations.hold):
-                                self._select_track(self.recommendations.hold[idx].track)
+                            if idx < len(self._shown(Direction.HOLD)):
+                                self._select_track(self._shown(Direction.HOLD)[idx].track)
 
                     elif key == "d":
                         num = self._getch()
-                        if num in "12345" and self.recommendations and self.recommendations.down:
+                        if num in "12345" and self._shown(Direction.DOWN):
                             idx = int(num) - 1
-                            if idx < len(self.recommendations.down):
-                                self._select_track(self.recommendations.down[idx].track)
+                            if idx < len(self._shown(Direction.DOWN)):
+                                self._select_track(self._shown(Direction.DOWN)[idx].track)
 
                 except KeyboardInterrupt:
                     break
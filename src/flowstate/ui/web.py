@@ -2,14 +2,16 @@
 
 import json
 import random
+import threading
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, g, render_template_string, jsonify, request
 
-from ..models import Corpus, Track, Recommendations
-from ..engine import RecommendationEngine
+from ..models import Corpus, Direction, Track, Recommendations, ScoredTrack
+from ..engine import WEIGHT_PRESETS, RecommendationEngine
 
 # HTML template embedded in Python for simplicity
 HTML_TEMPLATE = """
@@ -213,6 +215,17 @@ HTML_TEMPLATE = """
         .rec-title.hold { color: #ffd700; }
         .rec-title.down { color: #ff6b6b; }
         .rec-count { font-size: 12px; color: #666; }
+        .more-btn {
+            margin-left: 10px;
+            padding: 2px 10px;
+            background: transparent;
+            color: #888;
+            border: 1px solid #444;
+            border-radius: 10px;
+            cursor: pointer;
+            font-size: 11px;
+        }
+        .more-btn:hover { color: #fff; border-color: #888; }
 
         .rec-list { list-style: none; }
         .rec-item {
@@ -231,6 +244,7 @@ HTML_TEMPLATE = """
         .rec-track-title { font-size: 14px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
         .rec-track-artist { font-size: 12px; color: #888; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
         .rec-bpm, .rec-key { font-size: 12px; color: #888; min-width: 35px; text-align: right; }
+        .rec-bpm.stretched { color: #f0a030; }
         .rec-energy { font-size: 14px; font-weight: bold; min-width: 20px; text-align: center; }
         .rec-energy.up { color: #4ade80; }
         .rec-energy.down { color: #ff6b6b; }
@@ -264,6 +278,32 @@ HTML_TEMPLATE = """
         }
         .search-btn:hover { background: #00b8e6; }
 
+        .recommendations.partial .rec-list { opacity: 0.7; }
+
+        /* Factor weights */
+        .weights-panel {
+            background: rgba(0,0,0,0.3);
+            border-radius: 10px;
+            padding: 15px 20px;
+        }
+        .weights-header { display: flex; gap: 10px; align-items: center; margin-bottom: 10px; }
+        .weights-header h2 { font-size: 14px; color: #888; margin-right: auto; }
+        .preset-btn {
+            padding: 4px 12px;
+            background: transparent;
+            color: #00d4ff;
+            border: 1px solid #00d4ff;
+            border-radius: 12px;
+            cursor: pointer;
+            font-size: 12px;
+        }
+        .preset-btn:hover { background: rgba(0,212,255,0.15); }
+        .weights-grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px 20px; }
+        .weight-slider { display: flex; align-items: center; gap: 8px; font-size: 12px; color: #aaa; }
+        .weight-slider label { min-width: 130px; }
+        .weight-slider input { flex: 1; }
+        .weight-value { min-width: 28px; text-align: right; color: #fff; }
+
         /* Search Results Modal */
         .modal {
             display: none;
@@ -418,6 +458,7 @@ HTML_TEMPLATE = """
                     <div class="rec-header">
                         <span class="rec-title up">↑ UP</span>
                         <span class="rec-count" id="up-count">0 matches</span>
+                        <button class="more-btn" onclick="showMore('up')">more</button>
                     </div>
                     <ul class="rec-list" id="up-list"></ul>
                 </div>
@@ -426,6 +467,7 @@ HTML_TEMPLATE = """
                     <div class="rec-header">
                         <span class="rec-title hold">→ HOLD</span>
                         <span class="rec-count" id="hold-count">0 matches</span>
+                        <button class="more-btn" onclick="showMore('hold')">more</button>
                     </div>
                     <ul class="rec-list" id="hold-list"></ul>
                 </div>
@@ -434,10 +476,20 @@ HTML_TEMPLATE = """
                     <div class="rec-header">
                         <span class="rec-title down">↓ DOWN</span>
                         <span class="rec-count" id="down-count">0 matches</span>
+                        <button class="more-btn" onclick="showMore('down')">more</button>
                     </div>
                     <ul class="rec-list" id="down-list"></ul>
                 </div>
             </div>
+
+            <!-- Factor weights: changes re-rank the kept scores instantly -->
+            <div class="weights-panel">
+                <div class="weights-header">
+                    <h2>WEIGHTS</h2>
+                    <span id="preset-buttons"></span>
+                </div>
+                <div class="weights-grid" id="weights-grid"></div>
+            </div>
         </div>
     </div>
 
@@ -466,6 +518,7 @@ HTML_TEMPLATE = """
         let trackCount = 0;
         let candidateTrack = null;
         let currentRecommendations = null;
+        let refinedSource = null;
 
         // Update clock
         setInterval(() => {
@@ -635,6 +688,26 @@ HTML_TEMPLATE = """
         }
 
         // Called only from Rekordbox sync - Now Playing is driven by Rekordbox
+        function listenForRefined(trackId) {
+            if (refinedSource) refinedSource.close();
+            const source = refinedSource = new EventSource(`/api/refined/${trackId}`);
+            const done = () => {
+                source.close();
+                if (refinedSource === source) refinedSource = null;
+            };
+
+            source.onmessage = (event) => {
+                done();
+                if (!currentTrack || currentTrack.track_id !== trackId) return;
+                const data = JSON.parse(event.data);
+                currentRecommendations = data.recommendations;
+                renderRecommendations(data.recommendations);
+                document.querySelector('.recommendations').classList.remove('partial');
+            };
+            source.addEventListener('expired', done);
+            source.onerror = done;
+        }
+
         async function syncFromRekordbox(trackId, force = false) {
             // Skip if already showing this track (unless forced)
             if (!force && currentTrack && currentTrack.track_id === trackId) {
@@ -664,6 +737,12 @@ HTML_TEMPLATE = """
                 renderNowPlaying(data.track);
                 renderAnalysis(data.track);
                 renderRecommendations(data.recommendations);
+                document.querySelector('.recommendations').classList.toggle('partial', data.partial);
+
+                // Best-so-far result: the server pushes the refined one when it's ready
+                if (data.partial) {
+                    listenForRefined(data.track.track_id);
+                }
 
                 console.log(`Now playing (from Rekordbox): ${data.track.title} by ${data.track.artist}`);
             }
@@ -708,38 +787,70 @@ HTML_TEMPLATE = """
             // No longer needed - analysis shown in Now Playing
         }
 
+        const TEMPO_MARKS = { double: '×2', half: '½' };
+
+        function bpmMatchTitle(item) {
+            const tempo = item.tempo_match === 'same' ? '' : ` at ${item.tempo_match} time`;
+            return `Matched within ±${item.bpm_window} BPM${tempo}${item.stretched ? ' (widened window)' : ''}`;
+        }
+
+        const PAGE_SIZE = 5;
+        let recOffsets = { up: 0, hold: 0, down: 0 };
+
         function renderRecommendations(recs) {
+            recOffsets = { up: 0, hold: 0, down: 0 };
             ['up', 'hold', 'down'].forEach(dir => {
-                const list = document.getElementById(`${dir}-list`);
                 const count = document.getElementById(`${dir}-count`);
                 const tracks = recs[dir] || [];
 
                 count.textContent = `${tracks.length} matches`;
+                renderRecList(dir, tracks, 0);
+            });
+        }
 
-                if (tracks.length === 0) {
-                    list.innerHTML = '<li class="empty-state" style="padding:20px;"><small>No matches</small></li>';
-                    return;
-                }
+        // Next page of a direction from the engine's deeper ranked pool (wraps to the top)
+        async function showMore(dir) {
+            if (!currentTrack) return;
+            let offset = recOffsets[dir] + PAGE_SIZE;
+            let response = await fetch(`/api/more/${currentTrack.track_id}/${dir}?offset=${offset}&limit=${PAGE_SIZE}`);
+            let data = await response.json();
+            if (data.error) return;
+            if (data.tracks.length === 0 && offset > 0) {
+                offset = 0;
+                response = await fetch(`/api/more/${currentTrack.track_id}/${dir}?offset=0&limit=${PAGE_SIZE}`);
+                data = await response.json();
+                if (data.error) return;
+            }
+            recOffsets[dir] = offset;
+            renderRecList(dir, data.tracks, offset);
+        }
 
-                list.innerHTML = tracks.slice(0, 5).map((item, i) => {
-                    const t = item.track;
-                    const delta = t.energy - currentEnergy;
-                    const energyClass = delta > 0 ? 'up' : delta < 0 ? 'down' : 'same';
-                    return `
-                        <li class="rec-item" data-track-id="${t.track_id}" onclick="previewCandidate('${t.track_id}')">
-                            <span class="rec-num">${i + 1}</span>
-                            <div class="rec-track-info">
-                                <div class="rec-track-title">${t.title}</div>
-                                <div class="rec-track-artist">${t.artist}</div>
-                            </div>
-                            <span class="rec-bpm">${t.bpm.toFixed(0)}</span>
-                            <span class="rec-key">${t.key}</span>
-                            <span class="rec-energy ${energyClass}">${t.energy}</span>
-                            <span class="rec-score">${item.total_score.toFixed(2)}</span>
-                        </li>
-                    `;
-                }).join('');
-            });
+        function renderRecList(dir, tracks, offset) {
+            const list = document.getElementById(`${dir}-list`);
+
+            if (tracks.length === 0) {
+                list.innerHTML = '<li class="empty-state" style="padding:20px;"><small>No matches</small></li>';
+                return;
+            }
+
+            list.innerHTML = tracks.slice(0, PAGE_SIZE).map((item, i) => {
+                const t = item.track;
+                const delta = t.energy - currentEnergy;
+                const energyClass = delta > 0 ? 'up' : delta < 0 ? 'down' : 'same';
+                return `
+                    <li class="rec-item" data-track-id="${t.track_id}" onclick="previewCandidate('${t.track_id}')">
+                        <span class="rec-num">${offset + i + 1}</span>
+                        <div class="rec-track-info">
+                            <div class="rec-track-title">${t.title}</div>
+                            <div class="rec-track-artist">${t.artist}</div>
+                        </div>
+                        <span class="rec-bpm${item.stretched || item.tempo_match !== 'same' ? ' stretched' : ''}" title="${bpmMatchTitle(item)}">${t.bpm.toFixed(0)}${TEMPO_MARKS[item.tempo_match] || ''}</span>
+                        <span class="rec-key">${t.key}</span>
+                        <span class="rec-energy ${energyClass}">${t.energy}</span>
+                        <span class="rec-score">${item.total_score.toFixed(2)}</span>
+                    </li>
+                `;
+            }).join('');
         }
 
         async function openSearch() {
@@ -805,6 +916,63 @@ HTML_TEMPLATE = """
             }
         }
 
+        // Factor weight sliders: send the latest values, one request at a time
+        let weightsInFlight = false;
+        let weightsQueued = null;
+
+        function renderWeights(data) {
+            document.getElementById('preset-buttons').innerHTML = data.presets.map(name =>
+                `<button class="preset-btn" onclick="applyWeights({preset: '${name}'})">${name}</button>`
+            ).join(' ');
+            document.getElementById('weights-grid').innerHTML = Object.entries(data.weights).map(([name, weight]) => `
+                <div class="weight-slider">
+                    <label>${name}</label>
+                    <input type="range" min="0" max="1" step="0.05" value="${weight}" data-factor="${name}"
+                           oninput="this.nextElementSibling.textContent = Number(this.value).toFixed(2); applyWeights({weights: {[this.dataset.factor]: Number(this.value)}})" />
+                    <span class="weight-value">${weight.toFixed(2)}</span>
+                </div>
+            `).join('');
+        }
+
+        async function loadWeights() {
+            const response = await fetch('/api/weights');
+            renderWeights(await response.json());
+        }
+
+        async function applyWeights(change) {
+            if (weightsInFlight) {
+                weightsQueued = {...weightsQueued, ...change, weights: {...(weightsQueued || {}).weights, ...change.weights}};
+                return;
+            }
+            weightsInFlight = true;
+            try {
+                const response = await fetch('/api/weights', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({...change, track_id: currentTrack ? currentTrack.track_id : null}),
+                });
+                const data = await response.json();
+                if (data.error) {
+                    console.error('Error setting weights:', data.error);
+                    return;
+                }
+                if (change.preset) renderWeights(data);
+                if (data.recommendations) {
+                    currentRecommendations = data.recommendations;
+                    renderRecommendations(data.recommendations);
+                }
+            } finally {
+                weightsInFlight = false;
+                if (weightsQueued) {
+                    const next = weightsQueued;
+                    weightsQueued = null;
+                    applyWeights(next);
+                }
+            }
+        }
+
+        loadWeights();
+
         // Poll Rekordbox every 3 seconds
         setInterval(checkRekordbox, 3000);
         checkRekordbox();
@@ -814,8 +982,20 @@ HTML_TEMPLATE = """
 """
 
 
+SESSION_COOKIE = 'flowstate_session'
+
+# How long /api/refined waits for a partial result's refinement (seconds)
+REFINED_TIMEOUT = 30.0
+
+
 class WebUI:
-    """Web-based dashboard for Flowstate."""
+    """
+    Web-based dashboard for Flowstate.
+
+    Each browser gets its own play history: the session ID comes from a
+    `?session=` argument, an `X-Flowstate-Session` header, or a cookie
+    that is set on first visit.
+    """
 
     def __init__(self, corpus: Corpus, engine: RecommendationEngine, rekordbox_sync: bool = True):
         self.corpus = corpus
@@ -823,9 +1003,31 @@ class WebUI:
         self.rekordbox_sync = rekordbox_sync
         self.app = Flask(__name__)
         self._rb_monitor = None
+        # session ID -> (track ID, refined recommendations) awaiting /api/refined
+        self._refined: dict[str, tuple[str, Recommendations]] = {}
+        # session ID -> track ID of its latest /api/select
+        self._selected: dict[str, str] = {}
+        self._refined_ready = threading.Condition()
         self._setup_routes()
 
+    def _session_id(self) -> str:
+        """Session ID of the current request (minting one if needed)."""
+        if 'session_id' not in g:
+            g.session_id = (
+                request.args.get('session')
+                or request.headers.get('X-Flowstate-Session')
+                or request.cookies.get(SESSION_COOKIE)
+                or uuid.uuid4().hex
+            )
+        return g.session_id
+
     def _setup_routes(self):
+        @self.app.after_request
+        def remember_session(response):
+            if 'session_id' in g and request.cookies.get(SESSION_COOKIE) != g.session_id:
+                response.set_cookie(SESSION_COOKIE, g.session_id, samesite='Lax')
+            return response
+
         @self.app.route('/')
         def index():
             return render_template_string(HTML_TEMPLATE)
@@ -852,14 +1054,126 @@ class WebUI:
             if not track:
                 return jsonify({'error': 'Track not found'}), 404
 
-            recs = self.engine.recommend(track)
+            session_id = self._session_id()
+            with self._refined_ready:
+                # Supersedes (and ends the stream of) any earlier track's refinement
+                self._selected[session_id] = track_id
+                self._refined.pop(session_id, None)
+                self._refined_ready.notify_all()
+            recs = self.engine.recommend(
+                track,
+                session=session_id,
+                deadline_ms=request.args.get('deadline_ms', type=float),
+                on_complete=lambda refined: self._publish_refined(session_id, track_id, refined),
+            )
             return jsonify({
                 'track': self._track_to_dict(track),
-                'recommendations': {
-                    'up': [{'track': self._track_to_dict(s.track), 'total_score': s.total_score} for s in recs.up[:5]],
-                    'hold': [{'track': self._track_to_dict(s.track), 'total_score': s.total_score} for s in recs.hold[:5]],
-                    'down': [{'track': self._track_to_dict(s.track), 'total_score': s.total_score} for s in recs.down[:5]],
-                }
+                'recommendations': self._recs_to_dict(recs),
+                'partial': recs.partial,
+            })
+
+        @self.app.route('/api/refined/<track_id>')
+        def refined(track_id):
+            """
+            Server-sent event with the refined result of a partial /api/select.
+
+            Sends a named "expired" event instead if the session selects
+            another track first, or the wait times out.
+            """
+            session_id = self._session_id()
+
+            def stream():
+                with self._refined_ready:
+                    self._refined_ready.wait_for(
+                        lambda: self._refined.get(session_id, ('',))[0] == track_id
+                        or self._selected.get(session_id) != track_id,
+                        timeout=REFINED_TIMEOUT,
+                    )
+                    ready = self._refined.get(session_id, ('',))[0] == track_id
+                    recs = self._refined.pop(session_id)[1] if ready else None
+                if recs is None:
+                    # Named event, so the client closes instead of reconnecting
+                    yield 'event: expired\ndata: {}\n\n'
+                else:
+                    yield f"data: {json.dumps({'recommendations': self._recs_to_dict(recs)})}\n\n"
+
+            return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+        @self.app.route('/api/more/<track_id>/<direction>')
+        def more(track_id, direction):
+            """A further page of one direction's ranking ("show more")."""
+            track = self.corpus.get_by_id(track_id)
+            if not track:
+                return jsonify({'error': 'Track not found'}), 404
+            try:
+                direction = Direction(direction)
+            except ValueError:
+                return jsonify({'error': f'Unknown direction: {direction}'}), 400
+
+            offset = max(request.args.get('offset', 0, type=int), 0)
+            limit = min(max(request.args.get('limit', 5, type=int), 1), 50)
+            tracks = self.engine.more(track, direction, offset, limit, session=self._session_id())
+            return jsonify({
+                'direction': direction.value,
+                'offset': offset,
+                'tracks': [self._scored_to_dict(s) for s in tracks],
+            })
+
+        @self.app.route('/api/weights', methods=['GET', 'POST'])
+        def weights():
+            data = request.get_json(silent=True) or {}
+            if request.method == 'POST':
+                try:
+                    if data.get('preset'):
+                        self.engine.apply_preset(data['preset'])
+                    if data.get('weights'):
+                        self.engine.set_factor_weights(
+                            {name: float(weight) for name, weight in data['weights'].items()}
+                        )
+                except (TypeError, ValueError) as e:
+                    return jsonify({'error': str(e)}), 400
+
+            response = {
+                'weights': self.engine.get_factor_weights(),
+                'presets': list(WEIGHT_PRESETS),
+            }
+            # Re-rank the current track under the new weights (no rescoring)
+            track = self.corpus.get_by_id(data['track_id']) if data.get('track_id') else None
+            if track:
+                recs = self.engine.recommend(track, session=self._session_id())
+                response['recommendations'] = self._recs_to_dict(recs)
+            return jsonify(response)
+
+        @self.app.route('/api/plan/<track_id>')
+        def plan(track_id):
+            track = self.corpus.get_by_id(track_id)
+            if not track:
+                return jsonify({'error': 'Track not found'}), 404
+
+            depth = request.args.get('depth', 3, type=int)
+            result = self.engine.plan(track, depth=depth, session=self._session_id())
+            return jsonify({
+                'complete': result.complete,
+                'lookahead': result.lookahead,
+                'paths': [
+                    {
+                        'tracks': [self._track_to_dict(t) for t in path.tracks],
+                        'directions': [d.value for d in path.directions],
+                        'total_score': path.total_score,
+                    }
+                    for path in result.paths[:5]
+                ],
+            })
+
+        @self.app.route('/api/engine/stats')
+        def engine_stats():
+            return jsonify({
+                'cache': self.engine.cache_info(),
+                'speculation': self.engine.speculation_info(),
+                'sessions': self.engine.session_info(),
+                'timing': self.engine.timing_summary(
+                    buckets=request.args.get('buckets', 0, type=int) == 1
+                ),
             })
 
         @self.app.route('/api/rekordbox/now-playing')
@@ -958,6 +1272,31 @@ class WebUI:
                 import traceback
                 return jsonify({'error': str(e), 'trace': traceback.format_exc()})
 
+    def _publish_refined(self, session_id: str, track_id: str, recs: Recommendations) -> None:
+        """Hand a refined result to the session's /api/refined stream (unless it moved on)."""
+        with self._refined_ready:
+            if self._selected.get(session_id) != track_id:
+                return
+            self._refined[session_id] = (track_id, recs)
+            self._refined_ready.notify_all()
+
+    def _recs_to_dict(self, recs: Recommendations) -> dict:
+        return {
+            'up': [self._scored_to_dict(s) for s in recs.up[:5]],
+            'hold': [self._scored_to_dict(s) for s in recs.hold[:5]],
+            'down': [self._scored_to_dict(s) for s in recs.down[:5]],
+        }
+
+    def _scored_to_dict(self, scored: ScoredTrack) -> dict:
+        """Recommendation summary, including how it got past the BPM filter."""
+        return {
+            'track': self._track_to_dict(scored.track),
+            'total_score': scored.total_score,
+            'bpm_window': scored.bpm_window,
+            'tempo_match': scored.tempo_match.value,
+            'stretched': scored.stretched,
+        }
+
     def _track_to_dict(self, track: Track) -> dict:
         """Convert Track to JSON-serializable dict."""
         return {
@@ -0,0 +1,73 @@
+"""Shared fixtures and helpers for the engine tests."""
+
+import pytest
+
+from benchmarks.synthetic import generate_corpus
+from flowstate.engine import RecommendationEngine, ScoringConfig
+
+
+def scores(recs) -> tuple:
+    """Everything two recommendation results must agree on to be the same."""
+    return (
+        [
+            (s.track.track_id, s.direction, s.total_score, [fs.score for fs in s.factor_scores], s.bpm_window, s.tempo_match)
+            for s in recs.all_recommendations()
+        ],
+        recs.filtered_count,
+        recs.recently_played,
+    )
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """Seeded synthetic corpus shared by every test (don't mutate it)."""
+    return generate_corpus(1500, seed=11)
+
+
+@pytest.fixture(scope="session")
+def large_corpus():
+    """Seeded corpus with pools big enough for pruning to skip candidates."""
+    return generate_corpus(10000, seed=5)
+
+
+@pytest.fixture
+def make_engine(corpus):
+    """
+    Factory for engines over `corpus` (or a `corpus=` keyword) with no
+    result cache by default.
+    """
+    engines = []
+
+    def make(**settings) -> RecommendationEngine:
+        tracks = settings.pop("corpus", corpus)
+        settings.setdefault("cache_size", 0)
+        engine = RecommendationEngine(tracks, ScoringConfig(**settings))
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.close()
+
+
+@pytest.fixture
+def engine(make_engine):
+    """Engine with the default factors and no result cache."""
+    return make_engine()
+
+
+@pytest.fixture
+def make_reference(make_engine):
+    """
+    Factory for fresh engines that have played `history` (minus `current`)
+    with `weights`, to check incrementally updated results against.
+    """
+
+    def make(current, history, weights=None, **settings) -> RecommendationEngine:
+        reference = make_engine(**settings)
+        if weights:
+            reference.set_factor_weights(weights)
+        reference.recently_played = [track_id for track_id in history if track_id != current.track_id]
+        return reference
+
+    return make
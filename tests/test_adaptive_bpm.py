@@ -0,0 +1,89 @@
+"""Tests for the adaptive BPM window and half/double-time matching."""
+
+import numpy as np
+import pytest
+
+from flowstate.models import Direction, TempoMatch
+
+
+def _unbounded_rows(make_engine, current):
+    """Candidate rows per direction with every other filter but BPM applied."""
+    engine = make_engine(bpm_range=1000.0)
+    rows, _, _ = engine._filter_and_split(current, engine.features, [])
+    return rows
+
+
+@pytest.mark.parametrize("index", range(0, 300, 37))
+def test_half_double_time_matches_brute_force(make_engine, corpus, index):
+    current = corpus.tracks[index]
+    engine = make_engine(half_double_time=True)
+    store = engine.features
+    window = engine.config.bpm_range
+    rows, _, admitted = engine._filter_and_split(current, store, [])
+
+    expected_admitted = {}
+    for direction, candidates in _unbounded_rows(make_engine, current).items():
+        bpm = store.bpm[candidates]
+        same = np.abs(bpm - current.bpm) <= window
+        double = np.abs(bpm - current.bpm * 2.0) <= window * 2.0
+        half = np.abs(bpm - current.bpm * 0.5) <= window * 0.5
+        assert rows[direction].tolist() == candidates[same | double | half].tolist()
+
+        for row, is_double in zip(candidates[~same & (double | half)].tolist(), double[~same & (double | half)]):
+            expected_admitted[row] = (window, TempoMatch.DOUBLE if is_double else TempoMatch.HALF)
+    assert admitted == expected_admitted
+
+    for scored in engine.recommend(current).all_recommendations():
+        row = store.row_of[scored.track.track_id]
+        assert (scored.bpm_window, scored.tempo_match) == expected_admitted.get(row, (window, TempoMatch.SAME))
+        assert not scored.stretched
+
+
+@pytest.mark.parametrize("index", range(0, 300, 37))
+def test_widened_window_matches_brute_force(make_engine, corpus, index):
+    current = corpus.tracks[index]
+    # More than the corpus holds, so every direction widens to the maximum
+    engine = make_engine(min_candidates=len(corpus.tracks), bpm_step=2.5, max_bpm_range=14.0)
+    store = engine.features
+    config = engine.config
+    rows, _, admitted = engine._filter_and_split(current, store, [])
+
+    windows = [config.bpm_range]
+    while windows[-1] < config.max_bpm_range:
+        windows.append(min(windows[-1] + config.bpm_step, config.max_bpm_range))
+
+    expected_admitted = {}
+    for direction, candidates in _unbounded_rows(make_engine, current).items():
+        distance = np.abs(store.bpm[candidates] - current.bpm)
+        assert rows[direction].tolist() == candidates[distance <= config.max_bpm_range].tolist()
+
+        for row, d in zip(candidates.tolist(), distance.tolist()):
+            if config.bpm_range < d <= config.max_bpm_range:
+                expected_admitted[row] = (next(w for w in windows if d <= w), TempoMatch.SAME)
+    assert admitted == expected_admitted
+
+    for scored in engine.recommend(current).all_recommendations():
+        row = store.row_of[scored.track.track_id]
+        assert scored.stretched == (row in expected_admitted)
+        assert scored.bpm_window == expected_admitted.get(row, (config.bpm_range,))[0]
+
+
+def test_widening_stops_once_every_direction_has_enough(make_engine, corpus):
+    current = corpus.tracks[5]
+    plain = make_engine()
+    rows, _, _ = plain._filter_and_split(current, plain.features, [])
+    counts = sorted(len(direction_rows) for direction_rows in rows.values())
+
+    # Already enough everywhere: nothing is widened
+    engine = make_engine(min_candidates=counts[0])
+    assert engine._filter_and_split(current, engine.features, [])[2] == {}
+
+    # Only the short directions are widened
+    engine = make_engine(min_candidates=counts[-1])
+    widened, _, admitted = engine._filter_and_split(current, engine.features, [])
+    assert admitted
+    for direction in Direction:
+        if len(rows[direction]) >= counts[-1]:
+            assert widened[direction].tolist() == rows[direction].tolist()
+        else:
+            assert set(rows[direction].tolist()) < set(widened[direction].tolist())
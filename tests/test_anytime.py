@@ -0,0 +1,154 @@
+"""Tests for deadline-bound (anytime) recommendations."""
+
+import threading
+import time
+
+from flowstate.engine import RecommendationEngine, ScoringConfig
+
+from .conftest import scores
+
+
+def test_expired_deadline_scores_only_the_best_chunk(engine, corpus):
+    current = corpus.tracks[3]
+    store = engine.features
+    rows, _, _ = engine._filter_and_split(current, store, [])
+    scorer = engine._anytime
+
+    pools, complete = scorer.score(current, store, rows, time.perf_counter() - 1)
+    assert not complete
+    for direction, pool in pools.items():
+        assert len(pool.rows) == min(len(rows[direction]), scorer.min_chunk)
+        # The highest-priority rows of the direction
+        best = rows[direction][scorer._priority(current, store, rows[direction])][:scorer.min_chunk]
+        assert sorted(pool.rows.tolist()) == sorted(best.tolist())
+
+
+def test_tight_deadlines_never_return_empty_results(make_engine, corpus):
+    # Cold store: the first call also builds the feature store
+    engine = make_engine()
+    scorer = engine._anytime
+    for track in corpus.tracks[:40]:
+        engine.recently_played = []
+        recs = engine.recommend(track, deadline_ms=0.01)
+        store = engine.features
+        rows, _, _ = engine._filter_and_split(track, store, [track.track_id])
+        for direction, direction_rows in rows.items():
+            assert len(recs.get_direction(direction)) == min(len(direction_rows), engine.config.top_n)
+        # The reserve only covers ranking and returning, not the store build
+        assert scorer._reserve < 0.05
+
+
+def test_generous_deadline_matches_full_scoring(engine, corpus):
+    reference = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    for track in corpus.tracks[:20]:
+        recs = engine.recommend(track, deadline_ms=60_000)
+        assert not recs.partial
+        assert scores(recs) == scores(reference.recommend(track))
+
+
+def test_partial_result_is_refined_in_the_background(corpus):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    reference = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    current = corpus.tracks[7]
+    refined = []
+    done = threading.Event()
+
+    def on_complete(recs):
+        refined.append(recs)
+        done.set()
+
+    try:
+        recs = engine.recommend(current, deadline_ms=1e-6, on_complete=on_complete)
+        assert recs.partial
+        assert done.wait(10)
+        assert not refined[0].partial
+        assert scores(refined[0]) == scores(reference.recommend(current))
+    finally:
+        engine.close()
+
+
+def test_every_caller_of_a_running_refinement_is_notified(corpus, monkeypatch):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    release = threading.Event()
+    run_refinement = engine._run_refinement
+
+    def slow_refinement(*args):
+        release.wait(10)
+        return run_refinement(*args)
+
+    monkeypatch.setattr(engine, "_run_refinement", slow_refinement)
+    notified = []
+    try:
+        for session in ("a", "b"):
+            # Same track and history in both sessions, so one refinement serves both
+            recs = engine.recommend(corpus.tracks[9], session=session, deadline_ms=1e-6, on_complete=notified.append)
+            assert recs.partial
+        assert len(engine._refining) == 1
+        release.set()
+        deadline = time.monotonic() + 10
+        while len(notified) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(notified) == 2
+    finally:
+        release.set()
+        engine.close()
+
+
+def _block_refinements(engine, monkeypatch):
+    """Hold refinement jobs until the returned event is set."""
+    release = threading.Event()
+    run_refinement = engine._run_refinement
+
+    def slow_refinement(*args):
+        release.wait(10)
+        return run_refinement(*args)
+
+    monkeypatch.setattr(engine, "_run_refinement", slow_refinement)
+    return release
+
+
+def test_queued_refinement_is_cancelled_when_the_session_moves_on(corpus, monkeypatch):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    release = _block_refinements(engine, monkeypatch)
+    notified = []
+    try:
+        # One refinement holds the single worker, so the next one queues
+        engine.recommend(corpus.tracks[0], session="other", deadline_ms=1e-6)
+        recs = engine.recommend(corpus.tracks[3], session="a", deadline_ms=1e-6, on_complete=notified.append)
+        assert recs.partial
+        [queued] = [r.job for r in engine._refining.values() if r.waiters[0][0].session_id == "a"]
+
+        engine.recommend(corpus.tracks[4], session="a")
+        assert queued.cancelled()
+        assert len(engine._refining) == 1
+        release.set()
+        time.sleep(0.1)
+        assert notified == []
+    finally:
+        release.set()
+        engine.close()
+
+
+def test_finished_refinement_does_not_overwrite_a_newer_selection(corpus, monkeypatch):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    release = _block_refinements(engine, monkeypatch)
+    notified = []
+    try:
+        engine.recommend(corpus.tracks[7], session="a", deadline_ms=1e-6, on_complete=notified.append)
+        [refinement] = engine._refining.values()
+        deadline = time.monotonic() + 10
+        while not refinement.job.running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Selected while the old track's refinement is running
+        engine.recommend(corpus.tracks[2], session="a")
+        release.set()
+        refinement.job.result(10)
+
+        session = engine.session("a")
+        assert session.ranked.key[0] == corpus.tracks[2].track_id
+        assert session.scored.key[0] == corpus.tracks[2].track_id
+        assert notified == []
+    finally:
+        release.set()
+        engine.close()
@@ -0,0 +1,108 @@
+"""Tests for batch recommendations."""
+
+import random
+
+import pytest
+
+from flowstate.engine import RecommendationEngine, ScoringConfig
+from flowstate.models import Direction
+
+from .conftest import scores
+
+
+@pytest.mark.parametrize("settings", [
+    {},
+    {"top_n": 12, "min_audio_fidelity": 6},
+    {"allow_key_clash": True, "bpm_range": 3.0},
+    {"batch_memory_mb": 0.05},  # Many small blocks
+])
+def test_recommend_many_matches_recommend(corpus, settings):
+    engine = RecommendationEngine(corpus, ScoringConfig(cache_size=0, **settings))
+    seeds = corpus.tracks[::30] + [t for t in corpus.tracks if not t.key][:2]  # Some with unknown keys
+    exclude = [t.track_id for t in corpus.tracks[5:15]]
+
+    expected = []
+    for seed in seeds:
+        engine.recently_played = exclude
+        expected.append(scores(engine.recommend(seed)))
+    engine.recently_played = []
+
+    assert [scores(recs) for recs in engine.recommend_many(seeds, exclude)] == expected
+
+
+def test_recommend_many_is_side_effect_free(corpus):
+    engine = RecommendationEngine(corpus, ScoringConfig())
+    recs = engine.recommend_many(corpus.tracks[:10], exclude=[corpus.tracks[20].track_id])
+
+    assert engine.recently_played == []
+    assert engine.cache_info()["size"] == 0
+    assert recs[0].recently_played == [corpus.tracks[0].track_id, corpus.tracks[20].track_id]
+
+
+def test_score_pairs_matches_recommend(engine, corpus):
+    for seed in corpus.tracks[:60:6]:
+        recs = engine.recommend(seed).all_recommendations()
+        engine.recently_played = []
+        scored = engine.score_pairs([(seed, s.track, s.direction) for s in recs])
+        assert [(s.track.track_id, s.direction, s.total_score, [f.score for f in s.factor_scores]) for s in scored] == [
+            (s.track.track_id, s.direction, s.total_score, [f.score for f in s.factor_scores]) for s in recs
+        ]
+
+
+def test_score_pairs_matches_per_pair_scores(engine, corpus):
+    rng = random.Random(0)
+    pairs = [(rng.choice(corpus.tracks), rng.choice(corpus.tracks), rng.choice([*Direction, None])) for _ in range(300)]
+    factors = engine.config.factors
+    config = engine.config
+
+    for (current, candidate, direction), scored in zip(pairs, engine.score_pairs(pairs)):
+        if direction is None:
+            # Inferred from the energy change, UP/DOWN taking precedence over HOLD
+            delta = candidate.energy - current.energy
+            direction = (
+                Direction.UP if delta >= config.up_min_delta
+                else Direction.DOWN if delta <= -config.down_min_delta
+                else Direction.HOLD
+            )
+        assert scored.direction == direction
+        assert [f.score for f in scored.factor_scores] == [f.score(current, candidate, direction).score for f in factors]
+
+
+def test_score_pairs_rejects_unknown_tracks(engine, corpus):
+    stranger = corpus.tracks[0].model_copy()  # Same ID, but not the corpus' track
+    with pytest.raises(ValueError, match="not in the engine's corpus"):
+        engine.score_pairs([(corpus.tracks[1], stranger, None)])
+
+
+def test_score_pairs_only_sets_bpm_window_inside_the_filter(engine, corpus):
+    rng = random.Random(1)
+    pairs = [(rng.choice(corpus.tracks), rng.choice(corpus.tracks), None) for _ in range(200)]
+    scored = engine.score_pairs(pairs)
+    window = engine.config.bpm_range
+    outside = 0
+    for (current, candidate, _), s in zip(pairs, scored):
+        if abs(candidate.bpm - current.bpm) <= window:
+            assert s.bpm_window == window
+        else:
+            assert s.bpm_window is None
+            outside += 1
+        assert not s.stretched
+    assert outside
+
+
+def test_batch_models_are_built_lazily_under_the_call_weights(make_engine, corpus):
+    engine = make_engine()
+    reference = make_engine()
+    rng = random.Random(2)
+    pairs = [(rng.choice(corpus.tracks), rng.choice(corpus.tracks), None) for _ in range(50)]
+    scored = engine.score_pairs(pairs)
+    recs = engine.recommend_many(corpus.tracks[:5])
+    assert scored._built == [None] * len(pairs)
+
+    # Models built after a weight change still show the call's weights
+    engine.set_factor_weight("Key Quality", 0.01)
+    assert [s.total_score for s in scored] == scored.totals.tolist()
+    assert [s.factor_scores for s in scored] == [s.factor_scores for s in reference.score_pairs(pairs)]
+    expected = [scores(r) for r in reference.recommend_many(corpus.tracks[:5])]
+    assert [scores(r) for r in recs] == expected
+    assert [scores(r.materialize()) for r in recs] == expected
@@ -0,0 +1,77 @@
+"""Tests for the recommendation result cache."""
+
+from benchmarks.synthetic import generate_corpus
+
+from .conftest import scores
+
+
+def _play(engine, track):
+    """Recommend for `track` as the first track of a fresh history."""
+    engine.recently_played = []
+    return engine.recommend(track)
+
+
+def test_repeated_request_is_a_hit(make_engine, make_reference, corpus):
+    engine = make_engine(cache_size=8, instrument=True)
+    track = corpus.tracks[0]
+    first = _play(engine, track)
+    again = _play(engine, track)
+
+    assert first.timing.source == "live"
+    assert again.timing.source == "cache"
+    assert scores(again) == scores(first) == scores(make_reference(track, []).recommend(track))
+    assert engine.cache_info() == {"hits": 1, "misses": 1, "size": 1, "max_size": 8}
+
+
+def test_least_recently_used_entry_is_evicted(make_engine, corpus):
+    engine = make_engine(cache_size=2, instrument=True)
+    a, b, c = corpus.tracks[:3]
+    _play(engine, a)
+    _play(engine, b)
+    assert _play(engine, a).timing.source == "cache"  # Now more recent than b
+    _play(engine, c)
+
+    assert [key[0] for key in engine._cache] == [a.track_id, c.track_id]
+    assert _play(engine, b).timing.source != "cache"
+    assert _play(engine, c).timing.source == "cache"
+
+
+def test_corpus_add_invalidates(make_engine, corpus):
+    library = generate_corpus(400, seed=21)
+    engine = make_engine(corpus=library, cache_size=8, instrument=True)
+    track = library.tracks[0]
+    best = _play(engine, track).all_recommendations()[0]
+
+    # A twin of the best candidate, which must now show up too
+    twin = best.track.model_copy(update={"track_id": "twin", "file_path": best.track.file_path.with_name("twin.mp3")})
+    library.add(twin)
+    recs = _play(engine, track)
+    assert recs.timing.source != "cache"
+    assert "twin" in [s.track.track_id for s in recs.all_recommendations()]
+    assert scores(recs) == scores(make_engine(corpus=library).recommend(track))
+
+
+def test_weight_change_invalidates(make_engine, make_reference, corpus):
+    engine = make_engine(cache_size=8, instrument=True)
+    track = corpus.tracks[1]
+    _play(engine, track)
+    engine.set_factor_weight("Mix Ease", 0.05)
+
+    recs = _play(engine, track)
+    assert recs.timing.source != "cache"
+    assert scores(recs) == scores(make_reference(track, [], engine.get_factor_weights()).recommend(track))
+
+
+def test_history_change_invalidates(make_engine, make_reference, corpus):
+    engine = make_engine(cache_size=8, instrument=True)
+    track = corpus.tracks[2]
+    played = _play(engine, track).all_recommendations()[0].track.track_id
+
+    engine.add_to_history(played)
+    recs = engine.recommend(track)
+    assert recs.timing.source != "cache"
+    assert played not in [s.track.track_id for s in recs.all_recommendations()]
+    assert scores(recs) == scores(make_reference(track, engine.recently_played).recommend(track))
+
+    # The entry for the original history is still there
+    assert _play(engine, track).timing.source == "cache"
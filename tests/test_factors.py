@@ -0,0 +1,35 @@
+"""Tests for vectorized factor scoring against the per-pair path (bit for bit)."""
+
+import numpy as np
+import pytest
+
+from flowstate.engine import DEFAULT_FACTORS
+from flowstate.models import Direction
+
+
+@pytest.mark.parametrize("factor", DEFAULT_FACTORS, ids=lambda factor: factor.name)
+@pytest.mark.parametrize("direction", list(Direction))
+def test_score_batch_matches_score(engine, corpus, factor, direction):
+    store = engine.features
+    rows = np.arange(0, len(corpus.tracks), 7)
+    candidates = store.view(rows)
+    # Include a current track with an unknown key
+    currents = corpus.tracks[:5] + [t for t in corpus.tracks if not t.key][:1]
+
+    for current in currents:
+        expected = [factor.score(current, store.tracks[row], direction).score for row in rows.tolist()]
+        assert factor.score_batch(current, candidates, direction).tolist() == expected
+
+
+def test_recommendations_match_per_pair_scores(engine, corpus):
+    factors = engine.config.factors
+    total_weight = sum(factor.weight for factor in factors)
+
+    for current in corpus.tracks[:40:4]:
+        for scored in engine.recommend(current).all_recommendations():
+            per_pair = [factor.score(current, scored.track, scored.direction) for factor in factors]
+            assert [fs.score for fs in scored.factor_scores] == [fs.score for fs in per_pair]
+            assert scored.total_score == sum(fs.score * factor.weight for fs, factor in zip(per_pair, factors)) / total_weight
+            # Reasons are formatted lazily, from the same per-pair path
+            scored.resolve_reasons()
+            assert [fs.reason for fs in scored.factor_scores] == [fs.reason for fs in per_pair]
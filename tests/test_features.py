@@ -0,0 +1,79 @@
+"""Tests for updating the feature store as tracks are added."""
+
+import random
+
+from benchmarks.synthetic import generate_corpus, generate_tracks
+from flowstate.engine import RecommendationEngine, ScoringConfig
+from flowstate.engine.features import FeatureStore
+
+from .conftest import scores
+
+
+def _assert_same_store(store: FeatureStore, expected: FeatureStore) -> None:
+    assert store.track_ids == expected.track_ids
+    assert store.row_of == expected.row_of
+    assert (store.id_rank == expected.id_rank).all()
+    for name in ("bpm", "energy", "danceability", "mix_in_ease", "mix_out_ease", "audio_fidelity", "key", "vibe", "intensity", "groove"):
+        assert (getattr(store, name) == getattr(expected, name)).all(), name
+    # Genres are compared by value: codes depend on the order strings were first seen
+    for name, codes in (("genre", "genre_codes"), ("subgenre", "subgenre_codes")):
+        values = {code: value for value, code in getattr(store, codes).items()}
+        expected_values = {code: value for value, code in getattr(expected, codes).items()}
+        assert [values.get(c) for c in getattr(store, name)] == [expected_values.get(c) for c in getattr(expected, name)]
+    for name in ("bpm_order", "sorted_bpm", "key_order", "key_sorted_bpm", "key_bounds"):
+        assert (getattr(store, name) == getattr(expected, name)).all(), name
+
+
+def test_added_and_replaced_tracks_update_the_store_exactly(monkeypatch):
+    corpus = generate_corpus(800, seed=3)
+    rng = random.Random(1)
+    new_tracks = iter(generate_tracks(200, seed=4))
+    store = FeatureStore.from_corpus(corpus)
+    updates = []
+    updated = FeatureStore._updated
+
+    def count_updates(self, *args):
+        updates.append(args)
+        return updated(self, *args)
+
+    monkeypatch.setattr(FeatureStore, "_updated", count_updates)
+
+    for _ in range(12):
+        for _ in range(rng.randint(1, 8)):
+            if rng.random() < 0.6:
+                corpus.add(next(new_tracks))
+            else:
+                # Same ID, new features (and sometimes a genre never seen before)
+                track = rng.choice(corpus.tracks)
+                genre = "Polka" if rng.random() < 0.2 else track.genre
+                corpus.add(track.model_copy(update={"bpm": float(rng.randint(90, 140)), "energy": rng.randint(1, 10), "genre": genre}))
+        store = FeatureStore.from_corpus(corpus, base=store)
+        assert store.version == corpus.version
+        _assert_same_store(store, FeatureStore(corpus.tracks))
+    assert len(updates) == 12
+
+
+def test_reloaded_or_heavily_changed_corpus_is_rebuilt():
+    corpus = generate_corpus(100, seed=3)
+    store = FeatureStore.from_corpus(corpus)
+    for track in generate_tracks(50, seed=4):
+        corpus.add(track)
+    assert corpus.changed_rows(store.version) == list(range(100, 150))
+    rebuilt = FeatureStore.from_corpus(corpus, base=store)
+    _assert_same_store(rebuilt, FeatureStore(corpus.tracks))
+
+    corpus._rebuild_indexes()
+    assert corpus.changed_rows(rebuilt.version) is None
+
+
+def test_recommendations_after_adds_match_a_fresh_engine():
+    corpus = generate_corpus(1000, seed=8)
+    engine = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    new_tracks = generate_tracks(30, seed=9)
+    for i, track in enumerate(new_tracks):
+        corpus.add(track)
+        current = corpus.tracks[i * 17]
+        engine.recently_played = []
+        fresh = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+        assert scores(engine.recommend(current)) == scores(fresh.recommend(current))
+    assert engine.features.rows_for(t.track_id for t in new_tracks).tolist() == list(range(1000, 1030))
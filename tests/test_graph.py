@@ -0,0 +1,61 @@
+"""Tests for serving recommendations from the offline transition graph."""
+
+import random
+
+import pytest
+
+from benchmarks.synthetic import generate_corpus, generate_tracks
+from flowstate.engine import ScoringConfig, TransitionGraph
+
+from .conftest import scores
+
+
+@pytest.fixture(scope="module")
+def library():
+    return generate_corpus(600, seed=31)
+
+
+@pytest.fixture(scope="module")
+def graph_file(library, tmp_path_factory):
+    path = tmp_path_factory.mktemp("graph") / "corpus.graph.npz"
+    TransitionGraph.build(library, ScoringConfig(cache_size=0), k=30, workers=1).save(path)
+    return path
+
+
+def test_graph_results_match_live_scoring(make_engine, library, graph_file):
+    engine = make_engine(corpus=library, instrument=True)
+    live = make_engine(corpus=library)
+    assert engine.load_graph(graph_file)
+
+    rng = random.Random(3)
+    sources = set()
+    for current in rng.sample(library.tracks, 40):
+        # Histories that take some of the graph's successors away (a track
+        # recommended in two directions is listed twice)
+        history = [s.track.track_id for s in live.recommend(current).all_recommendations()[:rng.randint(0, 6)]]
+        engine.recently_played = live.recently_played = history
+        recs = engine.recommend(current)
+        sources.add(recs.timing.source)
+        assert scores(recs) == scores(live.recommend(current))
+    assert "graph" in sources
+
+
+def test_graph_for_another_corpus_version_is_ignored(make_engine, graph_file):
+    library = generate_corpus(600, seed=31)
+    library.add(generate_tracks(1, seed=32)[0])
+    engine = make_engine(corpus=library, instrument=True)
+    live = make_engine(corpus=library)
+
+    assert not engine.load_graph(graph_file)
+    for current in library.tracks[:60:6]:
+        engine.recently_played = live.recently_played = []
+        recs = engine.recommend(current)
+        assert recs.timing.source == "live"
+        assert scores(recs) == scores(live.recommend(current))
+
+
+def test_graph_for_other_weights_is_ignored(make_engine, library, graph_file):
+    engine = make_engine(corpus=library, instrument=True)
+    assert engine.load_graph(graph_file)
+    engine.set_factor_weight("Mix Ease", 0.05)
+    assert engine.recommend(library.tracks[0]).timing.source != "graph"
@@ -0,0 +1,79 @@
+"""Tests for per-call pipeline timings and the rolling metrics built from them."""
+
+import pytest
+
+from flowstate.engine.instrumentation import BUCKET_EDGES_MS, PipelineMetrics, StageTimer
+from flowstate.models import PipelineTiming
+
+
+def test_recommend_records_stages_counts_and_factors(make_engine, corpus):
+    engine = make_engine(instrument=True)
+    recs = engine.recommend(corpus.tracks[0])
+    timing = recs.timing
+
+    assert timing.source == "live"
+    assert list(timing.stages) == ["filter", "split", "score", "rank"]
+    assert all(ms >= 0 for ms in timing.stages.values())
+    assert timing.total_ms >= sum(timing.stages.values())
+    assert timing.counts["filter"] == recs.filtered_count
+    assert timing.counts["ranked"] == len(recs.all_recommendations())
+    assert {"up", "hold", "down"} <= set(timing.counts)
+    assert set(timing.factors) == set(engine.get_factor_weights())
+
+
+def test_uninstrumented_engine_records_nothing(engine, corpus):
+    assert engine.recommend(corpus.tracks[0]).timing is None
+    assert engine.timing_summary() == {"sources": {}, "metrics": {}}
+
+
+def test_engine_metrics_count_every_call(make_engine, corpus):
+    engine = make_engine(cache_size=8, instrument=True)
+    for track in corpus.tracks[:3]:
+        engine.recently_played = []
+        engine.recommend(track)
+    engine.recently_played = []
+    engine.recommend(corpus.tracks[0])
+
+    summary = engine.timing_summary()
+    assert summary["sources"] == {"live": 3, "cache": 1}
+    assert summary["metrics"]["total"]["count"] == 4
+    # Cache hits don't run the stages
+    assert summary["metrics"]["stage.score"]["count"] == 3
+
+
+def test_stage_timer_charges_laps_and_keeps_last_count():
+    timer = StageTimer()
+    timer.lap("filter")
+    timer.lap("score")
+    timer.lap("score")
+    timer.add_factor("Key Quality", 0.002)
+    timer.add_factor("Key Quality", 0.001)
+    timer.count("filter", 10)
+    timer.count("filter", 7)
+
+    timing = timer.finish("live")
+    assert list(timing.stages) == ["filter", "score"]
+    assert timing.factors["Key Quality"] == pytest.approx(3.0)
+    assert timing.counts == {"filter": 7}
+    assert timing.total_ms >= sum(timing.stages.values())
+
+
+def test_metrics_summarize_the_last_window():
+    metrics = PipelineMetrics(window=4)
+    for ms in (100.0, 1.0, 2.0, 3.0, 4.0):
+        metrics.record(PipelineTiming(source="live", total_ms=ms, stages={"score": ms / 2}, counts={"filter": int(ms)}))
+
+    summary = metrics.summary(buckets=True)
+    assert summary["sources"] == {"live": 5}
+    total = summary["metrics"]["total"]
+    # Five calls counted, but the 100 ms one has rolled out of the window
+    assert total["count"] == 5
+    assert total["max"] == 4.0
+    assert total["p50"] == 2.5
+    assert sum(total["buckets"]) == 4
+    assert len(total["buckets"]) == len(summary["bucket_edges_ms"]) - 1 == len(BUCKET_EDGES_MS) - 1
+    assert summary["metrics"]["stage.score"]["mean"] == 1.25
+    assert "buckets" not in summary["metrics"]["count.filter"]
+
+    metrics.reset()
+    assert metrics.summary() == {"sources": {}, "metrics": {}}
@@ -0,0 +1,30 @@
+"""Tests for process-pool candidate scoring against the serial path."""
+
+from flowstate.engine.parallel import supports_parallel
+
+from .conftest import scores
+
+
+def test_default_factors_support_parallel(engine):
+    assert supports_parallel(engine.config.factors)
+
+
+def test_parallel_matches_serial(make_engine, corpus):
+    serial = make_engine()
+    parallel = make_engine(parallel_workers=2, parallel_threshold=0, instrument=True)
+
+    for track in corpus.tracks[:30:3]:
+        recs = parallel.recommend(track)
+        assert recs.timing.source == "parallel"
+        assert scores(recs) == scores(serial.recommend(track))
+
+
+def test_parallel_uses_current_weights(make_engine, corpus):
+    # Weights travel with the config, so a reweighted engine stays exact
+    serial = make_engine()
+    parallel = make_engine(parallel_workers=2, parallel_threshold=0)
+    for engine in (serial, parallel):
+        engine.set_factor_weight("Vibe Compatibility", 3.0)
+
+    for track in corpus.tracks[40:60:4]:
+        assert scores(parallel.recommend(track)) == scores(serial.recommend(track))
@@ -0,0 +1,52 @@
+"""Tests for patching cached results after history changes, and paging."""
+
+import random
+
+import pytest
+
+from flowstate.models import Direction
+
+from .conftest import scores
+
+
+@pytest.mark.parametrize("settings", [{}, {"prune_threshold": 100}], ids=str)
+def test_history_changes_are_patched_exactly(make_engine, make_reference, large_corpus, settings):
+    engine = make_engine(corpus=large_corpus, cache_size=64, instrument=True, **settings)
+    rng = random.Random(0)
+    sources = set()
+
+    for current in rng.sample(large_corpus.tracks, 6):
+        recs = engine.recommend(current)
+        for step in range(6):
+            # Mostly play recommended tracks, sometimes unrelated ones
+            picks = recs.all_recommendations()
+            if picks and rng.random() < 0.7:
+                engine.add_to_history(rng.choice(picks).track.track_id)
+            else:
+                engine.add_to_history(rng.choice(large_corpus.tracks).track_id)
+            if step == 3:
+                # Push the oldest entries out, so their tracks come back
+                for _ in range(engine.max_history // 2):
+                    engine.add_to_history(rng.choice(large_corpus.tracks).track_id)
+
+            history = engine.recently_played
+            recs = engine.recommend(current)
+            sources.add(recs.timing.source)
+            reference = make_reference(current, history, corpus=large_corpus, **settings)
+            assert scores(recs) == scores(reference.recommend(current))
+    assert "patch" in sources
+
+
+def test_pages_match_a_deeper_ranking(make_engine, make_reference, large_corpus):
+    engine = make_engine(corpus=large_corpus, cache_size=64)
+    current = large_corpus.tracks[63]
+    engine.recommend(current)
+    for track_id in [s.track.track_id for s in engine.recommend(current).all_recommendations()][:3]:
+        engine.add_to_history(track_id)
+
+    depth = engine.config.pool_depth
+    deep = make_reference(current, engine.recently_played, corpus=large_corpus, top_n=depth).recommend(current)
+    for direction in Direction:
+        pages = [s for offset in range(0, depth, 5) for s in engine.more(current, direction, offset, 5)]
+        expected = [(s.track.track_id, s.total_score) for s in deep.get_direction(direction)]
+        assert [(s.track.track_id, s.total_score) for s in pages] == expected
@@ -0,0 +1,47 @@
+"""Tests for the lookahead planner."""
+
+from flowstate.engine import RecommendationEngine, ScoringConfig
+
+
+def _paths(plan):
+    return [([t.track_id for t in path.tracks], path.total_score) for path in plan.paths]
+
+
+def test_plan_reuses_memoized_successors(engine, corpus):
+    current = corpus.tracks[0]
+    first = engine.plan(current, depth=3, beam=8, budget_ms=0)
+
+    fresh = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    assert _paths(fresh.plan(current, depth=3, beam=8, budget_ms=0)) == _paths(first)
+    assert _paths(engine.plan(current, depth=3, beam=8, budget_ms=0)) == _paths(first)
+
+
+def test_sparse_successor_lists_hit_the_memo(engine, corpus, monkeypatch):
+    store = engine.features
+    # The track with the fewest candidates lists fewer successors than any beam needs
+    sparse = min(corpus.tracks[:200], key=lambda t: engine._score_candidates(t, store, [])[1])
+    planner = engine._planner
+    rows, _, _ = planner._successors(sparse, store, width=1000)
+    assert len(rows) < 1000
+
+    calls = []
+    score_candidates = engine._score_candidates
+    monkeypatch.setattr(engine, "_score_candidates", lambda *a: calls.append(a) or score_candidates(*a))
+    again, _, _ = planner._successors(sparse, store, width=1000)
+    assert calls == []
+    assert again.tolist() == rows.tolist()
+
+
+def test_short_memo_entries_are_rescored_for_wider_beams(engine, corpus, monkeypatch):
+    store = engine.features
+    track = max(corpus.tracks[:200], key=lambda t: engine._score_candidates(t, store, [])[1])
+    planner = engine._planner
+    narrow, _, _ = planner._successors(track, store, width=3)
+    assert len(narrow) == 3
+
+    calls = []
+    score_candidates = engine._score_candidates
+    monkeypatch.setattr(engine, "_score_candidates", lambda *a: calls.append(a) or score_candidates(*a))
+    wide, _, _ = planner._successors(track, store, width=10)
+    assert len(calls) == 1
+    assert wide[:3].tolist() == narrow.tolist()
@@ -0,0 +1,115 @@
+"""Tests for bucket-bound pruning against full scoring."""
+
+import numpy as np
+import pytest
+
+from flowstate.engine import WEIGHT_PRESETS
+from flowstate.engine.engine import BUCKET_COLUMNS, _weighted_totals
+
+from .conftest import scores
+
+# Well below the default, so most pools of the test corpus are pruned
+PRUNE_THRESHOLD = 100
+
+
+@pytest.mark.parametrize("settings", [{}, {"top_n": 20}, {"half_double_time": True}], ids=str)
+def test_pruned_matches_full_scoring(make_engine, large_corpus, settings):
+    pruned = make_engine(corpus=large_corpus, prune_threshold=PRUNE_THRESHOLD, instrument=True, **settings)
+    full = make_engine(corpus=large_corpus, prune_threshold=0, **settings)
+
+    skipped = 0
+    for track in large_corpus.tracks[:200:9]:
+        recs = pruned.recommend(track)
+        skipped += recs.timing.counts.get("pruned", 0)
+        assert scores(recs) == scores(full.recommend(track))
+    assert skipped  # Pruning actually happened
+
+
+def test_bucket_bounds_cover_actualscores(make_engine, large_corpus):
+    engine = make_engine(corpus=large_corpus)
+    store = engine.features
+    factors = engine.config.factors
+
+    for current in large_corpus.tracks[:100:11]:
+        rows, _, _ = engine._filter_and_split(current, store, [])
+        pools = engine._score_rows(current, store, rows)
+        for direction, direction_rows in rows.items():
+            if not len(direction_rows):
+                continue
+            inverse, bounds, bound_totals = engine._bucket_bounds(current, store, direction_rows, direction)
+            pool = pools[direction]
+            at = inverse[np.searchsorted(direction_rows, pool.rows)]
+            assert (pool.raw <= bounds[:, at]).all()
+            assert (pool.totals <= bound_totals[at]).all()
+
+            # Bucket-exact factors score every row of a bucket the same
+            for i, factor in enumerate(factors):
+                if factor.columns is not None and set(factor.columns) <= set(BUCKET_COLUMNS):
+                    assert (pool.raw[i] == bounds[i, at]).all()
+
+
+@pytest.mark.parametrize("preset", list(WEIGHT_PRESETS))
+def test_rerank_of_pruned_pools_is_exact(make_engine, large_corpus, preset):
+    pruned = make_engine(corpus=large_corpus, prune_threshold=PRUNE_THRESHOLD, cache_size=16, instrument=True)
+    full = make_engine(corpus=large_corpus, prune_threshold=0)
+    track = large_corpus.tracks[135]
+    assert pruned.recommend(track).timing.counts["pruned"]
+    full.recommend(track)
+
+    pruned.apply_preset(preset)
+    full.apply_preset(preset)
+    recs = pruned.recommend(track)
+    assert recs.timing.source == "rerank"
+    assert scores(recs) == scores(full.recommend(track))
+
+
+def test_early_abort_keeps_everything_that_can_reach_the_cutoff(make_engine, large_corpus):
+    engine = make_engine(corpus=large_corpus)
+    store = engine.features
+    factors = engine.config.factors
+
+    dropped = 0
+    for current in large_corpus.tracks[:200:13]:
+        rows, _, _ = engine._filter_and_split(current, store, [])
+        full = engine._score_rows(current, store, rows)
+        bounds, cutoffs = {}, {}
+        for direction, direction_rows in rows.items():
+            inverse, bucket_bounds, _ = engine._bucket_bounds(current, store, direction_rows, direction)
+            bounds[direction] = bucket_bounds[:, inverse]
+            totals = np.sort(full[direction].totals)
+            cutoffs[direction] = totals[-engine.config.top_n] if len(totals) >= engine.config.top_n else -np.inf
+
+        for direction, pool in engine._score_bounded(current, store, rows, cutoffs, bounds).items():
+            reference = full[direction]
+            at = np.searchsorted(reference.rows, pool.rows)
+            assert (pool.raw == reference.raw[:, at]).all()
+            assert (pool.totals == reference.totals[at]).all()
+            # Nothing that reaches the cutoff is dropped
+            assert set(pool.rows.tolist()) >= set(reference.rows[reference.totals >= cutoffs[direction]].tolist())
+
+            # Dropped rows keep bounds on their scores and totals
+            gone = np.searchsorted(reference.rows, pool.pruned_rows)
+            entries = pool.pruned[:, pool.pruned_buckets]
+            assert (entries >= reference.raw[:, gone]).all()
+            assert (_weighted_totals(entries, factors) >= reference.totals[gone]).all()
+            dropped += len(gone)
+    assert dropped
+
+
+def test_pruned_pools_bound_the_rows_they_skip(make_engine, large_corpus):
+    engine = make_engine(corpus=large_corpus, prune_threshold=PRUNE_THRESHOLD)
+    store = engine.features
+    factors = engine.config.factors
+
+    for current in large_corpus.tracks[:200:13]:
+        rows, _, _ = engine._filter_and_split(current, store, [])
+        full = engine._score_rows(current, store, rows)
+        for direction, pool in engine._score_pruned(current, store, rows, engine.config.top_n).items():
+            reference = full[direction]
+            assert sorted(pool.rows.tolist() + (pool.pruned_rows.tolist() if pool.pruned is not None else [])) == reference.rows.tolist()
+            if pool.pruned is None:
+                continue
+            gone = np.searchsorted(reference.rows, pool.pruned_rows)
+            entries = pool.pruned[:, pool.pruned_buckets]
+            assert (entries >= reference.raw[:, gone]).all()
+            assert (_weighted_totals(entries, factors) >= reference.totals[gone]).all()
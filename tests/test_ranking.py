@@ -0,0 +1,118 @@
+"""Tests for top-N selection and Pareto-front (skyline) ranking."""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_corpus
+from flowstate.engine import ScoringConfig
+from flowstate.engine.ranking import select_top, skyline
+
+
+def _full_sort(scores: np.ndarray, tiebreak: np.ndarray, k: int) -> list[int]:
+    return np.lexsort((tiebreak, -scores))[:k].tolist()
+
+
+@pytest.mark.parametrize("n", [1, 7, 200, 3000])
+@pytest.mark.parametrize("k", [0, 1, 15, 64, 5000])
+def test_select_top_matches_a_full_sort(n, k):
+    rng = np.random.default_rng(n + k)
+    tiebreak = rng.permutation(n)
+    # Few distinct values, so ties straddle the k-th position
+    for scores in (rng.random(n), rng.integers(0, 5, n) / 4):
+        assert select_top(scores, tiebreak, k).tolist() == _full_sort(scores, tiebreak, k)
+
+
+def test_select_top_breaks_ties_at_the_boundary_by_tiebreak():
+    scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1, 0.5])
+    tiebreak = np.array([40, 10, 30, 50, 0, 20])
+    # Four entries tie for the last two places
+    assert select_top(scores, tiebreak, 3).tolist() == [1, 5, 2]
+
+
+def test_select_top_does_not_depend_on_input_order():
+    rng = np.random.default_rng(9)
+    scores = rng.integers(0, 3, 500) / 2
+    tiebreak = rng.permutation(500)
+    chosen = tiebreak[select_top(scores, tiebreak, 20)]
+
+    shuffle = rng.permutation(500)
+    assert tiebreak[shuffle][select_top(scores[shuffle], tiebreak[shuffle], 20)].tolist() == chosen.tolist()
+
+
+def test_tied_recommendations_are_ordered_by_track_id(make_engine):
+    library = generate_corpus(400, seed=21)
+    track = library.tracks[0]
+    best = make_engine(corpus=library).recommend(track).all_recommendations()[0]
+    # Identical twins of the best candidate, added out of ID order
+    for track_id in ("twin-c", "twin-a", "twin-b"):
+        library.add(best.track.model_copy(update={"track_id": track_id, "file_path": best.track.file_path.with_name(f"{track_id}.mp3")}))
+
+    recs = make_engine(corpus=library).recommend(track).get_direction(best.direction)
+    assert [s.track.track_id for s in recs[:4]] == sorted([best.track.track_id, "twin-a", "twin-b", "twin-c"])
+    assert len({s.total_score for s in recs[:4]}) == 1
+
+
+def _brute_force_front(points: np.ndarray) -> set[int]:
+    """Rows no other row is at least as good as everywhere and better somewhere."""
+    return {
+        i for i in range(len(points))
+        if not ((points >= points[i]).all(axis=1) & (points > points[i]).any(axis=1)).any()
+    }
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 200, 3000])
+@pytest.mark.parametrize("d", [1, 2, 3, 5])
+def test_skyline_matches_brute_force(n, d):
+    rng = np.random.default_rng(n * 10 + d)
+    continuous = rng.random((n, d))
+    # Few distinct values: many ties and exact duplicates
+    coarse = rng.integers(0, 4, (n, d)).astype(float)
+
+    for points in (continuous, coarse):
+        front = skyline(points)
+        assert len(front) == len(set(front.tolist()))
+        assert set(front.tolist()) == _brute_force_front(points)
+
+
+def test_skyline_keeps_every_duplicate_on_the_front():
+    points = np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [0.5, 0.5], [0.2, 0.2]])
+    assert sorted(skyline(points).tolist()) == [0, 1, 2, 3]
+
+
+def test_skyline_with_no_columns_keeps_everything():
+    assert skyline(np.empty((4, 0))).tolist() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("pareto_factors", [(), ("Vibe Compatibility", "Key Quality", "Mix Ease")], ids=str)
+def test_pareto_recommendations_match_brute_force(make_engine, corpus, pareto_factors):
+    engine = make_engine(ranking="pareto", pareto_factors=pareto_factors)
+    # Every candidate, ranked by weighted total like the front
+    everything = make_engine(top_n=len(corpus.tracks))
+    dims = engine._pareto_factors()
+
+    for current in corpus.tracks[:100:9]:
+        recs = engine.recommend(current)
+        full = everything.recommend(current)
+        engine.recently_played = everything.recently_played = []
+        for direction in ("up", "hold", "down"):
+            candidates = getattr(full, direction)
+            points = np.array([[s.factor_scores[i].score for i in dims] for s in candidates]).reshape(len(candidates), len(dims))
+            front = _brute_force_front(points)
+            expected = [s.track.track_id for i, s in enumerate(candidates) if i in front]
+            assert [s.track.track_id for s in getattr(recs, direction)] == expected
+
+
+@pytest.mark.parametrize("settings, message", [
+    ({"ranking": "Pareto"}, "Unknown ranking"),
+    ({"ranking": "skyline"}, "Unknown ranking"),
+    ({"ranking": "pareto", "pareto_factors": ("Key Quality", "Tempo")}, "Unknown factor: Tempo"),
+], ids=str)
+def test_invalid_ranking_settings_are_rejected(settings, message):
+    with pytest.raises(ValueError, match=message):
+        ScoringConfig(**settings)
+
+
+def test_pareto_factors_are_kept_as_a_tuple():
+    config = ScoringConfig(ranking="pareto", pareto_factors=["Key Quality", "Mix Ease"])
+    assert config.pareto_factors == ("Key Quality", "Mix Ease")
+    hash(config.fingerprint())
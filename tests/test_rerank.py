@@ -0,0 +1,46 @@
+"""Tests for re-ranking cached scores after a weight change."""
+
+import pytest
+
+from flowstate.engine import WEIGHT_PRESETS
+
+from .conftest import scores
+
+
+@pytest.mark.parametrize("preset", list(WEIGHT_PRESETS))
+def test_preset_change_reranks_exactly(make_engine, make_reference, corpus, preset):
+    engine = make_engine(cache_size=64, instrument=True)
+    other = next(name for name in WEIGHT_PRESETS if name != preset)
+    for track in corpus.tracks[:50:7]:
+        engine.apply_preset(other)
+        engine.recommend(track)
+        engine.apply_preset(preset)
+        recs = engine.recommend(track)
+        assert recs.timing.source == "rerank"
+
+        reference = make_reference(track, engine.recently_played, WEIGHT_PRESETS[preset])
+        assert scores(recs) == scores(reference.recommend(track))
+
+
+def test_single_weight_change_reranks_exactly(make_engine, make_reference, corpus):
+    engine = make_engine(cache_size=64, instrument=True)
+    track = corpus.tracks[12]
+    engine.recommend(track)
+    engine.set_factor_weight("Key Quality", 0.9)
+    recs = engine.recommend(track)
+    assert recs.timing.source == "rerank"
+
+    weights = {factor.name: factor.weight for factor in engine.config.factors}
+    reference = make_reference(track, engine.recently_played, weights)
+    assert scores(recs) == scores(reference.recommend(track))
+
+
+@pytest.mark.parametrize("weight", [-0.1, float("nan"), float("inf")])
+def test_invalid_weights_are_rejected(engine, corpus, weight):
+    before = engine.get_factor_weights()
+    with pytest.raises(ValueError, match="Invalid weight"):
+        engine.set_factor_weights({"Mix Ease": 0.5, "Key Quality": weight})
+    assert engine.get_factor_weights() == before
+
+    # Results stay valid for everyone afterwards
+    assert engine.recommend(corpus.tracks[0]).all_recommendations()
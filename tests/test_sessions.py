@@ -0,0 +1,99 @@
+"""Tests for concurrent sessions sharing one engine."""
+
+import threading
+
+from flowstate.engine import WEIGHT_PRESETS, RecommendationEngine, ScoringConfig
+
+from .conftest import scores
+
+
+def test_sessions_keep_separate_histories(engine, corpus):
+    engine.recommend(corpus.tracks[0], session="a")
+    engine.recommend(corpus.tracks[1], session="b")
+    assert engine.session("a").history == [corpus.tracks[0].track_id]
+    assert engine.session("b").history == [corpus.tracks[1].track_id]
+    assert engine.recently_played == []
+
+
+def test_weight_changes_during_recommend_cache_consistent_results(make_engine, corpus):
+    engine = make_engine(cache_size=512)
+    tracks = corpus.tracks[:40]
+    sessions = ["a", "b", "c"]
+    stop = threading.Event()
+    errors = []
+
+    def toggle_presets():
+        presets = list(WEIGHT_PRESETS)
+        i = 0
+        while not stop.is_set():
+            engine.apply_preset(presets[i % len(presets)])
+            i += 1
+
+    def play(session):
+        try:
+            for track in tracks:
+                engine.recommend(track, session=session)
+        except Exception as e:  # Surfaced in the main thread below
+            errors.append(e)
+
+    toggler = threading.Thread(target=toggle_presets)
+    players = [threading.Thread(target=play, args=(session,)) for session in sessions]
+    toggler.start()
+    for player in players:
+        player.start()
+    for player in players:
+        player.join()
+    stop.set()
+    toggler.join()
+
+    assert errors == []
+    info = engine.cache_info()
+    assert info["hits"] + info["misses"] == len(tracks) * len(sessions)
+
+    # Every cached result was computed entirely under the weights of its key
+    for key, recs in list(engine._cache.items()):
+        weights = {name: weight for _, name, weight in key[2][-1]}
+        for scored in recs.all_recommendations():
+            assert {fs.name: fs.weight for fs in scored.factor_scores} == weights
+            total_weighted = total_weight = 0.0
+            for fs in scored.factor_scores:
+                total_weighted += fs.score * weights[fs.name]
+                total_weight += weights[fs.name]
+            assert scored.total_score == total_weighted / total_weight
+
+
+def test_weight_change_inside_a_call_does_not_leak_into_it(make_engine, make_reference, corpus, monkeypatch):
+    engine = make_engine(cache_size=16)
+    preset, other = list(WEIGHT_PRESETS)[:2]
+    engine.apply_preset(preset)
+    assemble = engine._assemble
+
+    def switch_then_assemble(*args, **kwargs):
+        # Another client changes the weights between scoring and ranking
+        engine.apply_preset(other)
+        return assemble(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "_assemble", switch_then_assemble)
+    track = corpus.tracks[4]
+    recs = engine.recommend(track)
+    monkeypatch.undo()
+
+    reference = make_reference(track, [], WEIGHT_PRESETS[preset])
+    assert scores(recs) == scores(reference.recommend(track))
+    weights = reference.get_factor_weights()
+    for scored in recs.all_recommendations():
+        assert {fs.name: fs.weight for fs in scored.factor_scores} == weights
+    # ...and cached under those weights, not the ones it finished under
+    [(key, cached)] = engine._cache.items()
+    assert key[2] == reference.config.fingerprint()
+    assert scores(cached) == scores(recs)
+
+
+def test_weight_changes_do_not_touch_other_engines(corpus):
+    # Default configs share the DEFAULT_FACTORS instances
+    first = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    second = RecommendationEngine(corpus, ScoringConfig(cache_size=0))
+    before = second.get_factor_weights()
+    first.set_factor_weight("Key Quality", 0.123)
+    assert first.get_factor_weights()["Key Quality"] == 0.123
+    assert second.get_factor_weights() == before
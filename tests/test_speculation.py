@@ -0,0 +1,55 @@
+"""Tests for speculative precomputation of the next selection."""
+
+import threading
+import time
+
+from .conftest import scores
+
+
+def _wait_for_speculation(engine, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = engine.speculation_info()
+        if info["scheduled"] and info["completed"] + info["cancelled"] >= info["scheduled"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"Speculation did not finish: {engine.speculation_info()}")
+
+
+def test_speculative_hit_matches_a_fresh_recommend(make_engine, make_reference, corpus):
+    engine = make_engine(cache_size=256, speculation_workers=2, instrument=True)
+    recs = engine.recommend(corpus.tracks[0])
+    for step in range(4):
+        _wait_for_speculation(engine)
+        history = engine.recently_played
+        current = recs.all_recommendations()[step].track
+
+        recs = engine.recommend(current)
+        assert recs.timing.source == "cache"
+        reference = make_reference(current, history)
+        assert scores(recs) == scores(reference.recommend(current))
+    assert engine.speculation_info()["hits"] == 4
+
+
+def test_selection_adopts_an_in_flight_speculation(make_engine, make_reference, corpus, monkeypatch):
+    engine = make_engine(cache_size=256, speculation_workers=1, instrument=True)
+    release = threading.Event()
+    compute = engine._compute
+
+    def slow_compute(*args, **kwargs):
+        if threading.current_thread().name.startswith("speculate"):
+            release.wait(10)
+        return compute(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "_compute", slow_compute)
+    current = corpus.tracks[3]
+    recs = engine.recommend(current)
+    history = engine.recently_played
+    # The first candidate is the one the single worker is running
+    following = recs.all_recommendations()[0].track
+
+    threading.Timer(0.1, release.set).start()
+    adopted = engine.recommend(following)
+    assert adopted.timing.source == "speculation"
+    reference = make_reference(following, history)
+    assert scores(adopted) == scores(reference.recommend(following))
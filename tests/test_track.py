@@ -0,0 +1,55 @@
+"""Tests for the fields a Track derives from its stored ones."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from flowstate.models import Track
+from flowstate.models.camelot import encode_key, get_compatible_keys
+from flowstate.models.track import GROOVE_CODES, INTENSITY_CODES, VIBE_CODES
+
+DERIVED = ("key_code", "compatible_keys", "vibe_code", "intensity_code", "groove_code", "genre_lower", "subgenre_lower")
+
+
+def test_key_fields_follow_the_key(corpus):
+    track = next(t for t in corpus.tracks if t.key and t.key != "5A")
+    moved = track.model_copy(update={"key": "5A"})
+    assert moved.key_code == encode_key("5A")
+    assert moved.compatible_keys == get_compatible_keys("5A")
+    # The original is untouched
+    assert track.key_code == encode_key(track.key)
+
+    moved.key = ""
+    assert moved.key_code == -1
+    assert moved.compatible_keys == []
+
+
+@pytest.mark.parametrize("field, value, derived, expected", [
+    ("vibe", "chill", "vibe_code", VIBE_CODES["chill"]),
+    ("intensity", "closer", "intensity_code", INTENSITY_CODES["closer"]),
+    ("groove_style", "swung", "groove_code", GROOVE_CODES["swung"]),
+    ("genre", "Deep House", "genre_lower", "deep house"),
+    ("subgenre", "Dub Techno", "subgenre_lower", "dub techno"),
+    ("subgenre", None, "subgenre_lower", None),
+])
+def test_categorical_fields_follow_their_source(corpus, field, value, derived, expected):
+    track = corpus.tracks[0]
+    assert getattr(track.model_copy(update={field: value}), derived) == expected
+
+
+def test_derived_fields_are_not_serialized(corpus):
+    track = corpus.tracks[0]
+    data = track.model_dump(mode="json")
+    assert not set(DERIVED) & set(data)
+
+    # Corpora saved with stale compatible keys load with the derived ones
+    data["compatible_keys"] = ["1A"]
+    loaded = Track.model_validate_json(json.dumps(data))
+    assert loaded.compatible_keys == get_compatible_keys(track.key)
+
+
+def test_models_do_not_import_the_engine():
+    code = "import sys, flowstate.models; assert not [m for m in sys.modules if m.startswith('flowstate.engine')]"
+    subprocess.run([sys.executable, "-c", code], check=True)
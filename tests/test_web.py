@@ -0,0 +1,54 @@
+"""Tests for the web dashboard's JSON API."""
+
+import time
+
+import pytest
+
+from flowstate.ui.web import WebUI
+
+
+@pytest.fixture
+def client(engine, corpus):
+    return WebUI(corpus, engine, rekordbox_sync=False).app.test_client()
+
+
+@pytest.mark.parametrize("weight", [-1, "nan", "inf"])
+def test_invalid_weights_are_a_bad_request(client, engine, weight):
+    before = engine.get_factor_weights()
+    response = client.post("/api/weights", json={"weights": {"Key Quality": weight}})
+    assert response.status_code == 400
+    assert engine.get_factor_weights() == before
+
+
+def test_weights_are_updated(client, engine):
+    response = client.post("/api/weights", json={"weights": {"Key Quality": 0.3}})
+    assert response.status_code == 200
+    assert response.get_json()["weights"]["Key Quality"] == 0.3
+    assert engine.get_factor_weights()["Key Quality"] == 0.3
+
+
+def test_refined_stream_of_a_superseded_track_expires(client, corpus):
+    first, second = corpus.tracks[:2]
+    client.get(f"/api/select/{first.track_id}?session=s")
+    client.get(f"/api/select/{second.track_id}?session=s")
+
+    started = time.monotonic()
+    response = client.get(f"/api/refined/{first.track_id}?session=s")
+    assert response.get_data(as_text=True).startswith("event: expired")
+    # Right away, not after the wait for a refinement times out
+    assert time.monotonic() - started < 5
+
+
+def test_engine_stats_report_timings(make_engine, corpus):
+    engine = make_engine(instrument=True)
+    client = WebUI(corpus, engine, rekordbox_sync=False).app.test_client()
+    for track in corpus.tracks[:3]:
+        client.get(f"/api/select/{track.track_id}?session=s")
+
+    stats = client.get("/api/engine/stats").get_json()
+    assert set(stats) == {"cache", "speculation", "sessions", "timing"}
+    assert sum(stats["timing"]["sources"].values()) == stats["timing"]["metrics"]["total"]["count"] == 3
+    assert "buckets" not in stats["timing"]["metrics"]["total"]
+
+    timing = client.get("/api/engine/stats?buckets=1").get_json()["timing"]
+    assert len(timing["metrics"]["total"]["buckets"]) == len(timing["bucket_edges_ms"]) - 1